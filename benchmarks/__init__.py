@@ -0,0 +1,5 @@
+"""
+GameVerse Benchmarks Module
+"""
+
+# This file makes the benchmarks directory a Python package
@@ -0,0 +1,222 @@
+"""
+Catalog Query Benchmark
+Times data/games_data.py functions on synthetic catalogs from 1k to 1M
+games, for a plain DataFrame, the compact schema (data/compact.py) and a
+compiled snapshot, and compares against a stored baseline.
+
+Time is the best of --repeat runs; peak memory is what tracemalloc sees
+during one run (NumPy and Python allocations; Arrow buffers aren't
+traced). A case regresses when time or memory grows by more than
+--threshold over the baseline, ignoring sub-0.05 ms timing noise.
+
+Usage:
+    python -m benchmarks.bench_games_data --save-baseline
+    python -m benchmarks.bench_games_data --sizes 1k,10k,100k
+    python -m benchmarks.bench_games_data --sizes 1M --modes snapshot --threshold 0.5
+    python -m benchmarks.bench_games_data --sizes 1M --memory-report
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic_catalog import synthetic_catalog
+from data import games_data
+from data.compact import compact_catalog, memory_report
+from data.snapshot import compile_snapshot, load_snapshot
+
+DEFAULT_SIZES = "1k,10k,100k,1M"
+DEFAULT_BASELINE = Path(".cache") / "benchmarks" / "games_data.json"
+NOISE_FLOOR_MS = 0.05
+LOOKUPS = 20
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def catalog_cases(games_df, seed=0):
+    """Benchmark cases as {name: zero-arg callable}"""
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(1, len(games_df) + 1, LOOKUPS).tolist()
+
+    def lookups():
+        for game_id in ids:
+            games_data.get_game_by_id(games_df, game_id)
+
+    category_result = games_data.filter_games(games_df, category="RPG")
+
+    return {
+        "filter_games(search)": lambda: games_data.filter_games(games_df, search="legends"),
+        "filter_games(short search)": lambda: games_data.filter_games(games_df, search="ic"),
+        "filter_games(category)": lambda: games_data.filter_games(games_df, category="RPG"),
+        "filter_games(fuzzy)": lambda: games_data.filter_games(
+            games_df, search="mystc legnds", fuzzy=True),
+        "filter_games(price)": lambda: games_data.filter_games(games_df, price_range="$20-$40"),
+        "filter_games(all filters)": lambda: games_data.filter_games(
+            games_df, search="shadow", category="Action", price_range="Under $20"),
+        "filter_games(tags any)": lambda: games_data.filter_games(
+            games_df, tags=["Co-op", "Roguelike"]),
+        "filter_games(tags all)": lambda: games_data.filter_games(
+            games_df, tags=["Multiplayer", "Singleplayer"], tag_mode="all"),
+        "sort_games(rating, page 2)": lambda: games_data.sort_games(
+            games_df, category_result, "rating", page=2, page_size=12),
+        "sort_games(title, page 2)": lambda: games_data.sort_games(
+            games_df, category_result, "title", page=2, page_size=12),
+        "get_facet_counts": lambda: games_data.get_facet_counts(games_df, games_df),
+        f"get_game_by_id x{LOOKUPS}": lookups,
+        "get_categories": lambda: games_data.get_categories(games_df),
+        "get_featured_games": lambda: games_data.get_featured_games(games_df),
+        "get_free_games": lambda: games_data.get_free_games(games_df),
+    }
+
+
+def measure(func, repeat):
+    """
+    Returns:
+        dict: {"ms": best wall time, "peak_kb": traced peak allocation}
+    """
+    func()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": best * 1000, "peak_kb": peak / 1024}
+
+
+def prepare(mode, games_df, workdir):
+    """The DataFrame a given mode queries"""
+    if mode == "dataframe":
+        return games_df
+    if mode == "compact":
+        compact = compact_catalog(games_df)
+        compact.attrs["version"] = f"{games_df.attrs['version']}-compact"
+        return compact
+    root = Path(workdir) / f"snapshot-{len(games_df)}"
+    version = compile_snapshot(games_df, root, source="synthetic", keep=0)
+    snapshot = load_snapshot(root, version)
+    games_data._catalogs[snapshot.version] = snapshot
+    return snapshot.df
+
+
+def print_memory_report(games_df):
+    """Per-column memory of the compact schema against the default one"""
+    report = memory_report(compact_catalog(games_df), baseline_df=games_df)
+    print(report[["dtype", "bytes_per_row", "baseline_bytes_per_row", "ratio"]]
+          .to_string(float_format=lambda x: f"{x:,.2f}"))
+
+
+def run(sizes, modes, repeat, seed, memory=False):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in sizes:
+            start = time.perf_counter()
+            games_df = synthetic_catalog(n_rows, seed=seed)
+            print(f"\n{n_rows:,} games (generated in {time.perf_counter() - start:.1f}s)")
+            if memory:
+                print_memory_report(games_df)
+            for mode in modes:
+                queried = prepare(mode, games_df, workdir)
+                for case, func in catalog_cases(queried, seed).items():
+                    result = measure(func, repeat)
+                    results[f"{mode}/{n_rows}/{case}"] = result
+                    print(f"  {mode:<10} {case:<28} {result['ms']:10.3f} ms "
+                          f"{result['peak_kb']:12,.0f} KiB")
+                games_data._catalogs.clear()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns:
+        list: (key, metric, baseline value, new value) for each regression
+    """
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if (result["ms"] > old["ms"] * (1 + threshold)
+                and result["ms"] - old["ms"] > NOISE_FLOOR_MS):
+            regressions.append((key, "ms", old["ms"], result["ms"]))
+        if result["peak_kb"] > old["peak_kb"] * (1 + threshold) and result["peak_kb"] > 1:
+            regressions.append((key, "peak_kb", old["peak_kb"], result["peak_kb"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data/games_data.py queries.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated catalog sizes (default: {DEFAULT_SIZES}).")
+    parser.add_argument("--modes", default="dataframe,compact,snapshot",
+                        help="dataframe (plain DataFrame scans), compact (compact schema), "
+                             "snapshot (compiled indexes).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help=f"Baseline JSON file (default: {DEFAULT_BASELINE}).")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown or memory growth, as a fraction.")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Print memory per column, compact against default schema.")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    for mode in modes:
+        if mode not in ("dataframe", "compact", "snapshot"):
+            parser.error(f"unknown mode {mode!r}")
+
+    results = run(sizes, modes, args.repeat, args.seed, args.memory_report)
+
+    if args.save_baseline:
+        stored = {}
+        if args.baseline.exists():
+            stored = json.loads(args.baseline.read_text()).get("results", {})
+        stored.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": stored,
+        }, indent=2))
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+    compared = sum(1 for key in results if key in baseline)
+    if not regressions:
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} ({compared} cases compared)")
+        return
+    print(f"\n❌ {len(regressions)} regressions beyond {args.threshold:.0%}:")
+    for key, metric, old, new in regressions:
+        print(f"   {key} {metric}: {old:,.3f} -> {new:,.3f} ({new / old:.2f}x)")
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+SSE Parsing Micro-benchmark
+Compares the old sseclient + json path with utils.sse on a synthetic
+listen stream, in events per second.
+
+Usage:
+    python -m benchmarks.bench_sse --events 50000 --ping-ratio 0.2
+"""
+
+import argparse
+import json
+import random
+import time
+
+from utils import sse
+
+
+def build_stream(n_events, ping_ratio, seed=0):
+    """Synthetic Botpress listen body: message events mixed with pings"""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(n_events):
+        if rng.random() < ping_ratio:
+            parts.append(b"data: ping\n\n")
+            continue
+        event = {
+            "type": "message_created",
+            "data": {
+                "id": f"msg_{i:08d}",
+                "conversationId": "conv_benchmark",
+                "createdAt": "2025-01-01T00:00:00.000Z",
+                "payload": {"type": "text", "text": f"token{i} "},
+                "userId": "bot",
+            },
+        }
+        parts.append(b"event: message_created\ndata: " + json.dumps(event).encode() + b"\n\n")
+    return b"".join(parts)
+
+
+def chunked(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def extract_text(event_data):
+    data = event_data.get("data")
+    if data and "payload" in data and "text" in data["payload"]:
+        return data["payload"]["text"]
+    return None
+
+
+def run_sseclient(chunks):
+    """The previous listen_conversation path"""
+    import sseclient
+
+    texts = 0
+    for event in sseclient.SSEClient(iter(chunks)).events():
+        if event.data == "ping":
+            continue
+        if extract_text(json.loads(event.data)) is not None:
+            texts += 1
+    return texts
+
+
+def run_builtin(chunks, decoder):
+    """utils.sse path, as used by listen_conversation"""
+    texts = 0
+    for data in sse.iter_event_data(sse.iter_lines(iter(chunks))):
+        if b'"text"' not in data:
+            continue
+        if extract_text(decoder(data)) is not None:
+            texts += 1
+    return texts
+
+
+def bench(name, func, chunks, n_events, repeat):
+    best = float("inf")
+    texts = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        texts = func(chunks)
+        best = min(best, time.perf_counter() - start)
+    rate = n_events / best
+    print(f"{name:<28} {best * 1000:9.1f} ms  {rate:12,.0f} events/s  ({texts} texts)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SSE parsing for the listen stream.")
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--ping-ratio", type=float, default=0.2,
+                        help="Fraction of events that are pings.")
+    parser.add_argument("--chunk-size", type=int, default=1024,
+                        help="Bytes per network chunk fed to the parsers.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chunks = chunked(build_stream(args.events, args.ping_ratio), args.chunk_size)
+    print(f"{args.events:,} events, {args.ping_ratio:.0%} pings, "
+          f"{len(chunks):,} chunks of {args.chunk_size} bytes\n")
+
+    results = {}
+    try:
+        results["sseclient + json"] = bench(
+            "sseclient + json", run_sseclient, chunks, args.events, args.repeat)
+    except ImportError:
+        print("sseclient not installed, skipping the old path")
+
+    results["utils.sse + json"] = bench(
+        "utils.sse + json", lambda c: run_builtin(c, json.loads),
+        chunks, args.events, args.repeat)
+    if sse.orjson is not None:
+        results["utils.sse + orjson"] = bench(
+            "utils.sse + orjson", lambda c: run_builtin(c, sse.orjson.loads),
+            chunks, args.events, args.repeat)
+
+    baseline = results.get("sseclient + json")
+    if baseline:
+        print()
+        for name, rate in results.items():
+            if name != "sseclient + json":
+                print(f"{name}: {rate / baseline:.1f}x the sseclient path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Synthetic Catalog Generator
+Seeded, store-like catalogs of any size in the games_data schema
+
+Titles are built from a skewed word vocabulary (so some words are common
+and some rare, like real storefronts), tags follow a Zipf-like popularity
+curve, categories are unbalanced, and prices cluster on .99 price points
+with a free-to-play share.
+
+Usage:
+    from benchmarks.synthetic_catalog import synthetic_catalog
+    games_df = synthetic_catalog(100_000, seed=0)
+"""
+
+import numpy as np
+import pandas as pd
+
+ADJECTIVES = [
+    "Cyber", "Mystic", "Shadow", "Eternal", "Pixel", "Starbound", "Iron", "Crimson",
+    "Silent", "Galactic", "Ancient", "Neon", "Frozen", "Savage", "Hollow", "Golden",
+    "Broken", "Arcane", "Lost", "Infinite", "Dark", "Wild", "Rogue", "Quantum",
+    "Velocity", "Primal", "Hidden", "Burning", "Sacred", "Phantom",
+]
+NOUNS = [
+    "Legends", "Nexus", "Assassin", "Warfare", "Dungeon", "Odyssey", "Kingdom", "Racer",
+    "Frontier", "Empire", "Chronicles", "Horizon", "Protocol", "Quest", "Tactics",
+    "Siege", "Realms", "Outlaws", "Drift", "Colony", "Hunters", "Arena", "Citadel",
+    "Voyage", "Rebellion", "Station", "Labyrinth", "Harvest", "Titans", "Echoes",
+]
+SUFFIXES = ["", "", "", "", " II", " III", " 2077", " X", " Remastered", ": Origins",
+            ": Reborn", " Online", " Deluxe", " Zero"]
+
+CATEGORIES = ["Action", "Adventure", "RPG", "Strategy", "Indie", "Racing", "Simulation",
+              "Sports", "Puzzle", "Horror"]
+CATEGORY_WEIGHTS = [0.22, 0.14, 0.13, 0.10, 0.16, 0.05, 0.08, 0.05, 0.04, 0.03]
+
+TAGS = [
+    "Multiplayer", "Singleplayer", "Open World", "Story-Rich", "Pixel Art", "Roguelike",
+    "Co-op", "Sci-Fi", "Fantasy", "Free-to-Play", "Competitive", "Stealth", "Survival",
+    "Crafting", "Exploration", "Atmospheric", "Difficult", "Casual", "FPS", "Turn-Based",
+    "Card Game", "Space", "Medieval", "Cyberpunk", "Post-Apocalyptic", "Magic", "Zombies",
+    "Racing", "Management", "City-Building", "Dungeon Crawler", "Metroidvania", "Anime",
+    "Horror", "Puzzle", "Platformer", "Sandbox", "Tactical", "Narrative", "Dark",
+    "Cute", "Retro", "Ninja", "Pirates", "Mystery", "Physics", "Music", "Sports",
+    "VR", "Early Access",
+]
+PRICE_POINTS = [4.99, 9.99, 14.99, 19.99, 24.99, 29.99, 34.99, 39.99, 44.99, 49.99,
+                59.99, 69.99]
+PRICE_WEIGHTS = [0.08, 0.14, 0.13, 0.14, 0.11, 0.10, 0.06, 0.07, 0.04, 0.05, 0.06, 0.02]
+FREE_SHARE = 0.08
+
+DESCRIPTIONS = [
+    "Explore {a} worlds and uncover the secrets of the {n}.",
+    "Lead your squad through {a} battles in this {c} experience.",
+    "A {c} game about {a} heroes, hard choices and the fall of the {n}.",
+    "Build, fight and survive in a {a} land shaped by the {n}.",
+    "Race against time across {a} tracks to claim the {n}.",
+]
+
+
+def _zipf_weights(n, exponent=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def synthetic_catalog(n_rows, seed=0):
+    """
+    Build a catalog DataFrame with the same columns as load_games()
+
+    Args:
+        n_rows: Number of games
+        seed: RNG seed; the same (n_rows, seed) always gives the same catalog
+
+    Returns:
+        pd.DataFrame: Synthetic catalog with ids 1..n_rows
+    """
+    rng = np.random.default_rng(seed)
+    adjectives = np.array(ADJECTIVES, dtype=object)
+    nouns = np.array(NOUNS, dtype=object)
+
+    adj = rng.choice(len(ADJECTIVES), n_rows, p=_zipf_weights(len(ADJECTIVES), 0.8))
+    noun = rng.choice(len(NOUNS), n_rows, p=_zipf_weights(len(NOUNS), 0.8))
+    suffix = rng.choice(np.array(SUFFIXES, dtype=object), n_rows)
+    titles = adjectives[adj] + " " + nouns[noun] + suffix
+
+    categories = rng.choice(np.array(CATEGORIES, dtype=object), n_rows, p=CATEGORY_WEIGHTS)
+
+    prices = rng.choice(PRICE_POINTS, n_rows, p=PRICE_WEIGHTS)
+    prices[rng.random(n_rows) < FREE_SHARE] = 0.0
+
+    # Skewed towards the top, like store ratings
+    ratings = np.round(1 + 4 * rng.beta(5, 1.6, n_rows), 1)
+
+    days = rng.integers(0, 16 * 365, n_rows)
+    release_dates = (np.datetime64("2010-01-01") + days.astype("timedelta64[D]")).astype(str)
+
+    developer_count = max(1, n_rows // 20)
+    developers = rng.choice(developer_count, n_rows, p=_zipf_weights(developer_count))
+
+    tag_codes = rng.choice(len(TAGS), (n_rows, 5), p=_zipf_weights(len(TAGS)))
+    tag_counts = rng.integers(2, 6, n_rows)
+    tag_names = np.array(TAGS, dtype=object)[tag_codes].tolist()
+    tags = [list(dict.fromkeys(row[:k])) for row, k in zip(tag_names, tag_counts.tolist())]
+
+    template = rng.integers(0, len(DESCRIPTIONS), n_rows)
+    descriptions = [
+        DESCRIPTIONS[t].format(a=ADJECTIVES[a].lower(), n=NOUNS[b].lower(), c=c.lower())
+        for t, a, b, c in zip(template.tolist(), adj.tolist(), noun.tolist(), categories)
+    ]
+
+    games_df = pd.DataFrame({
+        "id": np.arange(1, n_rows + 1, dtype=np.int64),
+        "title": titles,
+        "price": prices,
+        "category": categories,
+        "tags": tags,
+        "description": descriptions,
+        "rating": ratings,
+        "release_date": release_dates,
+        "developer": [f"Studio {i:05d}" for i in developers.tolist()],
+        "image_url": "",
+    })
+    games_df.attrs["version"] = f"synthetic-{n_rows}-{seed}"
+    return games_df
@@ -0,0 +1,78 @@
+"""
+Build Catalog Snapshot Script
+Compile a catalog source into a versioned snapshot the app maps at startup
+
+The snapshot holds the columnar catalog, the title search index, facet
+bitmaps, sort permutations and a thumbnail manifest. Each build goes into
+its own version directory and is switched on by rewriting CURRENT, so
+running apps pick it up on their next rerun without a restart. Point the
+app at the snapshot with GAMEVERSE_CATALOG_SNAPSHOT.
+
+Usage:
+    python build_catalog.py knowledge/games.csv
+    python build_catalog.py --builtin --out .cache/catalog
+    python build_catalog.py big_catalog.parquet --keep 1
+    python build_catalog.py big_catalog.parquet --compact --memory-report
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from data.compact import compact_catalog, memory_report
+from data.snapshot import Snapshot, compile_snapshot, current_version, read_source
+
+DEFAULT_OUT = Path(".cache") / "catalog"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile a catalog source into a versioned snapshot."
+    )
+    parser.add_argument("source", nargs="?", type=Path,
+                        help="knowledge/games.csv, or a CSV/Parquet file with catalog columns.")
+    parser.add_argument("--builtin", action="store_true",
+                        help="Compile the built-in catalog from data/games_data.py.")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT,
+                        help=f"Snapshot directory (default: {DEFAULT_OUT}).")
+    parser.add_argument("--keep", type=int, default=3,
+                        help="Old versions to keep for rollback.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Store the catalog in the compact schema (see data/compact.py).")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Print memory per column of the loaded snapshot.")
+    args = parser.parse_args()
+
+    if args.builtin == bool(args.source):
+        parser.error("pass either a source file or --builtin")
+
+    start = time.perf_counter()
+    if args.builtin:
+        from data.games_data import _builtin_games
+        games_df, source = _builtin_games(), "builtin"
+    else:
+        games_df, source = read_source(args.source), args.source
+    if args.compact:
+        games_df = compact_catalog(games_df)
+    read_time = time.perf_counter() - start
+
+    previous = current_version(args.out)
+    start = time.perf_counter()
+    version = compile_snapshot(games_df, args.out, source=source, keep=args.keep)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    snapshot = Snapshot(args.out / version)
+    load_time = time.perf_counter() - start
+
+    print(f"📦 {len(games_df)} games from {source} (read in {read_time:.2f}s)")
+    print(f"✅ Snapshot {version} built in {build_time:.2f}s at {args.out / version}")
+    print(f"   {len(snapshot.facet_names)} facets, {len(snapshot.search.keys)} trigrams, "
+          f"loads in {load_time * 1000:.1f}ms")
+    if previous == version:
+        print("   Catalog unchanged, CURRENT already pointed here")
+    elif previous:
+        print(f"   CURRENT switched from {previous}")
+    if args.memory_report:
+        print("\n" + memory_report(snapshot.df).to_string(float_format=lambda x: f"{x:,.1f}"))
+    print(f"\nRun the app with: GAMEVERSE_CATALOG_SNAPSHOT={args.out} streamlit run app.py")
@@ -0,0 +1,150 @@
+"""
+GameVerse Autocomplete
+Prefix completions over titles, developers and tags
+"""
+
+import bisect
+
+import numpy as np
+import streamlit as st
+
+KINDS = ("title", "developer", "tag")
+DEFAULT_LIMIT = 8
+# Prefix ranges wider than this are answered once, then memoized
+MEMO_RANGE = 4096
+MEMO_SIZE = 10_000
+_MAX_CHAR = chr(0x10FFFF)
+
+
+def _word_starts(text):
+    """Lowercased text from each word onwards, so "leg" finds "Mystic Legends" """
+    text = " ".join(text.lower().split())
+    starts = [text]
+    for i, char in enumerate(text):
+        if char == " " and i + 1 < len(text):
+            starts.append(text[i + 1:])
+    return starts
+
+
+class Autocomplete:
+    """
+    Completions from sorted keys and binary search
+
+    Every suggestion (a distinct title, developer or tag) is filed under
+    each of its word starts in one sorted key list. A prefix maps to a
+    contiguous key range via bisect, and the best suggestions in that
+    range are the ones with the lowest precomputed rank, picked with
+    argpartition instead of a sort.
+
+    Titles rank by rating; developers and tags by the best rating among
+    their games, then by how many games they have.
+    """
+
+    def __init__(self, labels, kinds, keys, key_rank):
+        self.labels = labels
+        self.kinds = kinds
+        self.keys = keys
+        self.key_rank = key_rank
+        self._memo = {}
+
+    @classmethod
+    def build(cls, games_df):
+        """Index a catalog DataFrame"""
+        best = {}  # (kind, label) -> [best rating, games]
+        ratings = games_df['rating'].to_numpy(dtype=np.float64, na_value=0.0)
+        columns = (
+            ("title", games_df['title'].astype(str).tolist()),
+            ("developer", games_df['developer'].astype(str).tolist()),
+        )
+        for kind, values in columns:
+            for label, rating in zip(values, ratings.tolist()):
+                entry = best.setdefault((kind, label), [rating, 0])
+                entry[0] = max(entry[0], rating)
+                entry[1] += 1
+        for tags, rating in zip(games_df['tags'].tolist(), ratings.tolist()):
+            for tag in dict.fromkeys(tags):
+                entry = best.setdefault(("tag", str(tag)), [rating, 0])
+                entry[0] = max(entry[0], rating)
+                entry[1] += 1
+
+        suggestions = sorted(best.items(), key=lambda item: (-item[1][0], -item[1][1], item[0][1]))
+        labels = [label for (_, label), _ in suggestions]
+        kinds = [kind for (kind, _), _ in suggestions]
+
+        pairs = sorted(
+            (key, rank)
+            for rank, label in enumerate(labels)
+            if label.strip()
+            for key in _word_starts(label)
+        )
+        keys = [key for key, _ in pairs]
+        key_rank = np.fromiter((rank for _, rank in pairs), dtype=np.int32, count=len(pairs))
+        # Suggestions are stored in rank order, so a rank is also the index
+        return cls(labels, kinds, keys, key_rank)
+
+    def _top(self, lo, hi, limit):
+        ranks = self.key_rank[lo:hi]
+        # Over-fetch: one suggestion can sit under several word starts
+        want = min(len(ranks), limit * 2)
+        if want < len(ranks):
+            ranks = ranks[np.argpartition(ranks, want - 1)[:want]]
+        return np.unique(ranks)[:limit]
+
+    def complete(self, prefix, limit=DEFAULT_LIMIT, kinds=KINDS):
+        """
+        Best completions for what the user has typed so far
+
+        Args:
+            prefix: Typed text; matched case-insensitively at word starts
+            limit: Maximum suggestions
+            kinds: Suggestion kinds to include
+
+        Returns:
+            list: {"text", "kind"} dicts, best first
+        """
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + _MAX_CHAR, lo)
+        if lo == hi:
+            return []
+
+        # Over-fetch when filtering by kind so the filter rarely runs dry
+        fetch = limit if kinds == KINDS else limit * 4
+        if hi - lo > MEMO_RANGE:
+            memo_key = (prefix, fetch)
+            top = self._memo.get(memo_key)
+            if top is None:
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                top = self._memo[memo_key] = self._top(lo, hi, fetch)
+        else:
+            top = self._top(lo, hi, fetch)
+
+        results = [{"text": self.labels[i], "kind": self.kinds[i]}
+                   for i in top.tolist() if self.kinds[i] in kinds]
+        return results[:limit]
+
+
+@st.cache_resource(max_entries=2)
+def get_autocomplete(version, _games_df):
+    """
+    Autocomplete for a catalog version, built once and shared by sessions
+
+    Args:
+        version: Catalog version (games_df.attrs["version"]), the cache key
+        _games_df: The catalog; not hashed
+
+    Returns:
+        Autocomplete: Index over the catalog
+    """
+    return Autocomplete.build(_games_df)
+
+
+def complete(games_df, prefix, limit=DEFAULT_LIMIT, kinds=KINDS):
+    """Completions for the loaded catalog (see Autocomplete.complete)"""
+    version = games_df.attrs.get("version")
+    if version is None:
+        return Autocomplete.build(games_df).complete(prefix, limit, kinds)
+    return get_autocomplete(version, games_df).complete(prefix, limit, kinds)
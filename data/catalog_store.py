@@ -0,0 +1,124 @@
+"""
+GameVerse Catalog Store
+Memory-mapped Arrow IPC catalog shared by every app process
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# Set to a file path to serve the catalog from a shared memory-mapped file
+CATALOG_PATH_ENV = "GAMEVERSE_CATALOG_PATH"
+VERSION_KEY = b"gameverse.version"
+
+
+def catalog_version(table):
+    """Content hash of a catalog table, stable across processes"""
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema.remove_metadata()) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue()).hexdigest()[:16]
+
+
+def _index_path(path):
+    return path.with_name(path.stem + ".indexes.arrow")
+
+
+def _write_atomic(path, table):
+    """Write an uncompressed (mappable) IPC file, then rename it into place"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def publish_catalog(games_df, path, indexes=None):
+    """
+    Publish a catalog and its indexes for other processes to map
+
+    The index file is written first and the catalog last, each with an
+    atomic rename, so readers never see a half-written catalog.
+
+    Args:
+        games_df: Catalog DataFrame
+        path: Catalog file; indexes go to "<stem>.indexes.arrow" next to it
+        indexes: Optional {name: 1-D numeric array}, e.g. sort permutations
+
+    Returns:
+        str: Version (content hash) of the published catalog
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(games_df, preserve_index=False)
+    version = catalog_version(table)
+
+    # One row, one list column per index: values stay contiguous and map
+    # straight back to NumPy
+    index_table = pa.table({
+        name: pa.array([np.asarray(values)]) for name, values in (indexes or {}).items()
+    }) if indexes else pa.table({})
+    index_table = index_table.replace_schema_metadata({VERSION_KEY: version})
+    _write_atomic(_index_path(path), index_table)
+
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           VERSION_KEY: version})
+    _write_atomic(path, table)
+    return version
+
+
+class MappedCatalog:
+    """
+    A published catalog mapped into this process
+
+    ``df`` is backed by Arrow buffers in the memory map (pd.ArrowDtype
+    columns), so every process shares the same physical pages and nothing
+    is parsed or copied at start-up. ``indexes`` are zero-copy NumPy views.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.table = ipc.open_file(pa.memory_map(str(self.path), "r")).read_all()
+        self.version = self.table.schema.metadata[VERSION_KEY].decode()
+
+        self.df = self.table.to_pandas(types_mapper=_arrow_dtype)
+        self.df.attrs["version"] = self.version
+
+        self.indexes = {}
+        index_path = _index_path(self.path)
+        if index_path.exists():
+            index_table = ipc.open_file(pa.memory_map(str(index_path), "r")).read_all()
+            index_version = (index_table.schema.metadata or {}).get(VERSION_KEY, b"").decode()
+            if index_version == self.version:
+                for name in index_table.column_names:
+                    values = index_table.column(name).chunk(0).values
+                    self.indexes[name] = values.to_numpy(zero_copy_only=True)
+
+    @property
+    def nbytes(self):
+        """Size of the mapped catalog data"""
+        return self.table.nbytes
+
+
+def _arrow_dtype(arrow_type):
+    """Arrow-backed pandas columns, except dictionary columns (compact
+    catalogs' categories), which become pandas categoricals"""
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def map_catalog(path):
+    """Map a published catalog (see publish_catalog)"""
+    return MappedCatalog(path)
@@ -0,0 +1,307 @@
+"""
+GameVerse Catalog Watcher
+Hot catalog reloads: source changes applied to the current snapshot as
+row-level deltas
+
+The watcher polls a catalog source file (anything read_source accepts).
+When it changes, the new rows are matched to the current snapshot's by
+id, and only the added, removed and changed rows are re-indexed: the id
+index, title trigrams, facet bitmaps, tag incidence and thumbnails of
+every other row are carried over. The result is published as a new
+snapshot version with compile_snapshot, so running apps switch to it on
+their next rerun, with no restart and no cold rebuild.
+
+Kept rows stay where they were and new games are appended, so the
+catalog order of a long-running snapshot can differ from the source
+file's.
+
+Usage:
+    python watch_catalog.py knowledge/games.csv --out .cache/catalog
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data.compact import compact_catalog
+from data.facets import update_facet_bitmaps
+from data.snapshot import (THUMBNAILS_FILE, build_thumbnail_manifest, compile_snapshot,
+                           current_version, load_snapshot, read_source)
+from data.sorting import SORT_KEYS, sort_order
+
+POLL_INTERVAL = 2.0  # seconds between checks of the source file
+
+# Columns each derived structure is built from
+TITLE_COLUMNS = ["title"]
+FACET_COLUMNS = ["category", "price"]
+TAG_COLUMNS = ["tags"]
+THUMBNAIL_COLUMNS = ["image_url"]
+
+
+class CatalogDelta:
+    """
+    Rows that differ between two catalog versions, matched by id
+
+    ``changed`` maps each column to the ids whose value in it changed.
+    """
+
+    def __init__(self, added_ids, removed_ids, changed):
+        self.added_ids = added_ids
+        self.removed_ids = removed_ids
+        self.changed = changed
+
+    @property
+    def changed_ids(self):
+        ids = [ids for ids in self.changed.values() if len(ids)]
+        return np.unique(np.concatenate(ids)) if ids else np.zeros(0, dtype=np.int64)
+
+    def __bool__(self):
+        return bool(len(self.added_ids) or len(self.removed_ids) or len(self.changed_ids))
+
+    def summary(self):
+        columns = ", ".join(f"{column} ({len(ids)})" for column, ids in self.changed.items()
+                            if len(ids))
+        return (f"{len(self.added_ids)} added, {len(self.removed_ids)} removed, "
+                f"{len(self.changed_ids)} changed" + (f": {columns}" if columns else ""))
+
+
+def _arrow_values(column):
+    """A catalog column as a flat Arrow array that compares by value"""
+    array = pa.array(column.astype(str) if isinstance(column.dtype, pd.CategoricalDtype)
+                     else column, from_pandas=True)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if pa.types.is_list(array.type):
+        # One string per tag list; \x1f never appears in a tag
+        array = pc.binary_join(array.cast(pa.list_(pa.large_string())),
+                                pa.scalar("\x1f", pa.large_string()))
+    elif pa.types.is_string(array.type):
+        array = array.cast(pa.large_string())
+    return array
+
+
+def _values_differ(old, new):
+    """Elementwise old != new for two aligned columns of any catalog dtype"""
+    if pd.api.types.is_numeric_dtype(old.dtype) and pd.api.types.is_numeric_dtype(new.dtype):
+        old = old.to_numpy(dtype=np.float64, na_value=np.nan)
+        new = new.to_numpy(dtype=np.float64, na_value=np.nan)
+        return (old != new) & ~(np.isnan(old) & np.isnan(new))
+    old, new = _arrow_values(old), _arrow_values(new)
+    if new.type != old.type:
+        new = new.cast(old.type)
+    differ = pc.fill_null(pc.not_equal(old, new), False)
+    differ = pc.or_(differ, pc.xor(pc.is_null(old), pc.is_null(new)))
+    return differ.to_numpy(zero_copy_only=False)
+
+
+def _dirty_rows(changed, columns, n_kept, n_rows):
+    """New rows to re-index for a structure built from ``columns``"""
+    dirty = np.zeros(n_kept, dtype=bool)
+    for column in columns:
+        dirty |= changed[column]
+    return np.concatenate([np.flatnonzero(dirty), np.arange(n_kept, n_rows)])
+
+
+def _drop_rows(row_map, kept, dirty, n_kept):
+    """row_map with the old rows behind ``dirty`` new rows dropped"""
+    row_map = row_map.copy()
+    row_map[kept[dirty[dirty < n_kept]]] = -1
+    return row_map
+
+
+def apply_delta(snapshot, source_df):
+    """
+    Carry a snapshot's indexes over to a new version of its catalog
+
+    Args:
+        snapshot: The current Snapshot
+        source_df: The new catalog, in the catalog schema
+
+    Returns:
+        tuple: (catalog DataFrame, artifacts for compile_snapshot, CatalogDelta);
+            the DataFrame is None when nothing changed
+    """
+    old_df = snapshot.df
+    if isinstance(old_df["category"].dtype, pd.CategoricalDtype):
+        source_df = compact_catalog(source_df)  # keep the snapshot's schema
+
+    # Match rows by id: kept rows keep their position, new ones go last
+    source_ids = source_df["id"].to_numpy(dtype=np.int64)
+    source_order = np.argsort(source_ids, kind="stable")
+    sorted_ids = source_ids[source_order]
+    old_ids = old_df["id"].to_numpy(dtype=np.int64)
+    pos = np.minimum(np.searchsorted(sorted_ids, old_ids), max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[pos] == old_ids if len(sorted_ids) else np.zeros(len(old_ids), bool)
+    kept = np.flatnonzero(found)
+    used = np.zeros(len(source_df), dtype=bool)
+    used[source_order[pos[kept]]] = True
+    added = np.flatnonzero(~used)
+    games_df = source_df.iloc[np.concatenate([source_order[pos[kept]], added])] \
+        .reset_index(drop=True)
+
+    n_kept, n_rows = len(kept), len(games_df)
+    kept_df = old_df.iloc[kept]
+    changed = {
+        column: _values_differ(kept_df[column], games_df[column].iloc[:n_kept])
+        for column in games_df.columns if column != "id"
+    }
+    delta = CatalogDelta(
+        added_ids=games_df["id"].to_numpy(dtype=np.int64)[n_kept:],
+        removed_ids=old_ids[~found],
+        changed={column: old_ids[kept][mask] for column, mask in changed.items()},
+    )
+    if not delta:
+        return None, None, delta
+
+    row_map = np.full(len(old_df), -1, dtype=np.int64)
+    row_map[kept] = np.arange(n_kept)
+    indexes = {}
+
+    # Ids: surviving entries stay sorted; new ids are merged in
+    id_rows = row_map[snapshot.indexes["id_order"]]
+    id_sorted = snapshot.indexes["id_sorted"][id_rows >= 0]
+    id_order = id_rows[id_rows >= 0]
+    new_ids = games_df["id"].to_numpy(dtype=np.int64)[n_kept:]
+    new_order = np.argsort(new_ids, kind="stable")
+    at = np.searchsorted(id_sorted, new_ids[new_order])
+    indexes["id_sorted"] = np.insert(id_sorted, at, new_ids[new_order])
+    indexes["id_order"] = np.insert(id_order, at, n_kept + new_order).astype(np.int32)
+
+    rows = _dirty_rows(changed, TITLE_COLUMNS, n_kept, n_rows)
+    search = snapshot.search.update(_drop_rows(row_map, kept, rows, n_kept), n_rows, rows,
+                                    games_df["title"].iloc[rows].astype(str))
+    indexes.update(search.to_arrays())
+
+    rows = _dirty_rows(changed, FACET_COLUMNS, n_kept, n_rows)
+    facet_names, facet_bits = update_facet_bitmaps(
+        snapshot.facet_names,
+        snapshot.indexes["facet_bits"].reshape(len(snapshot.facet_names), -1),
+        _drop_rows(row_map, kept, rows, n_kept), n_rows, rows,
+        games_df["category"].iloc[rows].to_numpy(dtype=object),
+        games_df["price"].iloc[rows].to_numpy(dtype=np.float64),
+    )
+    indexes["facet_bits"] = facet_bits.ravel()
+
+    rows = _dirty_rows(changed, TAG_COLUMNS, n_kept, n_rows)
+    tag_index = snapshot.tag_index.update(_drop_rows(row_map, kept, rows, n_kept), n_rows, rows,
+                                          games_df["tags"].iloc[rows].tolist())
+    indexes.update(tag_index.to_arrays())
+
+    # A sort order only moves when its column or the set of rows changes;
+    # the argsorts are vectorized, so changed ones are simply redone
+    same_rows = n_kept == n_rows == len(old_df)
+    for option, (column, _) in SORT_KEYS.items():
+        name = f"sort_{option}"
+        if same_rows and not changed[column].any() and name in snapshot.indexes:
+            indexes[name] = snapshot.indexes[name]
+        else:
+            indexes[name] = sort_order(games_df, option)
+
+    rows = _dirty_rows(changed, THUMBNAIL_COLUMNS, n_kept, n_rows)
+    if same_rows and not len(rows):
+        thumbnails = snapshot.path / THUMBNAILS_FILE
+    else:
+        removed = {str(game_id) for game_id in delta.removed_ids.tolist()}
+        thumbnails = {game_id: entry for game_id, entry in snapshot.thumbnails.items()
+                      if game_id not in removed}
+        thumbnails.update(build_thumbnail_manifest(games_df.iloc[rows]))
+
+    artifacts = {
+        "indexes": indexes,
+        "facets": facet_names,
+        "facet_row_bytes": int(facet_bits.shape[1]) if facet_bits.size else 0,
+        "tags": tag_index.names,
+        "thumbnails": thumbnails,
+    }
+    return games_df, artifacts, delta
+
+
+class CatalogWatcher:
+    """
+    Publishes every change to a catalog source as a new snapshot version
+
+    Changes are noticed by the source's modification time and size; a
+    file rewritten with the same rows publishes nothing. Rows are
+    compared by id, so ids must be unique; sources with duplicate ids,
+    and snapshots without tag indexes, are compiled from scratch.
+    """
+
+    def __init__(self, source, root, keep=3, compact=False, interval=POLL_INTERVAL):
+        self.source = Path(source)
+        self.root = Path(root)
+        self.keep = keep
+        self.compact = compact
+        self.interval = interval
+        self._seen = None
+
+    def _signature(self):
+        try:
+            stat = self.source.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self):
+        """
+        Reload if the source changed since the last check
+
+        Returns:
+            tuple or None: (version, CatalogDelta or None) as from reload,
+                None when the source is unchanged or missing
+        """
+        signature = self._signature()
+        if signature is None or signature == self._seen:
+            return None
+        self._seen = signature
+        return self.reload()
+
+    def reload(self):
+        """
+        Read the source and publish it if it differs from CURRENT
+
+        Returns:
+            tuple: (current version, CatalogDelta; None after a full build)
+        """
+        source_df = read_source(self.source)
+        if current_version(self.root) is None or not source_df["id"].is_unique:
+            return self._compile(source_df), None
+
+        snapshot = load_snapshot(self.root)
+        if snapshot.tag_index is None:
+            return self._compile(source_df), None
+
+        games_df, artifacts, delta = apply_delta(snapshot, source_df)
+        if games_df is None:
+            return snapshot.version, delta
+        version = compile_snapshot(games_df, self.root, source=self.source, keep=self.keep,
+                                   artifacts=artifacts)
+        return version, delta
+
+    def _compile(self, source_df):
+        if self.compact:
+            source_df = compact_catalog(source_df)
+        return compile_snapshot(source_df, self.root, source=self.source, keep=self.keep)
+
+    def run(self, on_reload=None):
+        """
+        Check the source every ``interval`` seconds until interrupted
+
+        Args:
+            on_reload: Optional callback(version, delta, seconds) after each
+                reload; errors (e.g. a half-written file) go to
+                callback(None, error, seconds) and are retried on the
+                source's next change
+        """
+        while True:
+            start = time.perf_counter()
+            try:
+                result = self.check()
+            except Exception as e:
+                result = (None, e)
+            if result is not None and on_reload is not None:
+                on_reload(*result, time.perf_counter() - start)
+            time.sleep(self.interval)
@@ -0,0 +1,141 @@
+"""
+GameVerse Compact Catalog
+Memory-compact column encodings for large catalogs
+
+The default catalog holds tags as Python lists, repeats every category
+and developer name per row, keeps dates as text and numbers as 64-bit
+values. The compact schema stores the same columns (same names, same
+row order) as:
+
+    id                        int32 (int64 if ids don't fit)
+    title, description,
+    image_url                 Arrow strings: one buffer plus offsets
+    category, developer       pandas categoricals: a small integer code per row
+    price, rating             float32: the nearest float32 to each value, so
+                              59.99 reads back as 59.9900016...; round
+                              to cents before adding prices up
+    release_date              Arrow date32, parsed once
+    tags                      Arrow list of dictionary-encoded strings:
+                              offsets plus a small integer code per tag
+
+Opt in with GAMEVERSE_COMPACT_CATALOG=1 (see data.games_data.load_games)
+or ``build_catalog.py --compact``.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Set to 1 to load the catalog in the compact schema
+COMPACT_ENV = "GAMEVERSE_COMPACT_CATALOG"
+
+ARROW_STRING = pd.ArrowDtype(pa.string())
+STRING_COLUMNS = ["title", "description", "image_url"]
+CATEGORICAL_COLUMNS = ["category", "developer"]
+
+
+def compact_enabled():
+    """Whether GAMEVERSE_COMPACT_CATALOG asks for the compact schema"""
+    return os.getenv(COMPACT_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _compact_ids(ids):
+    ids = ids.to_numpy(dtype=np.int64)
+    info = np.iinfo(np.int32)
+    if len(ids) and (ids.min() < info.min or ids.max() > info.max):
+        return ids
+    return ids.astype(np.int32)
+
+
+def _compact_dates(dates):
+    """Dates as Arrow date32; unparseable ones become missing"""
+    parsed = pd.to_datetime(dates.astype(str), errors="coerce", format="mixed")
+    return pd.Series(pa.array(parsed.dt.date, type=pa.date32(), from_pandas=True),
+                     index=dates.index, dtype=pd.ArrowDtype(pa.date32()))
+
+
+def _compact_tags(tags):
+    """Tag lists as offsets into one array of dictionary codes"""
+    lists = pa.array([list(row) for row in tags.tolist()], type=pa.list_(pa.string()))
+    values = lists.values.dictionary_encode()
+    if len(values.dictionary) < np.iinfo(np.int16).max:
+        values = values.cast(pa.dictionary(pa.int16(), pa.string()))
+    encoded = pa.ListArray.from_arrays(lists.offsets, values)
+    return pd.Series(encoded, index=tags.index, dtype=pd.ArrowDtype(encoded.type))
+
+
+def compact_catalog(games_df):
+    """
+    Re-encode a catalog in the compact schema
+
+    Already compact columns are passed through, so this is safe to call
+    twice. The index and attrs (catalog version) are kept.
+
+    Args:
+        games_df: Catalog DataFrame in the catalog schema
+
+    Returns:
+        pd.DataFrame: The same catalog with compact dtypes
+    """
+    compact = games_df.copy(deep=False)
+    if "id" in compact:
+        compact["id"] = _compact_ids(compact["id"])
+    for column in STRING_COLUMNS:
+        if column in compact and compact[column].dtype != ARROW_STRING:
+            compact[column] = compact[column].astype(str).astype(ARROW_STRING)
+    for column in CATEGORICAL_COLUMNS:
+        if column in compact and not isinstance(compact[column].dtype, pd.CategoricalDtype):
+            compact[column] = compact[column].astype(str).astype("category")
+    for column in ("price", "rating"):
+        if column in compact:
+            compact[column] = compact[column].to_numpy(dtype=np.float32, na_value=np.nan)
+    if "release_date" in compact and not _is_arrow(compact["release_date"], pa.types.is_date):
+        compact["release_date"] = _compact_dates(compact["release_date"])
+    if "tags" in compact and not _is_arrow(compact["tags"], pa.types.is_list):
+        compact["tags"] = _compact_tags(compact["tags"])
+    compact.attrs = dict(games_df.attrs)
+    return compact
+
+
+def _is_arrow(column, is_type):
+    return isinstance(column.dtype, pd.ArrowDtype) and is_type(column.dtype.pyarrow_dtype)
+
+
+def memory_report(games_df, baseline_df=None):
+    """
+    Memory held by each column, counting the strings behind object columns
+
+    Tag lists in an object column are counted as lists; the tag strings
+    they share aren't, so the default schema's figure is a lower bound.
+
+    Args:
+        games_df: Catalog DataFrame
+        baseline_df: Optional second encoding of the same catalog to
+            compare against (e.g. the default schema)
+
+    Returns:
+        pd.DataFrame: One row per column plus a "total" row, with dtype,
+            bytes and bytes per row (and the baseline's, with the ratio,
+            when given)
+    """
+    report = _column_bytes(games_df)
+    if baseline_df is not None:
+        baseline = _column_bytes(baseline_df)
+        report = report.join(baseline.add_prefix("baseline_"), how="left")
+        report["ratio"] = report["baseline_bytes"] / report["bytes"]
+    return report
+
+
+def _column_bytes(games_df):
+    usage = games_df.memory_usage(deep=True, index=False)
+    n_rows = max(len(games_df), 1)
+    report = pd.DataFrame({
+        "dtype": [str(games_df[column].dtype) for column in usage.index],
+        "bytes": usage.to_numpy(),
+    }, index=usage.index)
+    report.loc["total"] = ["", int(usage.sum())]
+    report["bytes"] = report["bytes"].astype(np.int64)
+    report["bytes_per_row"] = report["bytes"] / n_rows
+    return report
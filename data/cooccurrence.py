@@ -0,0 +1,208 @@
+"""
+GameVerse Co-occurrence Recommender
+"Customers also bought" from cart, wishlist and checkout events
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+
+from data.games_data import get_game_by_id
+
+DEFAULT_DB_PATH = Path(
+    os.getenv("GAMEVERSE_EVENTS_DB", Path(__file__).parent.parent / ".cache" / "cooccurrence.db")
+)
+# How much one event says two games go together
+CART_WEIGHT = 1.0
+WISHLIST_WEIGHT = 0.5
+CHECKOUT_WEIGHT = 3.0
+TOP_K = 20  # neighbours precomputed per game
+BATCH_SIZE = 64  # pairs buffered before they are merged into the counts
+FLUSH_INTERVAL = 5.0  # seconds; older buffered pairs are merged on the next call
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairs (
+    game_id INTEGER NOT NULL,
+    other_id INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    kind TEXT NOT NULL,
+    recorded_at REAL NOT NULL
+);
+"""
+_LOW_BITS = (1 << 32) - 1
+
+
+class CooccurrenceModel:
+    """
+    Item-item co-occurrence counts with precomputed top neighbours
+
+    Counts live in a sparse matrix stored as sorted (game, other) pair
+    keys and their weights. Events are buffered and merged in batches:
+    one vectorized sort-and-sum per batch, after which only the games
+    whose rows changed get their top neighbours recomputed. Reads are
+    dictionary lookups.
+
+    Every pair is also appended to SQLite and replayed on start-up, so
+    the model survives restarts. Other processes' events show up after
+    their next restart.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, top_k=TOP_K, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._weights = np.zeros(0, dtype=np.float64)
+        self._top = {}  # game id -> (neighbour ids, weights), best first
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._replay()
+
+    def _replay(self):
+        rows = self._conn.execute(
+            "SELECT game_id, other_id, SUM(weight) FROM pairs GROUP BY game_id, other_id"
+        ).fetchall()
+        if rows:
+            with self._lock:
+                self._merge(np.array(rows, dtype=np.float64))
+
+    # --- events ---
+
+    def record(self, game_ids, context_ids=(), weight=CART_WEIGHT, kind="cart"):
+        """
+        Record that games were picked together
+
+        Args:
+            game_ids: Games just added (or bought)
+            context_ids: Games they were picked alongside, e.g. the cart
+            weight: Strength of the signal (see the *_WEIGHT constants)
+            kind: Event kind, kept in the log
+        """
+        items = set(game_ids) | set(context_ids)
+        pairs = set()
+        for game_id in game_ids:
+            for other_id in items:
+                if other_id != game_id:
+                    pairs.add((game_id, other_id))
+                    pairs.add((other_id, game_id))
+        if not pairs:
+            return
+        now = time.time()
+        with self._lock:
+            self._pending.extend((int(a), int(b), weight, kind, now) for a, b in pairs)
+            self._flush_if_due()
+
+    def flush(self):
+        """Merge buffered events now"""
+        with self._lock:
+            self._flush()
+
+    def _flush_if_due(self):
+        if self._pending and (len(self._pending) >= self.batch_size or
+                              time.monotonic() - self._last_flush >= self.flush_interval):
+            self._flush()
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO pairs (game_id, other_id, weight, kind, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                pending,
+            )
+        self._merge(np.array([row[:3] for row in pending], dtype=np.float64))
+
+    def _merge(self, pairs):
+        """Add (game, other, weight) rows to the counts; refresh changed rows"""
+        games = pairs[:, 0].astype(np.int64)
+        keys, inverse = np.unique((games << 32) | pairs[:, 1].astype(np.int64),
+                                  return_inverse=True)
+        weights = np.bincount(inverse, weights=pairs[:, 2], minlength=len(keys))
+
+        # Only the batch is sorted; it is merged into the sorted counts in place
+        pos = np.searchsorted(self._keys, keys)
+        found = pos < len(self._keys)
+        found[found] = self._keys[pos[found]] == keys[found]
+        self._weights[pos[found]] += weights[found]
+        self._keys = np.insert(self._keys, pos[~found], keys[~found])
+        self._weights = np.insert(self._weights, pos[~found], weights[~found])
+
+        for game_id in np.unique(games).tolist():
+            lo = np.searchsorted(self._keys, game_id << 32)
+            hi = np.searchsorted(self._keys, (game_id + 1) << 32)
+            weights = self._weights[lo:hi]
+            best = np.argsort(-weights, kind="stable")[:self.top_k]
+            self._top[game_id] = ((self._keys[lo:hi][best] & _LOW_BITS), weights[best])
+
+    # --- reads ---
+
+    def also_bought(self, game_id, k=4):
+        """Games most often picked with ``game_id``, best first"""
+        with self._lock:
+            self._flush_if_due()
+        top = self._top.get(int(game_id))
+        return top[0][:k].tolist() if top else []
+
+    def recommend(self, game_ids, k=4, exclude_ids=()):
+        """
+        Games most often picked with any of ``game_ids``
+
+        Sums the precomputed neighbour weights of each game, so the cost
+        depends on how many games are passed, not on the catalog size.
+
+        Returns:
+            list: Game ids, best first, excluding game_ids and exclude_ids
+        """
+        with self._lock:
+            self._flush_if_due()
+        game_ids = {int(game_id) for game_id in game_ids}
+        skip = game_ids | {int(game_id) for game_id in exclude_ids}
+        scores = {}
+        for game_id in game_ids & self._top.keys():
+            neighbours, weights = self._top[game_id]
+            for other_id, weight in zip(neighbours.tolist(), weights.tolist()):
+                if other_id not in skip:
+                    scores[other_id] = scores.get(other_id, 0.0) + weight
+        return sorted(scores, key=lambda other_id: (-scores[other_id], other_id))[:k]
+
+    def stats(self):
+        with self._lock:
+            return {"pairs": len(self._keys), "games": len(self._top),
+                    "pending": len(self._pending)}
+
+
+@st.cache_resource
+def get_cooccurrence_model():
+    """Process-wide co-occurrence model, shared by all sessions"""
+    return CooccurrenceModel()
+
+
+def customers_also_bought(games_df, game_ids, k=4, exclude_ids=()):
+    """
+    Co-occurrence recommendations as game dicts
+
+    Games missing from the current catalog are skipped.
+    """
+    games = []
+    for game_id in get_cooccurrence_model().recommend(game_ids, k * 2, exclude_ids):
+        game = get_game_by_id(games_df, game_id)
+        if game is not None:
+            games.append(game)
+    return games[:k]
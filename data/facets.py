@@ -0,0 +1,329 @@
+"""
+GameVerse Catalog Facets
+Price buckets and packed per-facet row bitmaps
+"""
+
+import numpy as np
+
+PRICE_RANGES = ["Free", "Under $20", "$20-$40", "$40+"]
+PRICE_BINS = 4  # disjoint: free, (0, 20), [20, 40], (40, inf)
+
+
+def price_range_mask(prices, price_range):
+    """
+    Rows whose price falls in a Browse price range
+
+    Args:
+        prices: Array-like of prices
+        price_range: One of PRICE_RANGES, anything else matches all rows
+
+    Returns:
+        np.ndarray: Boolean mask
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if price_range == "Free":
+        return prices == 0
+    if price_range == "Under $20":
+        return prices < 20
+    if price_range == "$20-$40":
+        return (prices >= 20) & (prices <= 40)
+    if price_range == "$40+":
+        return prices > 40
+    return np.ones(len(prices), dtype=bool)
+
+
+def build_facet_bitmaps(games_df):
+    """
+    One packed bitmap per category and price range
+
+    Returns:
+        tuple: (facet names like "category:RPG" / "price:Free",
+            uint8 array of shape (n_facets, ceil(n_rows / 8)))
+    """
+    categories = games_df['category'].astype(str).to_numpy()
+    prices = games_df['price'].to_numpy(dtype=np.float64)
+
+    names, masks = [], []
+    for category in sorted(set(categories)):
+        names.append(f"category:{category}")
+        masks.append(categories == category)
+    for price_range in PRICE_RANGES:
+        names.append(f"price:{price_range}")
+        masks.append(price_range_mask(prices, price_range))
+
+    if not masks:
+        return names, np.zeros((0, 0), dtype=np.uint8)
+    return names, np.packbits(np.vstack(masks), axis=1)
+
+
+def unpack_bitmap(bits, n_rows):
+    """Packed bitmap row back to a boolean mask"""
+    return np.unpackbits(bits, count=n_rows).astype(bool)
+
+
+def update_facet_bitmaps(names, bits, row_map, n_rows, rows, categories, prices):
+    """
+    Facet bitmaps after a row-level change, recomputing only changed rows
+
+    Args:
+        names, bits: Facets as returned by build_facet_bitmaps
+        row_map: New row of each old row, -1 for rows removed or being
+            recomputed
+        n_rows: Rows after the change
+        rows: New rows to recompute
+        categories, prices: Their category and price
+
+    Returns:
+        tuple: (names, bits) as build_facet_bitmaps would give for the
+            updated catalog
+    """
+    row_map = np.asarray(row_map, dtype=np.int64)
+    kept = np.flatnonzero(row_map >= 0)
+    old = np.unpackbits(bits, axis=1, count=len(row_map)).astype(bool) if len(names) \
+        else np.zeros((0, len(row_map)), dtype=bool)
+    masks = {name: old[i] for i, name in enumerate(names)}
+
+    categories = np.asarray(categories, dtype=object).astype(str)
+    prices = np.asarray(prices, dtype=np.float64)
+    rows = np.asarray(rows, dtype=np.int64)
+    # Categories that still have a game, plus any the changed rows bring
+    in_use = {name.split(":", 1)[1] for name in names
+              if name.startswith("category:") and masks[name][kept].any()}
+    new_names = [f"category:{category}" for category in sorted(in_use | set(categories))]
+    new_names += [f"price:{price_range}" for price_range in PRICE_RANGES]
+
+    updated = np.zeros((len(new_names), n_rows), dtype=bool)
+    for i, name in enumerate(new_names):
+        if name in masks:
+            updated[i, row_map[kept]] = masks[name][kept]
+        kind, value = name.split(":", 1)
+        updated[i, rows] = categories == value if kind == "category" \
+            else price_range_mask(prices, value)
+    return new_names, np.packbits(updated, axis=1)
+
+
+def price_range_counts(prices):
+    """
+    Games per Browse price range, in one pass
+
+    Returns:
+        dict: {price range: count}; "Under $20" includes free games, as
+            in price_range_mask
+    """
+    return _price_range_dict(np.bincount(_price_bins(prices), minlength=PRICE_BINS).tolist())
+
+
+def _price_bins(prices):
+    """Disjoint price bins: 0 free, 1 (0, 20), 2 [20, 40], 3 (40, inf)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.where(prices == 0, 0, np.where(prices < 20, 1, np.where(prices <= 40, 2, 3)))
+
+
+def _price_range_dict(bin_counts):
+    """Counts per disjoint price bin as counts per Browse price range"""
+    free, cheap, mid, high = bin_counts
+    return {"Free": free, "Under $20": free + cheap, "$20-$40": mid, "$40+": high}
+
+
+def facet_codes(games_df):
+    """
+    Per-row facet codes, for counting every facet in one bincount
+
+    Returns:
+        tuple: (sorted category names, int32 array of shape (n_rows, 2)
+            holding each row's category code and its price bin offset by
+            the number of categories)
+    """
+    categories = games_df['category'].astype(str).to_numpy()
+    names, category_codes = np.unique(categories, return_inverse=True)
+    row_codes = np.empty((len(categories), 2), dtype=np.int32)
+    row_codes[:, 0] = category_codes.ravel()
+    row_codes[:, 1] = _price_bins(games_df['price'].to_numpy()) + len(names)
+    return [str(name) for name in names], row_codes
+
+
+def facet_codes_from_bitmaps(names, bits, n_rows):
+    """facet_codes read back from build_facet_bitmaps' packed bitmaps"""
+    categories = [name.split(":", 1)[1] for name in names if name.startswith("category:")]
+    masks = np.unpackbits(bits, axis=1, count=n_rows).astype(bool) if len(names) \
+        else np.zeros((0, n_rows), dtype=bool)
+    pos = {name: i for i, name in enumerate(names)}
+    price = {price_range: masks[pos[f"price:{price_range}"]] for price_range in PRICE_RANGES}
+    bins = np.where(price["Free"], 0, np.where(price["Under $20"], 1,
+                                                np.where(price["$20-$40"], 2, 3)))
+    row_codes = np.empty((n_rows, 2), dtype=np.int32)
+    row_codes[:, 0] = masks[:len(categories)].argmax(axis=0) if categories else 0
+    row_codes[:, 1] = bins + len(categories)
+    return categories, row_codes
+
+
+def facet_counts(categories, row_codes, rows, tag_index=None):
+    """
+    Games per category, price range and tag among ``rows``, from a single
+    bincount over their category codes, price bins and tag codes
+
+    Args:
+        categories, row_codes: As returned by facet_codes
+        rows: Row positions to count
+        tag_index: The catalog's TagIndex, None to skip tags
+
+    Returns:
+        dict: {"category": {name: n}, "price": {range: n}, "tags": {tag: n}},
+            leaving out categories and tags with no game
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n_fixed = len(categories) + PRICE_BINS
+    parts = [row_codes[rows].ravel()]
+    n_tags = 0
+    if tag_index is not None:
+        n_tags = len(tag_index.names)
+        lengths = tag_index.row_ptr[rows + 1] - tag_index.row_ptr[rows]
+        parts.append(tag_index.codes[_ranges(tag_index.row_ptr[rows], lengths)]
+                     + np.int32(n_fixed))
+    counts = np.bincount(np.concatenate(parts), minlength=n_fixed + n_tags)
+
+    category_counts = counts[:len(categories)]
+    tag_counts = counts[n_fixed:]
+    return {
+        "category": {categories[i]: int(category_counts[i])
+                     for i in np.flatnonzero(category_counts).tolist()},
+        "price": _price_range_dict(counts[len(categories):n_fixed].tolist()),
+        "tags": {tag_index.names[i]: int(tag_counts[i])
+                 for i in np.flatnonzero(tag_counts).tolist()} if tag_index is not None else {},
+    }
+
+
+def _ranges(starts, lengths):
+    """Concatenated aranges [start, start + length) without a Python loop"""
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+class TagIndex:
+    """
+    Game x tag incidence as integer codes
+
+    Tags are coded by sorted name. ``codes[row_ptr[r]:row_ptr[r + 1]]``
+    are the tags of row r; ``rows[tag_ptr[t]:tag_ptr[t + 1]]`` the rows
+    with tag t. Filtering touches only the selected tags' postings and
+    counting only the result's rows, never the Python tag lists.
+    """
+
+    def __init__(self, names, row_ptr, codes, tag_ptr, rows):
+        self.names = names
+        self.row_ptr = row_ptr
+        self.codes = codes
+        self.tag_ptr = tag_ptr
+        self.rows = rows
+        self.n_rows = len(row_ptr) - 1
+        self._code = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def build(cls, tag_lists):
+        """Index an iterable of tag lists; row i is the i-th list"""
+        tag_lists = [list(dict.fromkeys(str(tag) for tag in tags)) for tags in tag_lists]
+        names = sorted({tag for tags in tag_lists for tag in tags})
+        code = {name: i for i, name in enumerate(names)}
+        lengths = np.fromiter((len(tags) for tags in tag_lists), dtype=np.int64,
+                              count=len(tag_lists))
+        row_ptr = np.zeros(len(tag_lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=row_ptr[1:])
+        codes = np.fromiter((code[tag] for tags in tag_lists for tag in tags), dtype=np.int32,
+                            count=int(row_ptr[-1]))
+        return cls._from_rows(names, row_ptr, codes)
+
+    @classmethod
+    def _from_rows(cls, names, row_ptr, codes):
+        """Add the per-tag postings to row-ordered codes"""
+        row_of = np.repeat(np.arange(len(row_ptr) - 1, dtype=np.int32), np.diff(row_ptr))
+        order = np.argsort(codes, kind="stable")  # rows stay sorted per tag
+        tag_ptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(names)), out=tag_ptr[1:])
+        return cls(names, row_ptr, codes, tag_ptr, row_of[order])
+
+    def update(self, row_map, n_rows, rows, tag_lists):
+        """
+        The index after a row-level change, re-reading only changed rows
+
+        Args:
+            row_map: New row of each old row, -1 for rows removed or being
+                re-indexed; kept rows must keep their relative order
+            n_rows: Rows in the new index
+            rows: New rows to index
+            tag_lists: Their tags
+
+        Returns:
+            TagIndex: A new index, with tags no game has any more dropped
+        """
+        tag_lists = [list(dict.fromkeys(str(tag) for tag in tags)) for tags in tag_lists]
+        names = sorted(set(self.names).union(*tag_lists))
+        code = {name: i for i, name in enumerate(names)}
+        recode = np.array([code[name] for name in self.names], dtype=np.int32)
+
+        row_map = np.asarray(row_map, dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        kept = np.flatnonzero(row_map >= 0)
+        old_lengths = np.diff(self.row_ptr)
+        lengths = np.zeros(n_rows, dtype=np.int64)
+        lengths[row_map[kept]] = old_lengths[kept]
+        lengths[rows] = [len(tags) for tags in tag_lists]
+        row_ptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(lengths, out=row_ptr[1:])
+
+        codes = np.empty(int(row_ptr[-1]), dtype=np.int32)
+        old_codes = self.codes[_ranges(self.row_ptr[kept], old_lengths[kept])]
+        codes[_ranges(row_ptr[row_map[kept]], old_lengths[kept])] = recode[old_codes]
+        codes[_ranges(row_ptr[rows], lengths[rows])] = np.fromiter(
+            (code[tag] for tags in tag_lists for tag in tags), dtype=np.int32,
+            count=int(lengths[rows].sum()))
+
+        used = np.bincount(codes, minlength=len(names)) > 0
+        if not used.all():
+            codes = (np.cumsum(used) - 1).astype(np.int32)[codes]
+            names = [name for name, keep in zip(names, used.tolist()) if keep]
+        return TagIndex._from_rows(names, row_ptr, codes)
+
+    def to_arrays(self):
+        return {"tag_row_ptr": self.row_ptr, "tag_codes": self.codes,
+                "tag_ptr": self.tag_ptr, "tag_rows": self.rows}
+
+    @classmethod
+    def from_arrays(cls, arrays, names):
+        return cls(names, arrays["tag_row_ptr"], arrays["tag_codes"],
+                   arrays["tag_ptr"], arrays["tag_rows"])
+
+    def mask(self, tags, mode="any"):
+        """
+        Rows having any (or all) of ``tags``
+
+        Returns:
+            np.ndarray: Boolean mask; unknown tags match nothing
+        """
+        codes = [self._code[tag] for tag in tags if tag in self._code]
+        if mode == "all" and len(codes) < len(set(tags)):
+            return np.zeros(self.n_rows, dtype=bool)
+        codes = np.array(codes, dtype=np.int64)
+        hits = self.rows[_ranges(self.tag_ptr[codes], self.tag_ptr[codes + 1] - self.tag_ptr[codes])]
+        if mode == "all":
+            return np.bincount(hits, minlength=self.n_rows) == len(codes)
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[hits] = True
+        return mask
+
+    def counts(self, rows=None):
+        """
+        Games per tag among ``rows`` (default: all rows), in one pass
+
+        Returns:
+            dict: {tag: count} for tags with at least one game
+        """
+        if rows is None:
+            codes = self.codes
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            codes = self.codes[_ranges(self.row_ptr[rows], self.row_ptr[rows + 1] - self.row_ptr[rows])]
+        counts = np.bincount(codes, minlength=len(self.names))
+        return {self.names[i]: int(counts[i]) for i in np.flatnonzero(counts).tolist()}
@@ -3,18 +3,92 @@ GameVerse Game Database
 Manages game data and provides data access functions
 """
 
-import streamlit as st
+import hashlib
+import json
+import os
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+from data.catalog_store import CATALOG_PATH_ENV, map_catalog, publish_catalog
+from data.compact import compact_catalog, compact_enabled
+from data.facets import TagIndex, facet_codes, facet_counts, price_range_counts, price_range_mask
+from data.search_index import TrigramIndex, fuzzy_search
+from data.sorting import build_permutations, ordered_rows, page_bounds, sort_order
+from data.snapshot import SNAPSHOT_DIR_ENV, Snapshot, current_version, load_snapshot
+
+# Indexed catalogs behind loaded DataFrames, by version (see _catalog_for)
+_catalogs = {}
+
+# Fuzzy matches considered before the other filters narrow them down
+FUZZY_CANDIDATES = 50
+
+_REGEX_CHARS = set(".^$*+?{}[]\\|()")
 
 
-@st.cache_data
 def load_games():
     """
     Load game database and return as DataFrame
     
+    With GAMEVERSE_CATALOG_SNAPSHOT set, the catalog is the CURRENT
+    version of a snapshot compiled by build_catalog.py, with its search
+    index, facets and sort orders; rebuilding the snapshot swaps every
+    process over on its next rerun. With GAMEVERSE_CATALOG_PATH set, the
+    catalog is served from a shared memory-mapped Arrow file (published
+    from the built-in data by the first process that needs it) instead of
+    a per-process copy. With GAMEVERSE_COMPACT_CATALOG=1, the built-in
+    and shared catalogs use the compact schema (see data.compact);
+    snapshots are compact when compiled with build_catalog.py --compact.
+    
     Returns:
         pd.DataFrame: DataFrame containing all game data
     """
+    snapshot_root = os.getenv(SNAPSHOT_DIR_ENV)
+    version = current_version(snapshot_root) if snapshot_root else None
+    if version:
+        snapshot = _load_snapshot(snapshot_root, version)
+        _catalogs[snapshot.version] = snapshot
+        return snapshot.df
+
+    catalog_path = os.getenv(CATALOG_PATH_ENV)
+    if catalog_path:
+        return _load_mapped_games(catalog_path, compact_enabled()).df
+    return _load_builtin_games(compact_enabled())
+
+
+@st.cache_resource(max_entries=2)
+def _load_snapshot(root, version):
+    """Map one snapshot version per process; drop older ones from the registry"""
+    snapshot = load_snapshot(root, version)
+    for old_version, catalog in list(_catalogs.items()):
+        if isinstance(catalog, Snapshot) and catalog.path.parent == snapshot.path.parent:
+            _catalogs.pop(old_version, None)
+    return snapshot
+
+
+@st.cache_resource
+def _load_mapped_games(path, compact=False):
+    """Map the shared catalog once per process; publish it if missing"""
+    if not os.path.exists(path):
+        games_df = _builtin_games()
+        if compact:
+            games_df = compact_catalog(games_df)
+        publish_catalog(games_df, path, indexes=build_id_index(games_df))
+    catalog = map_catalog(path)
+    _catalogs[catalog.version] = catalog
+    return catalog
+
+
+@st.cache_data
+def _load_builtin_games(compact=False):
+    """Built-in catalog, one copy per session via st.cache_data"""
+    games_df = _builtin_games()
+    return compact_catalog(games_df) if compact else games_df
+
+
+def _builtin_games():
+    """Build the built-in game list as a DataFrame"""
     games = [
         {
             "id": 1,
@@ -114,7 +188,108 @@ def load_games():
         }
     ]
     
-    return pd.DataFrame(games)
+    games_df = pd.DataFrame(games)
+    digest = hashlib.sha256(json.dumps(games, sort_keys=True).encode()).hexdigest()
+    games_df.attrs["version"] = f"builtin-{digest[:12]}"
+    return games_df
+
+
+def build_id_index(games_df):
+    """Sorted ids and their row positions, for binary-search lookups"""
+    ids = games_df['id'].to_numpy(dtype=np.int64)
+    order = np.argsort(ids, kind="stable").astype(np.int32)
+    return {"id_sorted": ids[order], "id_order": order}
+
+
+@st.cache_resource(max_entries=2)
+def _build_title_index(version, n_rows, _games_df):
+    """Trigram index over titles, once per catalog version"""
+    return TrigramIndex.build(_games_df['title'].astype(str))
+
+
+def _title_index(games_df):
+    """The catalog's title index: the snapshot's own, or built and cached"""
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        return catalog.search
+    version = _full_catalog_version(games_df)
+    if version is None:
+        return TrigramIndex.build(games_df['title'].astype(str))
+    return _build_title_index(version, len(games_df), games_df)
+
+
+@st.cache_resource(max_entries=2)
+def _build_tag_index(version, n_rows, _games_df):
+    """Tag incidence, once per catalog version"""
+    return TagIndex.build(_games_df['tags'].tolist())
+
+
+def _tag_index(games_df):
+    """The catalog's tag index, None for a subset of the catalog"""
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot) and catalog.tag_index is not None:
+        return catalog.tag_index
+    version = _full_catalog_version(games_df)
+    if version is None:
+        return None
+    return _build_tag_index(version, len(games_df), games_df)
+
+
+@st.cache_resource(max_entries=2)
+def _build_facet_codes(version, n_rows, _games_df):
+    """Per-row facet codes, once per catalog version"""
+    return facet_codes(_games_df)
+
+
+def _facet_codes(games_df):
+    """The catalog's facet codes, None for a subset of the catalog"""
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        return catalog.facet_codes
+    version = _full_catalog_version(games_df)
+    if version is None:
+        return None
+    return _build_facet_codes(version, len(games_df), games_df)
+
+
+@st.cache_resource(max_entries=2)
+def _build_sort_permutations(version, n_rows, _games_df):
+    """Row order for every sort option, once per catalog version"""
+    return build_permutations(_games_df)
+
+
+def _sort_permutation(games_df, sort_by):
+    """Precomputed row order of the catalog for a sort option, if any"""
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        permutation = catalog.permutation(sort_by)
+        if permutation is not None:
+            return permutation
+    version = _full_catalog_version(games_df)
+    if version is None:
+        return None
+    return _build_sort_permutations(version, len(games_df), games_df).get(f"sort_{sort_by}")
+
+
+def _full_catalog_version(games_df):
+    """
+    Version of a catalog in its original row order, for caches of row
+    positions (keyed by version and length); None for filtered or sorted
+    frames, which inherit the version attr but not the row order
+    """
+    index = games_df.index
+    if (isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1
+            and len(index) == len(games_df)):
+        return games_df.attrs.get("version")
+    return None
+
+
+def _catalog_for(games_df):
+    """The indexed catalog behind games_df, if it is the full loaded catalog"""
+    catalog = _catalogs.get(games_df.attrs.get("version"))
+    if catalog is not None and catalog.df is games_df:
+        return catalog
+    return None
 
 
 def get_game_by_id(games_df, game_id):
@@ -128,13 +303,22 @@ def get_game_by_id(games_df, game_id):
     Returns:
         dict or None: Game dictionary if found, None otherwise
     """
+    catalog = _catalog_for(games_df)
+    if catalog is not None and "id_sorted" in catalog.indexes:
+        ids = catalog.indexes["id_sorted"]
+        pos = np.searchsorted(ids, game_id)
+        if pos < len(ids) and ids[pos] == game_id:
+            return games_df.iloc[int(catalog.indexes["id_order"][pos])].to_dict()
+        return None
+    
     result = games_df[games_df['id'] == game_id]
     if not result.empty:
         return result.iloc[0].to_dict()
     return None
 
 
-def filter_games(games_df, search="", category="All", price_range="All"):
+def filter_games(games_df, search="", category="All", price_range="All",
+                 developer="All", tags=None, tag_mode="any", fuzzy=False):
     """
     Filter games based on search criteria
     
@@ -143,11 +327,39 @@ def filter_games(games_df, search="", category="All", price_range="All"):
         search: Search string for title
         category: Category filter
         price_range: Price range filter
+        developer: Developer filter
+        tags: Tags to filter by (None or empty for no tag filter)
+        tag_mode: "any" for games with at least one of the tags, "all"
+            for games with every one of them
+        fuzzy: If nothing matches the search exactly, return the closest
+            titles (a few typos allowed), best first, with
+            attrs["fuzzy"] set
         
     Returns:
         pd.DataFrame: Filtered DataFrame
     """
-    filtered_df = games_df.copy()
+    filters = dict(category=category, price_range=price_range, developer=developer,
+                   tags=tags, tag_mode=tag_mode)
+    filtered_df = _filter_exact(games_df, search, **filters)
+    if fuzzy and search and filtered_df.empty:
+        matches = fuzzy_search(_title_index(games_df), games_df['title'], search,
+                               limit=FUZZY_CANDIDATES)
+        closest = games_df.iloc[[row for row, _ in matches]]
+        filtered_df = _filter_exact(closest, "", **filters)
+        filtered_df.attrs["fuzzy"] = True
+    return filtered_df
+
+
+def _filter_exact(games_df, search, category, price_range, developer, tags, tag_mode):
+    """filter_games without the fuzzy fallback"""
+    tag_mask = _tag_mask(games_df, tags, tag_mode) if tags else None
+    
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        filtered_df = _filter_indexed(catalog, games_df, search, category, price_range, tag_mask)
+        return _filter_developer(filtered_df, developer)
+    
+    filtered_df = games_df[tag_mask] if tag_mask is not None else games_df.copy()
     
     # Apply search filter
     if search:
@@ -160,20 +372,137 @@ def filter_games(games_df, search="", category="All", price_range="All"):
         filtered_df = filtered_df[filtered_df['category'] == category]
     
     # Apply price range filter
-    if price_range == "Free":
-        filtered_df = filtered_df[filtered_df['price'] == 0]
-    elif price_range == "Under $20":
-        filtered_df = filtered_df[filtered_df['price'] < 20]
-    elif price_range == "$20-$40":
-        filtered_df = filtered_df[
-            (filtered_df['price'] >= 20) & (filtered_df['price'] <= 40)
-        ]
-    elif price_range == "$40+":
-        filtered_df = filtered_df[filtered_df['price'] > 40]
+    if price_range != "All":
+        filtered_df = filtered_df[price_range_mask(filtered_df['price'], price_range)]
     
+    return _filter_developer(filtered_df, developer)
+
+
+def _tag_mask(games_df, tags, tag_mode):
+    """Rows matching a tag filter: postings lookups when indexed, else a scan"""
+    index = _tag_index(games_df)
+    if index is not None:
+        return index.mask(tags, tag_mode)
+    wanted = set(tags)
+    if tag_mode == "all":
+        matches = [wanted.issubset(game_tags) for game_tags in games_df['tags'].tolist()]
+    else:
+        matches = [not wanted.isdisjoint(game_tags) for game_tags in games_df['tags'].tolist()]
+    return np.array(matches, dtype=bool)
+
+
+def _filter_developer(filtered_df, developer):
+    if developer != "All":
+        filtered_df = filtered_df[filtered_df['developer'] == developer]
     return filtered_df
 
 
+def _filter_indexed(snapshot, games_df, search, category, price_range, mask=None):
+    """filter_games over a snapshot's facet bitmaps and trigram index"""
+    mask = np.ones(len(games_df), dtype=bool) if mask is None else mask.copy()
+    for name in (f"category:{category}" if category != "All" else None,
+                 f"price:{price_range}" if price_range != "All" else None):
+        if name:
+            facet = snapshot.facet_mask(name)
+            mask &= facet if facet is not None else False
+    
+    if search:
+        # Trigrams can only narrow down plain substrings, not patterns
+        candidates = None
+        if not _REGEX_CHARS.intersection(search):
+            candidates = snapshot.search.substring_candidates(search)
+        if candidates is None:
+            candidates = np.flatnonzero(mask)
+        else:
+            candidates = candidates[mask[candidates]]
+        titles = games_df['title'].iloc[candidates]
+        hits = titles.str.contains(search, case=False).to_numpy(dtype=bool, na_value=False)
+        mask = np.zeros(len(games_df), dtype=bool)
+        mask[candidates[hits]] = True
+    
+    return games_df[mask]
+
+
+def sort_games(games_df, filtered_df, sort_by="default", page=1, page_size=None):
+    """
+    Sort a filter result and cut out one page
+    
+    With the full catalog as games_df, the result's rows are taken from a
+    sort permutation computed once per catalog version, so no sort runs
+    per call and only the page's rows are materialized.
+    
+    Args:
+        games_df: The catalog filtered_df was filtered from
+        filtered_df: Result of filter_games
+        sort_by: A data.sorting.SORT_LABELS key
+        page: 1-based page number, clamped to the available pages
+        page_size: Games per page (None for all)
+        
+    Returns:
+        tuple: (page DataFrame, page number, number of pages)
+    """
+    page_size = page_size or max(len(filtered_df), 1)
+    page, pages, start, stop = page_bounds(len(filtered_df), page, page_size)
+    if sort_by == "default":
+        return filtered_df.iloc[start:stop], page, pages
+    
+    permutation = _sort_permutation(games_df, sort_by)
+    if permutation is None:
+        order = sort_order(filtered_df, sort_by)
+        return filtered_df.iloc[order[start:stop]], page, pages
+    rows = ordered_rows(permutation, filtered_df.index.to_numpy(), len(games_df))
+    return games_df.iloc[rows[start:stop]], page, pages
+
+
+def get_tags(games_df):
+    """
+    Get list of all tags
+    
+    Args:
+        games_df: DataFrame containing games
+        
+    Returns:
+        list: Sorted list of tags
+    """
+    index = _tag_index(games_df)
+    if index is not None:
+        return list(index.names)
+    return sorted({tag for tags in games_df['tags'].tolist() for tag in tags})
+
+
+def get_facet_counts(games_df, filtered_df):
+    """
+    Games per category, price range and tag in a filter result
+    
+    When games_df is indexed, every facet is counted in one bincount over
+    the result rows' category, price bin and tag codes.
+    
+    Args:
+        games_df: The catalog filtered_df was filtered from
+        filtered_df: Result of filter_games
+        
+    Returns:
+        dict: {"category": {name: n}, "price": {range: n}, "tags": {tag: n}}
+    """
+    codes = _facet_codes(games_df)
+    if codes is not None:
+        categories, row_codes = codes
+        return facet_counts(categories, row_codes, filtered_df.index.to_numpy(),
+                            _tag_index(games_df))
+
+    tag_counts = {}
+    for tags in filtered_df['tags'].tolist():
+        for tag in tags:
+            tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    return {
+        # Categoricals also list unused categories, with a count of 0
+        "category": {str(name): int(n) for name, n in
+                     filtered_df['category'].value_counts().items() if n},
+        "price": price_range_counts(filtered_df['price']),
+        "tags": tag_counts,
+    }
+
+
 def get_categories(games_df):
     """
     Get list of all categories
@@ -184,6 +513,9 @@ def get_categories(games_df):
     Returns:
         list: Sorted list of categories
     """
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        return catalog.categories
     return sorted(games_df['category'].unique().tolist())
 
 
@@ -198,6 +530,10 @@ def get_featured_games(games_df, n=3):
     Returns:
         pd.DataFrame: Top-rated games
     """
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        # Same order as nlargest: rating descending, ties in catalog order
+        return games_df.iloc[catalog.permutation("rating")[:n]]
     return games_df.nlargest(n, 'rating')
 
 
@@ -211,4 +547,7 @@ def get_free_games(games_df):
     Returns:
         pd.DataFrame: Free games
     """
+    catalog = _catalog_for(games_df)
+    if isinstance(catalog, Snapshot):
+        return games_df[catalog.facet_mask("price:Free")]
     return games_df[games_df['price'] == 0]
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+GameVerse Recommender
+Content-based "more like this" from descriptions, tags, category and developer
+"""
+
+import math
+import re
+
+import numpy as np
+import streamlit as st
+
+from data.games_data import get_game_by_id
+
+# Weight of each field's terms relative to description words
+FIELD_WEIGHTS = {"tag": 2.0, "category": 1.5, "developer": 1.0}
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or our
+    the their this through to with your you where while who will all across
+""".split())
+# Queries scored together, bounded so the dense score block stays small
+SCORE_BLOCK = 4_000_000
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _terms(description, tags, category, developer):
+    """{term: weighted term frequency} for one game"""
+    counts = {}
+    for word in _WORD.findall(str(description).lower()):
+        if len(word) > 2 and word not in STOPWORDS:
+            counts[word] = counts.get(word, 0) + 1
+    weights = {word: 1 + math.log(count) for word, count in counts.items()}
+    for tag in tags:
+        weights[f"tag:{str(tag).lower()}"] = FIELD_WEIGHTS["tag"]
+    weights[f"category:{str(category).lower()}"] = FIELD_WEIGHTS["category"]
+    weights[f"developer:{str(developer).lower()}"] = FIELD_WEIGHTS["developer"]
+    return weights
+
+
+class ContentRecommender:
+    """
+    TF-IDF vectors of every game, L2-normalized, in sparse form
+
+    Game vectors are kept by row (CSR, to read a query's terms) and by
+    term (postings, to score all games sharing a term at once). Cosine
+    similarity for a batch of games is one bincount over the postings of
+    their terms; no pairwise matrix is ever materialized.
+    """
+
+    def __init__(self, ids, row_ptr, row_terms, row_weights, term_ptr, term_rows, term_weights):
+        self.ids = ids
+        self.row_ptr = row_ptr
+        self.row_terms = row_terms
+        self.row_weights = row_weights
+        self.term_ptr = term_ptr
+        self.term_rows = term_rows
+        self.term_weights = term_weights
+        self.n_rows = len(ids)
+        self._id_order = np.argsort(ids, kind="stable")
+        self._id_sorted = ids[self._id_order]
+
+    @classmethod
+    def build(cls, games_df):
+        """Vectorize a catalog DataFrame"""
+        vocabulary = {}
+        rows, terms, weights = [], [], []
+        columns = zip(games_df['description'].tolist(), games_df['tags'].tolist(),
+                      games_df['category'].tolist(), games_df['developer'].tolist())
+        for row, fields in enumerate(columns):
+            for term, weight in _terms(*fields).items():
+                rows.append(row)
+                terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                weights.append(weight)
+
+        n_rows = len(games_df)
+        rows = np.array(rows, dtype=np.int32)
+        terms = np.array(terms, dtype=np.int32)
+        weights = np.array(weights, dtype=np.float32)
+
+        document_frequency = np.bincount(terms, minlength=len(vocabulary))
+        idf = np.log((1 + n_rows) / (1 + document_frequency)) + 1
+        weights *= idf[terms].astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2,
+                                    minlength=n_rows))
+        weights /= np.maximum(norms[rows], 1e-12).astype(np.float32)
+
+        row_ptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=row_ptr[1:])
+        by_term = np.argsort(terms, kind="stable")  # rows stay sorted per term
+        term_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=term_ptr[1:])
+
+        ids = games_df['id'].to_numpy(dtype=np.int64)
+        return cls(ids, row_ptr, terms, weights, term_ptr, rows[by_term], weights[by_term])
+
+    def rows_for(self, game_ids):
+        """Row positions of game ids (-1 where unknown)"""
+        game_ids = np.asarray(game_ids, dtype=np.int64)
+        if not self.n_rows:
+            return np.full(len(game_ids), -1)
+        pos = np.minimum(np.searchsorted(self._id_sorted, game_ids), self.n_rows - 1)
+        return np.where(self._id_sorted[pos] == game_ids, self._id_order[pos], -1)
+
+    def scores(self, rows):
+        """
+        Cosine similarity of each query row against every game
+
+        Returns:
+            np.ndarray: float32 array of shape (len(rows), n_rows)
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.zeros((len(rows), self.n_rows), dtype=np.float32)
+        block = max(1, SCORE_BLOCK // max(self.n_rows, 1))
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            # Terms of every query in the chunk, tagged with the query
+            lengths = self.row_ptr[chunk + 1] - self.row_ptr[chunk]
+            positions = _ranges(self.row_ptr[chunk], lengths)
+            query = np.repeat(np.arange(len(chunk)), lengths)
+            terms = self.row_terms[positions]
+            query_weights = self.row_weights[positions]
+
+            # Postings of those terms: one (query, game, product) per entry
+            posting_lengths = self.term_ptr[terms + 1] - self.term_ptr[terms]
+            postings = _ranges(self.term_ptr[terms], posting_lengths)
+            keys = np.repeat(query, posting_lengths) * self.n_rows + self.term_rows[postings]
+            products = np.repeat(query_weights, posting_lengths) * self.term_weights[postings]
+            block_scores = np.bincount(keys, weights=products, minlength=len(chunk) * self.n_rows)
+            out[start:start + len(chunk)] = block_scores.reshape(len(chunk), self.n_rows)
+        return out
+
+    def similar(self, game_ids, k=4, exclude_ids=()):
+        """
+        Most similar games for each of several games, in one pass
+
+        Args:
+            game_ids: Games to find neighbours for
+            k: Neighbours per game
+            exclude_ids: Games never to recommend (besides each game itself)
+
+        Returns:
+            dict: {game id: [similar game ids, most similar first]}
+        """
+        game_ids = list(game_ids)
+        rows = self.rows_for(game_ids)
+        known = rows >= 0
+        results = {game_id: [] for game_id in game_ids}
+        if not known.any():
+            return results
+        scores = self.scores(rows[known])
+        scores[np.arange(len(scores)), rows[known]] = 0
+        excluded = self.rows_for(list(exclude_ids))
+        scores[:, excluded[excluded >= 0]] = 0
+        for game_id, row_scores in zip(np.array(game_ids, dtype=object)[known], scores):
+            results[game_id] = self.ids[_top_k(row_scores, k)].tolist()
+        return results
+
+    def recommend(self, game_ids, k=4):
+        """
+        Games most similar to a set of games as a whole (e.g. a cart)
+
+        Returns:
+            list: Game ids, best first, none of them in game_ids
+        """
+        rows = self.rows_for(list(game_ids))
+        rows = rows[rows >= 0]
+        if not len(rows):
+            return []
+        combined = self.scores(rows).sum(axis=0)
+        combined[rows] = 0
+        return self.ids[_top_k(combined, k)].tolist()
+
+
+def _ranges(starts, lengths):
+    """Concatenated aranges [start, start + length) without a Python loop"""
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+def _top_k(scores, k):
+    """Positions of the k highest positive scores, highest first"""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+@st.cache_resource(max_entries=2)
+def get_recommender(version, _games_df):
+    """
+    Recommender for a catalog version, built once and shared by sessions
+
+    Args:
+        version: Catalog version (games_df.attrs["version"]), the cache key
+        _games_df: The catalog; not hashed
+
+    Returns:
+        ContentRecommender: Vectors for the catalog
+    """
+    return ContentRecommender.build(_games_df)
+
+
+def _recommender(games_df):
+    version = games_df.attrs.get("version")
+    if version is None:
+        return ContentRecommender.build(games_df)
+    return get_recommender(version, games_df)
+
+
+def similar_games(games_df, game_ids, k=4, exclude_ids=()):
+    """
+    "More like this" for several games at once
+
+    Returns:
+        dict: {game id: list of game dicts, most similar first}
+    """
+    neighbours = _recommender(games_df).similar(game_ids, k, exclude_ids)
+    return {
+        game_id: [get_game_by_id(games_df, similar_id) for similar_id in similar_ids]
+        for game_id, similar_ids in neighbours.items()
+    }
+
+
+def recommend_for(games_df, game_ids, k=4):
+    """Games like a whole set of games, as game dicts (see ContentRecommender.recommend)"""
+    return [get_game_by_id(games_df, game_id)
+            for game_id in _recommender(games_df).recommend(game_ids, k)]
@@ -0,0 +1,230 @@
+"""
+GameVerse Search Index
+Character trigram postings over game titles
+"""
+
+import zlib
+
+import numpy as np
+
+NGRAM = 3
+
+
+def trigram_keys(text):
+    """
+    Distinct trigram keys of a lowercased string
+
+    Trigrams are hashed to uint32 (crc32) so the index is all-numeric and
+    can be memory-mapped; a rare collision only adds a candidate, which
+    the caller's verification step drops.
+    """
+    text = text.lower()
+    grams = {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+    return np.array(sorted(zlib.crc32(g.encode()) for g in grams), dtype=np.uint32)
+
+
+class TrigramIndex:
+    """
+    Trigram -> rows postings in CSR form
+
+    ``keys`` is sorted, and rows of ``keys[i]`` are
+    ``rows[ptr[i]:ptr[i + 1]]`` (sorted row positions).
+    """
+
+    def __init__(self, keys, ptr, rows, n_rows):
+        self.keys = keys
+        self.ptr = ptr
+        self.rows = rows
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, texts):
+        """Index an iterable of strings; row i is the i-th string"""
+        key_parts, row_parts = [], []
+        n_rows = 0
+        for row, text in enumerate(texts):
+            keys = trigram_keys(str(text))
+            key_parts.append(keys)
+            row_parts.append(np.full(len(keys), row, dtype=np.int32))
+            n_rows = row + 1
+        if not key_parts:
+            return cls(np.zeros(0, np.uint32), np.zeros(1, np.int64), np.zeros(0, np.int32), 0)
+
+        all_keys = np.concatenate(key_parts)
+        all_rows = np.concatenate(row_parts)
+        # Sort by key, then row, so every posting list comes out sorted
+        order = np.lexsort((all_rows, all_keys))
+        all_keys, all_rows = all_keys[order], all_rows[order]
+        keys, starts = np.unique(all_keys, return_index=True)
+        ptr = np.append(starts, len(all_keys)).astype(np.int64)
+        return cls(keys, ptr, all_rows, n_rows)
+
+    def update(self, row_map, n_rows, rows, texts):
+        """
+        The index after a row-level change, re-reading only changed rows
+
+        Args:
+            row_map: New row of each old row, -1 to drop its postings
+                (removed rows, and rows being re-indexed); kept rows must
+                keep their relative order
+            n_rows: Rows in the new index
+            rows: New rows to index
+            texts: Their strings
+
+        Returns:
+            TrigramIndex: A new index; this one is left as is
+        """
+        # The remap keeps row order, so surviving postings stay sorted by
+        # (key, row) and the new ones are merged in without a full sort
+        old_keys = np.repeat(self.keys, np.diff(self.ptr)).astype(np.uint64)
+        old_rows = np.asarray(row_map, dtype=np.int64)[self.rows]
+        kept = old_rows >= 0
+        postings = (old_keys[kept] << np.uint64(32)) | old_rows[kept].astype(np.uint64)
+
+        fresh = TrigramIndex.build(texts)
+        new_keys = np.repeat(fresh.keys, np.diff(fresh.ptr)).astype(np.uint64)
+        new_rows = np.asarray(rows, dtype=np.int64)[fresh.rows].astype(np.uint64)
+        added = np.sort((new_keys << np.uint64(32)) | new_rows)
+        postings = np.insert(postings, np.searchsorted(postings, added), added)
+
+        all_keys = (postings >> np.uint64(32)).astype(np.uint32)
+        starts = np.flatnonzero(np.r_[True, all_keys[1:] != all_keys[:-1]]) if len(all_keys) \
+            else np.zeros(0, dtype=np.int64)
+        ptr = np.append(starts, len(all_keys)).astype(np.int64)
+        all_rows = (postings & np.uint64(0xFFFFFFFF)).astype(np.int32)
+        return TrigramIndex(all_keys[starts], ptr, all_rows, n_rows)
+
+    def to_arrays(self):
+        return {"trigram_keys": self.keys, "trigram_ptr": self.ptr, "trigram_rows": self.rows}
+
+    @classmethod
+    def from_arrays(cls, arrays, n_rows):
+        return cls(arrays["trigram_keys"], arrays["trigram_ptr"], arrays["trigram_rows"], n_rows)
+
+    def postings(self, key):
+        """Sorted rows containing a trigram key"""
+        pos = np.searchsorted(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return self.rows[self.ptr[pos]:self.ptr[pos + 1]]
+        return self.rows[:0]
+
+    def substring_candidates(self, query):
+        """
+        Rows that may contain ``query`` as a substring (case-insensitive)
+
+        Returns:
+            np.ndarray or None: Sorted candidate rows, or None if the query
+                is shorter than a trigram and can't be narrowed down
+        """
+        keys = trigram_keys(query)
+        if not len(keys):
+            return None
+        lists = sorted((self.postings(k) for k in keys), key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+        return candidates
+
+
+# Fuzzy matching: trigram overlap picks candidates, edit distance ranks them
+MAX_CANDIDATES = 256
+POSTINGS_BUDGET = 200_000
+
+
+def max_typos(query):
+    """Edits allowed for a query: about one per four characters"""
+    return max(1, len(query) // 4)
+
+
+def substring_edit_distance(query, texts):
+    """
+    Fewest edits turning ``query`` into a substring of each text
+
+    Levenshtein distance with free start and end in the text (so a query
+    for part of a title isn't charged for the rest of it), computed for
+    all texts at once: one NumPy pass per query character.
+
+    Returns:
+        np.ndarray: int32 distance per text
+    """
+    query = query.lower()
+    if not texts:
+        return np.zeros(0, dtype=np.int32)
+    # Lowercasing can change the length ("İ" becomes two characters)
+    texts = [text.lower() for text in texts]
+    lengths = np.array([len(text) for text in texts])
+    width = int(lengths.max())
+    codes = np.zeros((len(texts), width), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        codes[i, :len(text)] = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+    positions = np.arange(width + 1, dtype=np.int32)
+    row = np.zeros((len(texts), width + 1), dtype=np.int32)  # empty query matches anywhere
+    for i, char in enumerate(query, 1):
+        cost = (codes != ord(char)).astype(np.int32)
+        step = np.empty_like(row)
+        step[:, 0] = i
+        step[:, 1:] = np.minimum(row[:, 1:] + 1, row[:, :-1] + cost)
+        # Insertions chain left to right: new[j] = min over k <= j of step[k] + (j - k)
+        row = np.minimum.accumulate(step - positions, axis=1) + positions
+
+    row[positions[None, :] > lengths[:, None]] = np.iinfo(np.int32).max
+    return row.min(axis=1)
+
+
+def fuzzy_search(index, titles, query, limit=20, max_distance=None):
+    """
+    Rows whose title contains ``query`` up to a few typos
+
+    Rows sharing the most trigrams with the query become candidates (the
+    rarest trigrams first, within a fixed postings budget, so common
+    trigrams can't blow up the work) and are ranked by
+    substring_edit_distance.
+
+    Args:
+        index: TrigramIndex over the titles
+        titles: Title per row, as a list or a pandas Series
+        query: Search text
+        limit: Maximum rows returned
+        max_distance: Edits allowed (default: max_typos(query))
+
+    Returns:
+        list: (row, distance) pairs, best first
+    """
+    query = " ".join(query.split())
+    keys = trigram_keys(query)
+    if not len(keys):
+        return []
+    max_distance = max_typos(query) if max_distance is None else max_distance
+
+    lists = sorted((index.postings(k) for k in keys), key=len)
+    used, total = [], 0
+    for rows in lists:
+        if not len(rows):
+            continue
+        if used and total + len(rows) > POSTINGS_BUDGET:
+            break
+        used.append(rows)
+        total += len(rows)
+    if not used:
+        return []
+
+    shared = np.bincount(np.concatenate(used), minlength=index.n_rows)
+    candidates = np.flatnonzero(shared)
+    if len(candidates) > MAX_CANDIDATES:
+        top = np.argpartition(-shared[candidates], MAX_CANDIDATES - 1)[:MAX_CANDIDATES]
+        candidates = np.sort(candidates[top])
+
+    if hasattr(titles, "iloc"):
+        texts = titles.iloc[candidates].astype(str).tolist()
+    else:
+        texts = [str(titles[row]) for row in candidates.tolist()]
+    distances = substring_edit_distance(query, texts)
+    keep = distances <= max_distance
+    candidates, distances = candidates[keep], distances[keep]
+    # Ties: more shared trigrams, then the title closest in length
+    extra = np.abs(np.array([len(t) for t in texts])[keep] - len(query))
+    order = np.lexsort((candidates, extra, -shared[candidates], distances))[:limit]
+    return list(zip(candidates[order].tolist(), distances[order].tolist()))
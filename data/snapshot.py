@@ -0,0 +1,340 @@
+"""
+GameVerse Catalog Snapshots
+Versioned, precompiled catalog artifacts swapped in atomically
+
+A snapshot directory holds one subdirectory per catalog version plus a
+CURRENT file naming the live one:
+
+    <root>/CURRENT
+    <root>/<version>/catalog.arrow            columnar data (memory-mapped)
+    <root>/<version>/catalog.indexes.arrow    id index, sort permutations,
+                                              trigram postings, facet bitmaps,
+                                              tag incidence
+    <root>/<version>/manifest.json            facet names, source, counts
+    <root>/<version>/thumbnails.json          image manifest per game id
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.catalog_store import catalog_version, map_catalog, publish_catalog
+from data.facets import TagIndex, build_facet_bitmaps, facet_codes_from_bitmaps, unpack_bitmap
+from data.search_index import TrigramIndex
+from data.sorting import build_permutations
+
+# Set to a snapshot directory to serve the catalog from its CURRENT version
+SNAPSHOT_DIR_ENV = "GAMEVERSE_CATALOG_SNAPSHOT"
+CURRENT_FILE = "CURRENT"
+CATALOG_FILE = "catalog.arrow"
+MANIFEST_FILE = "manifest.json"
+THUMBNAILS_FILE = "thumbnails.json"
+IMAGE_ROOT = Path(__file__).parent.parent
+
+CATALOG_COLUMNS = ["id", "title", "price", "category", "tags", "description",
+                   "rating", "release_date", "developer", "image_url"]
+
+# knowledge/games.csv column -> catalog column
+STORE_CSV_COLUMNS = {
+    "Game Title": "title",
+    "Brief Description": "description",
+    "Price (USD)": "price",
+    "Genre": "category",
+    "Release Year": "release_date",
+    "Developer": "developer",
+}
+
+
+def _split_tags(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [str(tag) for tag in value]
+    if not isinstance(value, str) or not value:
+        return []
+    return [tag.strip() for tag in value.split("|") if tag.strip()]
+
+
+def _from_store_csv(raw):
+    """Map the knowledge/games.csv layout onto the catalog schema"""
+    games_df = raw.rename(columns=STORE_CSV_COLUMNS)
+    games_df["release_date"] = games_df["release_date"].astype(str)
+    tags = []
+    for platform, multiplayer, age in zip(raw.get("Platform", ""), raw.get("Multiplayer", ""),
+                                          raw.get("Age Rating", "")):
+        row_tags = [p.strip() for p in str(platform).split("/") if p.strip()]
+        if str(multiplayer).strip().lower() == "yes":
+            row_tags.append("Multiplayer")
+        if isinstance(age, str) and age:
+            row_tags.append(f"Rated {age}")
+        tags.append(row_tags)
+    games_df["tags"] = tags
+    return games_df
+
+
+def read_source(path):
+    """
+    Read a catalog source into the catalog schema
+
+    Accepts knowledge/games.csv, or a CSV/Parquet file with the catalog's
+    own columns (tags "|"-separated in CSV). Missing ids are numbered from
+    1, missing ratings and images left empty.
+
+    Returns:
+        pd.DataFrame: Columns as in CATALOG_COLUMNS
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".parquet":
+        raw = pd.read_parquet(path)
+    else:
+        raw = pd.read_csv(path)
+    games_df = _from_store_csv(raw) if "Game Title" in raw.columns else raw.copy()
+    return normalize_catalog(games_df)
+
+
+def normalize_catalog(games_df):
+    """Coerce a catalog DataFrame to the expected columns and types"""
+    n = len(games_df)
+    if "id" not in games_df:
+        games_df["id"] = np.arange(1, n + 1)
+    for column, default in (("rating", 0.0), ("image_url", ""), ("tags", None),
+                            ("description", ""), ("developer", ""), ("category", "Other"),
+                            ("release_date", "")):
+        if column not in games_df:
+            games_df[column] = [[] for _ in range(n)] if column == "tags" else default
+    games_df = games_df[CATALOG_COLUMNS].copy()
+    games_df["id"] = games_df["id"].astype(np.int64)
+    games_df["price"] = pd.to_numeric(games_df["price"], errors="coerce").fillna(0.0)
+    games_df["rating"] = pd.to_numeric(games_df["rating"], errors="coerce").fillna(0.0)
+    games_df["tags"] = games_df["tags"].map(_split_tags)
+    for column in ("title", "category", "description", "release_date", "developer", "image_url"):
+        games_df[column] = games_df[column].fillna("").astype(str)
+    return games_df.reset_index(drop=True)
+
+
+def build_thumbnail_manifest(games_df, image_root=IMAGE_ROOT):
+    """
+    Image path, size and content hash per game id
+
+    Returns:
+        dict: {str(id): {"path", "exists", "bytes", "sha256"}}
+    """
+    seen = {}
+    manifest = {}
+    for game_id, image_url in zip(games_df["id"], games_df["image_url"]):
+        if image_url not in seen:
+            path = (image_root / image_url).resolve() if image_url else None
+            if path is not None and path.is_file():
+                data = path.read_bytes()
+                seen[image_url] = {"path": image_url, "exists": True, "bytes": len(data),
+                                   "sha256": hashlib.sha256(data).hexdigest()[:16]}
+            else:
+                seen[image_url] = {"path": image_url, "exists": False, "bytes": 0,
+                                   "sha256": None}
+        manifest[str(int(game_id))] = seen[image_url]
+    return manifest
+
+
+def current_version(root):
+    """Version named by <root>/CURRENT, None if there is no snapshot yet"""
+    try:
+        return (Path(root) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _point_current(root, version):
+    fd, tmp = tempfile.mkstemp(dir=root, prefix=f".{CURRENT_FILE}.")
+    with os.fdopen(fd, "w") as f:
+        f.write(version + "\n")
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, root / CURRENT_FILE)
+
+
+def build_artifacts(games_df):
+    """
+    Everything a snapshot stores next to the catalog itself
+
+    Returns:
+        dict: {"indexes": {name: array}, "facets": facet names,
+            "facet_row_bytes": int, "tags": tag names, "thumbnails": manifest}
+    """
+    facet_names, facet_bits = build_facet_bitmaps(games_df)
+    search = TrigramIndex.build(games_df["title"])
+    tag_index = TagIndex.build(games_df["tags"])
+    ids = games_df["id"].to_numpy(dtype=np.int64)
+    id_order = np.argsort(ids, kind="stable").astype(np.int32)
+    return {
+        "indexes": {
+            "id_sorted": ids[id_order],
+            "id_order": id_order,
+            "facet_bits": facet_bits.ravel(),
+            **build_permutations(games_df),
+            **search.to_arrays(),
+            **tag_index.to_arrays(),
+        },
+        "facets": facet_names,
+        "facet_row_bytes": int(facet_bits.shape[1]) if facet_bits.size else 0,
+        "tags": tag_index.names,
+        "thumbnails": build_thumbnail_manifest(games_df),
+    }
+
+
+def compile_snapshot(games_df, root, source=None, keep=3, artifacts=None):
+    """
+    Compile a catalog into a new snapshot version and make it current
+
+    The version is built in a temporary directory, renamed into place and
+    only then published by rewriting CURRENT, so readers switch from one
+    complete version to the next.
+
+    Args:
+        games_df: Catalog in the catalog schema (see normalize_catalog)
+        root: Snapshot directory
+        source: Description of where the data came from, for the manifest
+        keep: Old versions to keep next to the current one
+        artifacts: Indexes and manifests for games_df as returned by
+            build_artifacts, e.g. carried over by data.catalog_watcher
+            (which may pass an unchanged thumbnail manifest as the path of
+            the previous version's file); built from games_df when None
+
+    Returns:
+        str: The snapshot version (content hash of the catalog)
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    games_df = games_df.reset_index(drop=True)
+    version = catalog_version(pa.Table.from_pandas(games_df, preserve_index=False))
+    target = root / version
+
+    if not target.exists():
+        build_dir = Path(tempfile.mkdtemp(dir=root, prefix=f".build-{version}-"))
+        try:
+            if artifacts is None:
+                artifacts = build_artifacts(games_df)
+            published = publish_catalog(games_df, build_dir / CATALOG_FILE,
+                                        indexes=artifacts["indexes"])
+            if published != version:
+                raise RuntimeError(f"Published catalog version {published} does not match "
+                                   f"snapshot version {version}")
+
+            manifest = {
+                "version": version,
+                "source": str(source) if source else None,
+                "created_at": time.time(),
+                "rows": len(games_df),
+                "facets": artifacts["facets"],
+                "facet_row_bytes": artifacts["facet_row_bytes"],
+                "tags": artifacts["tags"],
+            }
+            (build_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+            thumbnails = artifacts["thumbnails"]
+            if isinstance(thumbnails, Path):
+                shutil.copyfile(thumbnails, build_dir / THUMBNAILS_FILE)
+            else:
+                (build_dir / THUMBNAILS_FILE).write_text(json.dumps(thumbnails))
+            build_dir.chmod(0o755)  # mkdtemp's 0700 would hide it from other users
+            os.replace(build_dir, target)
+        except OSError:
+            # Lost a race with another build of the same version
+            shutil.rmtree(build_dir, ignore_errors=True)
+            if not target.exists():
+                raise
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+
+    _point_current(root, version)
+    _prune(root, version, keep)
+    return version
+
+
+def _prune(root, current, keep):
+    """Delete all but the ``keep`` newest non-current versions"""
+    old = sorted(
+        (p for p in root.iterdir()
+         if p.is_dir() and not p.name.startswith(".") and p.name != current),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for path in old[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class Snapshot:
+    """
+    One mapped snapshot version
+
+    ``df``, ``indexes`` and ``version`` behave like data.catalog_store's
+    MappedCatalog; the precomputed facets, search index and sort orders
+    are exposed on top.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        catalog = map_catalog(self.path / CATALOG_FILE)
+        self.df = catalog.df
+        self.version = catalog.version
+        self.indexes = catalog.indexes
+        self.n_rows = len(self.df)
+
+        manifest = json.loads((self.path / MANIFEST_FILE).read_text())
+        self.source = manifest.get("source")
+        self.facet_names = manifest["facets"]
+        self._facet_pos = {name: i for i, name in enumerate(self.facet_names)}
+        row_bytes = manifest["facet_row_bytes"]
+        self._facet_bits = self.indexes["facet_bits"].reshape(len(self.facet_names), row_bytes) \
+            if row_bytes else None
+        self.search = TrigramIndex.from_arrays(self.indexes, self.n_rows)
+        # Snapshots compiled before tag indexing have none
+        self.tag_index = TagIndex.from_arrays(self.indexes, manifest["tags"]) \
+            if "tags" in manifest else None
+        self._thumbnails = None
+        self._facet_codes = None
+
+    @property
+    def categories(self):
+        """Sorted category names"""
+        return [name.split(":", 1)[1] for name in self.facet_names
+                if name.startswith("category:")]
+
+    def facet_mask(self, name):
+        """Boolean row mask for a facet like "category:RPG", None if unknown"""
+        pos = self._facet_pos.get(name)
+        if pos is None or self._facet_bits is None:
+            return None
+        return unpack_bitmap(self._facet_bits[pos], self.n_rows)
+
+    @property
+    def facet_codes(self):
+        """Per-row facet codes (see data.facets.facet_codes), decoded on first use"""
+        if self._facet_codes is None:
+            bits = self._facet_bits if self._facet_bits is not None \
+                else np.zeros((len(self.facet_names), 0), dtype=np.uint8)
+            self._facet_codes = facet_codes_from_bitmaps(self.facet_names, bits, self.n_rows)
+        return self._facet_codes
+
+    def permutation(self, option):
+        """Precomputed row order for a sort option (see data.sorting)"""
+        return self.indexes.get(f"sort_{option}")
+
+    @property
+    def thumbnails(self):
+        """Thumbnail manifest, read on first use"""
+        if self._thumbnails is None:
+            self._thumbnails = json.loads((self.path / THUMBNAILS_FILE).read_text())
+        return self._thumbnails
+
+
+def load_snapshot(root, version=None):
+    """Map a snapshot version (default: CURRENT)"""
+    version = version or current_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No {CURRENT_FILE} in {root}; run build_catalog.py first")
+    return Snapshot(Path(root) / version)
@@ -0,0 +1,86 @@
+"""
+GameVerse Catalog Sorting
+Sort permutations computed once per catalog version
+"""
+
+import numpy as np
+import pandas as pd
+
+# Sort option -> (column, descending)
+SORT_KEYS = {
+    "price": ("price", False),
+    "price_desc": ("price", True),
+    "rating": ("rating", True),
+    "release_date": ("release_date", True),
+    "title": ("title", False),
+}
+# Browse labels; "default" keeps catalog (or relevance) order
+SORT_LABELS = {
+    "default": "Featured",
+    "rating": "Top Rated",
+    "release_date": "Newest",
+    "price": "Price: Low to High",
+    "price_desc": "Price: High to Low",
+    "title": "Title: A-Z",
+}
+
+
+def _sort_values(games_df, column, descending):
+    """Column as an array a stable ascending argsort puts in the right order"""
+    if column == "title":
+        return games_df[column].astype(str).str.lower().to_numpy(dtype=object)
+    if column == "release_date":
+        dates = games_df[column]
+        if not isinstance(dates.dtype, pd.ArrowDtype):  # compact catalogs store parsed dates
+            dates = dates.astype(str)
+        dates = pd.to_datetime(dates, errors="coerce", format="mixed")
+        values = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        # Unknown dates sort last either way
+        values[dates.isna().to_numpy()] = np.iinfo(np.int64).min + 1 if descending \
+            else np.iinfo(np.int64).max
+    else:
+        values = games_df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = np.where(np.isnan(values), -np.inf if descending else np.inf, values)
+    # Negating keeps ties in catalog order, unlike reversing an ascending sort
+    return -values if descending else values
+
+
+def sort_order(games_df, option):
+    """Row positions of games_df in sort order, computed directly"""
+    column, descending = SORT_KEYS[option]
+    return np.argsort(_sort_values(games_df, column, descending), kind="stable").astype(np.int32)
+
+
+def build_permutations(games_df):
+    """
+    Row order for every sort option
+
+    Returns:
+        dict: {"sort_<option>": int32 row positions in sorted order}
+    """
+    return {f"sort_{option}": sort_order(games_df, option) for option in SORT_KEYS}
+
+
+def ordered_rows(permutation, rows, n_rows):
+    """
+    ``rows`` in permutation order
+
+    A membership mask over the catalog picks the result's rows out of
+    the precomputed order: O(n) with no sort.
+    """
+    selected = np.zeros(n_rows, dtype=bool)
+    selected[rows] = True
+    return permutation[selected[permutation]]
+
+
+def page_bounds(total, page, page_size):
+    """
+    Clamp a 1-based page number and give its row slice
+
+    Returns:
+        tuple: (page, number of pages, start, stop)
+    """
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return page, pages, start, min(start + page_size, total)
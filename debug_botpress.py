@@ -1,114 +1,324 @@
 """
 Debug script to test Botpress connection
-Run this to diagnose authentication issues
+Run this to diagnose authentication issues and slow assistant replies
+
+Every probe opens a fresh connection so each request is broken down into
+DNS lookup, TCP connect, TLS handshake, time to first byte and total time.
+
+Usage:
+    python debug_botpress.py                      # 5 rounds against secrets.toml
+    python debug_botpress.py --rounds 20 --json probe.json
+    python debug_botpress.py --mock               # in-process local stand-in
+    python debug_botpress.py --base-uri http://127.0.0.1:8787
+    python debug_botpress.py --endpoints users/me send listen   # also time replies
+
+The default probes only read, from the user's newest conversation (an
+empty one is created if there is none). ``send`` and ``listen`` post probe
+messages, so they are opt-in and run in a conversation created for them.
 """
 
-import requests
+import argparse
+import http.client
 import json
+import os
+import socket
+import ssl
+import statistics
+import time
+import tomllib
 from pathlib import Path
+from urllib.parse import urlsplit
+
+from utils.botpress_client import BASE_URI, HEADERS
+
+SECRETS_PATH = Path(".streamlit") / "secrets.toml"
+ENDPOINTS = ["users/me", "conversations", "conversation", "messages", "send", "listen"]
+READ_ENDPOINTS = ["users/me", "conversations", "conversation", "messages"]
+PHASES = ["dns", "connect", "tls", "ttfb", "total"]
+
+
+def load_secrets(secrets_path=SECRETS_PATH):
+    """
+    Load secrets from secrets.toml
 
-def load_secrets():
-    """Load secrets from secrets.toml"""
-    secrets_path = Path(".streamlit") / "secrets.toml"
-    
+    Returns:
+        tuple: (chat_api_id, user_keys, base_uri), None values if missing
+    """
     if not secrets_path.exists():
         print("❌ Error: .streamlit/secrets.toml not found!")
         print(f"   Expected location: {secrets_path.absolute()}")
-        return None, None
-    
+        return None, [], None
+
     print(f"✅ Found secrets file at: {secrets_path.absolute()}")
-    
-    # Parse TOML manually (simple parsing)
-    chat_api_id = None
-    user_keys = []
-    
-    with open(secrets_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith('CHAT_API_ID'):
-                chat_api_id = line.split('=')[1].strip().strip('"').strip("'")
-            elif line.startswith('key'):
-                user_key = line.split('=')[1].strip().strip('"').strip("'")
-                user_keys.append(user_key)
-    
-    return chat_api_id, user_keys
-
-
-def test_connection(chat_api_id, user_key):
-    """Test connection to Botpress API"""
-    base_url = f"https://chat.botpress.cloud/{chat_api_id}"
-    
-    print(f"\n🔗 Testing connection to: {base_url}")
-    print(f"🔑 Using user key: {user_key[:10]}..." if user_key else "❌ No user key provided")
-    
-    if not chat_api_id:
-        print("\n❌ CHAT_API_ID is missing!")
-        return False
-    
-    if not user_key:
-        print("\n❌ User key is missing!")
-        return False
-    
-    # Test endpoint
-    url = f"{base_url}/users/me"
-    headers = {
-        "accept": "application/json",
-        "Content-Type": "application/json",
-        "x-user-key": user_key,
-    }
-    
-    print(f"\n📡 Making request to: {url}")
-    
-    try:
-        response = requests.get(url, headers=headers)
-        
-        print(f"\n📊 Response Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print("\n✅ SUCCESS! Authentication working!")
-            print(f"   User ID: {data.get('user', {}).get('id')}")
-            print(f"   User Name: {data.get('user', {}).get('name')}")
-            return True
-        
-        elif response.status_code == 401:
-            print("\n❌ Authentication Failed (401 Unauthorized)")
-            print("   Possible issues:")
-            print("   1. User key is invalid or expired")
-            print("   2. User doesn't exist in Botpress")
-            print("   3. Chat API ID is incorrect")
-            
-        elif response.status_code == 404:
-            print("\n❌ Not Found (404)")
-            print("   Possible issues:")
-            print("   1. Chat API ID is incorrect")
-            print("   2. Chat API integration not installed in Botpress")
-            print("   3. Bot not published")
-            
+    with open(secrets_path, "rb") as f:
+        secrets = tomllib.load(f)
+
+    user_keys = [u["key"] for u in secrets.get("users", []) if u.get("key")]
+    return secrets.get("CHAT_API_ID"), user_keys, secrets.get("BOTPRESS_BASE_URI")
+
+
+class Probe:
+    """One HTTP exchange over a fresh connection, timed phase by phase"""
+
+    def __init__(self, base_uri, timeout=30):
+        parts = urlsplit(base_uri)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        if self.scheme == "https":
+            cafile = os.getenv("REQUESTS_CA_BUNDLE") or os.getenv("SSL_CERT_FILE")
+            self.tls = ssl.create_default_context(cafile=cafile)
         else:
-            print(f"\n❌ Unexpected error: {response.status_code}")
-            
-        print(f"\n📄 Response body: {response.text}")
-        return False
-        
-    except requests.exceptions.ConnectionError:
-        print("\n❌ Connection Error!")
-        print("   Check your internet connection")
-        return False
-    
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {str(e)}")
-        return False
+            self.tls = None
+
+    def run(self, method, path, headers, body=None, stream=False):
+        """
+        Send one request
+
+        Args:
+            stream: Read an SSE response up to its first data event
+                instead of reading the whole body
+
+        Returns:
+            dict: Phase timings in seconds, status and the decoded body
+        """
+        timings = {}
+        start = time.perf_counter()
+
+        addr = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)[0]
+        timings["dns"] = time.perf_counter() - start
+
+        mark = time.perf_counter()
+        sock = socket.socket(addr[0], addr[1], addr[2])
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(addr[4])
+            timings["connect"] = time.perf_counter() - mark
+
+            mark = time.perf_counter()
+            if self.tls is not None:
+                sock = self.tls.wrap_socket(sock, server_hostname=self.host)
+            timings["tls"] = time.perf_counter() - mark
+
+            conn_class = (http.client.HTTPSConnection if self.tls is not None
+                          else http.client.HTTPConnection)
+            conn = conn_class(self.host, self.port, timeout=self.timeout)
+            conn.sock = sock  # already connected, http.client won't reconnect
+
+            data = json.dumps(body).encode() if body is not None else None
+            mark = time.perf_counter()
+            conn.request(method, self.prefix + path, body=data, headers=headers)
+            response = conn.getresponse()
+            timings["ttfb"] = time.perf_counter() - mark
+
+            payload = None
+            if stream and response.status == 200:
+                for line in response:
+                    value = line.strip()
+                    if value.startswith(b"data:") and value[5:].strip() != b"ping":
+                        break
+            else:
+                raw = response.read()
+                try:
+                    payload = json.loads(raw) if raw else None
+                except ValueError:
+                    payload = raw.decode(errors="replace")
+            timings["total"] = time.perf_counter() - start
+            return {"status": response.status, "timings": timings, "body": payload}
+        finally:
+            sock.close()
+
+
+def summarize(values):
+    """Percentiles, mean and jitter (standard deviation) in milliseconds"""
+    if not values:
+        return {}
+    ms = sorted(v * 1000 for v in values)
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+        jitter = statistics.stdev(ms)
+    else:
+        p50 = p90 = p99 = ms[0]
+        jitter = 0.0
+    return {
+        "p50_ms": round(p50, 2),
+        "p90_ms": round(p90, 2),
+        "p99_ms": round(p99, 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+        "max_ms": round(ms[-1], 2),
+        "jitter_ms": round(jitter, 2),
+    }
+
+
+def explain_status(status):
+    """Print likely causes for the statuses users run into"""
+    if status == 401:
+        print("\n❌ Authentication Failed (401 Unauthorized)")
+        print("   Possible issues:")
+        print("   1. User key is invalid or expired")
+        print("   2. User doesn't exist in Botpress")
+        print("   3. Chat API ID is incorrect")
+    elif status == 404:
+        print("\n❌ Not Found (404)")
+        print("   Possible issues:")
+        print("   1. Chat API ID is incorrect")
+        print("   2. Chat API integration not installed in Botpress")
+        print("   3. Bot not published")
+    else:
+        print(f"\n❌ Unexpected error: {status}")
+
+
+def run_probes(base_uri, chat_api_id, user_key, rounds, endpoints, timeout):
+    """
+    Probe each endpoint ``rounds`` times
+
+    Returns:
+        dict: endpoint -> {"samples", "errors", "statuses", "phases"}, or
+            None if the user key does not work at all
+    """
+    probe = Probe(f"{base_uri.rstrip('/')}/{chat_api_id}", timeout=timeout)
+    headers = {**HEADERS, "x-user-key": user_key}
+    if "listen" in endpoints and "send" not in endpoints:
+        endpoints = [*endpoints, "send"]  # listen times the reply to a sent message
+    results = {name: {"timings": {p: [] for p in PHASES}, "statuses": {}, "errors": 0}
+               for name in endpoints}
+
+    def record(name, method, path, body=None, stream=False):
+        entry = results[name]
+        try:
+            result = probe.run(method, path, headers, body=body, stream=stream)
+        except (OSError, http.client.HTTPException) as e:
+            entry["errors"] += 1
+            entry["statuses"][type(e).__name__] = entry["statuses"].get(type(e).__name__, 0) + 1
+            return None
+        status = str(result["status"])
+        entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+        if result["status"] >= 400:
+            entry["errors"] += 1
+        for phase, value in result["timings"].items():
+            entry["timings"][phase].append(value)
+        return result
+
+    # Check the key once before timing anything
+    check = probe.run("GET", "/users/me", headers)
+    if check["status"] != 200:
+        explain_status(check["status"])
+        print(f"\n📄 Response body: {check['body']}")
+        return None
+    user = check["body"].get("user", {})
+    print("\n✅ SUCCESS! Authentication working!")
+    print(f"   User ID: {user.get('id')}")
+    print(f"   User Name: {user.get('name')}")
+
+    conversation_id = None
+    if {"conversation", "messages"} & set(endpoints) and not {"send", "listen"} & set(endpoints):
+        # Read-only probes use the user's newest conversation
+        listed = probe.run("GET", "/conversations", headers)
+        conversations = (listed["body"] or {}).get("conversations") or []
+        if conversations:
+            conversation_id = conversations[0]["id"]
+    if conversation_id is None and {"conversation", "messages", "send", "listen"} & set(endpoints):
+        # Probe messages go to a conversation of their own, never a live one
+        created = probe.run("POST", "/conversations", headers, body={"body": {}})
+        conversation_id = (created["body"] or {}).get("conversation", {}).get("id")
+        if not conversation_id:
+            print(f"\n❌ Could not create a probe conversation: {created['status']}")
+            return None
+
+    for i in range(rounds):
+        print(f"   Round {i + 1}/{rounds}...", end="\r")
+        if "users/me" in endpoints:
+            record("users/me", "GET", "/users/me")
+        if "conversations" in endpoints:
+            record("conversations", "GET", "/conversations")
+        if "conversation" in endpoints:
+            record("conversation", "GET", f"/conversations/{conversation_id}")
+        if "messages" in endpoints:
+            record("messages", "GET", f"/conversations/{conversation_id}/messages?limit=20")
+        if "send" in endpoints or "listen" in endpoints:
+            # listen waits for the reply to a message, like the chat page does
+            message = {
+                "payload": {"type": "text", "text": "Latency probe, please ignore"},
+                "conversationId": conversation_id,
+            }
+            sent = record("send", "POST", "/messages", body=message)
+            if "listen" in endpoints and sent and sent["status"] < 400:
+                record("listen", "GET", f"/conversations/{conversation_id}/listen",
+                       stream=True)
+    print()
+
+    return {
+        name: {
+            "samples": len(entry["timings"]["total"]),
+            "errors": entry["errors"],
+            "statuses": entry["statuses"],
+            "phases": {p: summarize(v) for p, v in entry["timings"].items()},
+        }
+        for name, entry in results.items()
+    }
+
+
+def print_report(report):
+    """Print per-endpoint phase percentiles and the dominant phase"""
+    print("\n" + "=" * 78)
+    print(f"📊 LATENCY BREAKDOWN ({report['base_uri']}, {report['rounds']} rounds)")
+    print("=" * 78)
+    print(f"{'endpoint':<14}{'phase':<9}{'p50':>9}{'p90':>9}{'p99':>9}"
+          f"{'max':>9}{'jitter':>9}  n/err")
+    for name, entry in report["endpoints"].items():
+        for phase in PHASES:
+            stats = entry["phases"][phase]
+            if not stats:
+                continue
+            label = name if phase == PHASES[0] else ""
+            counts = f"{entry['samples']}/{entry['errors']}" if phase == PHASES[0] else ""
+            print(f"{label:<14}{phase:<9}{stats['p50_ms']:>9.1f}{stats['p90_ms']:>9.1f}"
+                  f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+                  f"{stats['jitter_ms']:>9.1f}  {counts}")
+        phases = entry["phases"]
+        if phases["total"]:
+            # Time spent in the server (ttfb) vs. getting a connection up
+            setup = sum(phases[p].get("p50_ms", 0) for p in ("dns", "connect", "tls"))
+            worst = max(("connection setup", setup), ("server (ttfb)", phases["ttfb"]["p50_ms"]),
+                        key=lambda item: item[1])
+            print(f"{'':<14}→ most time in {worst[0]}")
+        if entry["errors"]:
+            print(f"{'':<14}⚠️  statuses: {entry['statuses']}")
+    print("=" * 78)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Probe Botpress Chat API latency.")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="Probes per endpoint.")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=READ_ENDPOINTS,
+                        help="Endpoints to probe (default: the read-only ones). send and "
+                             "listen post probe messages; listen implies send.")
+    parser.add_argument("--base-uri", default=None,
+                        help="Chat API base URI (default: secrets, BOTPRESS_BASE_URI, cloud).")
+    parser.add_argument("--mock", action="store_true",
+                        help="Probe an in-process mock_botpress server instead.")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--json", default=None, help="Also write the report to this file.")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🔍 BOTPRESS CONNECTION DEBUG TOOL")
     print("=" * 60)
-    
-    # Load secrets
-    chat_api_id, user_keys = load_secrets()
-    
+
+    server = None
+    if args.mock:
+        from mock_botpress import MockBotpressServer, MockConfig
+        server = MockBotpressServer(MockConfig(accept_any_key=True, token_interval_ms=5)).start()
+        chat_api_id, user_keys, base_uri = "mock", ["mock-probe-key"], server.url
+        print(f"\n✅ Started mock Botpress at {base_uri}")
+    else:
+        chat_api_id, user_keys, secrets_uri = load_secrets()
+        base_uri = args.base_uri or secrets_uri or BASE_URI
+
     if not chat_api_id:
         print("\n❌ Critical Error: CHAT_API_ID not found in secrets.toml")
         print("\n📝 Your secrets.toml should look like:")
@@ -116,40 +326,41 @@ def main():
         print('   [[users]]')
         print('   key = "your_user_key_here"')
         return
-    
-    print(f"\n✅ CHAT_API_ID found: {chat_api_id}")
-    
+
     if not user_keys:
         print("\n❌ Critical Error: No user keys found in secrets.toml")
         print("\n💡 You need to create a user first!")
         print("   Run: python create_botpress_user.py --name YourName --id user_001 --chat_api_id " + chat_api_id)
         return
-    
-    print(f"\n✅ Found {len(user_keys)} user key(s)")
-    
-    # Test connection with first user key
-    print("\n" + "=" * 60)
-    print("Testing connection with first user...")
-    print("=" * 60)
-    
-    success = test_connection(chat_api_id, user_keys[0])
-    
-    if success:
-        print("\n" + "=" * 60)
-        print("🎉 ALL TESTS PASSED!")
-        print("=" * 60)
-        print("\nYour Botpress integration is configured correctly.")
-        print("You can now run your Streamlit app.")
-    else:
-        print("\n" + "=" * 60)
-        print("❌ TESTS FAILED")
-        print("=" * 60)
+
+    print(f"\n🔗 Probing: {base_uri}/{chat_api_id}")
+    print(f"🔑 Using user key: {user_keys[0][:10]}...")
+
+    try:
+        endpoints = run_probes(base_uri, chat_api_id, user_keys[0], args.rounds,
+                               args.endpoints, args.timeout)
+    except (OSError, http.client.HTTPException) as e:
+        print(f"\n❌ Connection Error: {e}")
+        print("   Check your internet connection and the base URI")
+        endpoints = None
+    finally:
+        if server is not None:
+            server.stop()
+
+    if endpoints is None:
         print("\n📋 Next Steps:")
         print("1. Check the error messages above")
         print("2. Verify your CHAT_API_ID in Botpress Studio")
         print("3. Make sure your bot is published")
         print("4. Try creating a new user with the create_botpress_user.py script")
+        return
+
+    report = {"base_uri": base_uri, "rounds": args.rounds, "endpoints": endpoints}
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report written to {args.json}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,393 @@
+"""
+GameVerse Load Test
+Drives N scripted shopper/chat sessions against app.py through Streamlit's
+testing API, with the Botpress Chat API replaced by the local stand-in.
+
+Each session browses, searches, adds a game to the cart, checks out and
+chats. The report covers throughput, rerun latency percentiles, memory
+per session and error rates.
+
+Usage:
+    python load_test.py --sessions 50 --concurrency 10 --chat-messages 2
+    python load_test.py --sessions 20 --latency-ms 80 --json load_report.json
+    python load_test.py --base-uri http://127.0.0.1:8787 --users-file .streamlit/user_pool.toml
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import tomllib
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest, app_test
+
+from mock_botpress import MockBotpressServer, MockConfig
+
+APP_PATH = Path(__file__).parent / "app.py"
+
+SEARCH_TERMS = ["Mystic", "Racer", "Shadow", "Quest", "Star", "King"]
+CHAT_PROMPTS = [
+    "What is your refund policy?",
+    "What are your store hours?",
+    "How do I download my games?",
+    "Can you recommend an RPG?",
+]
+
+
+def current_rss():
+    """Resident set size of this process in bytes (0 if unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+@contextmanager
+def shared_test_runtime(secrets):
+    """
+    Let several AppTest sessions run at once
+
+    AppTest installs a fresh mock Runtime at the start of every run and
+    clears it at the end, so one session finishing pulls the runtime out
+    from under the others. Install one shared runtime (the way a real
+    server process has one) and point AppTest at a subclass, so its
+    per-run install/clear no longer touches the real singleton.
+
+    Secrets have the same problem: AppTest swaps the global st.secrets
+    for its own around every run, so concurrent runs restore each other's.
+    Install one shared Secrets instead and give sessions none of their
+    own, which makes AppTest skip the swap.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    class _PerRunRuntime(Runtime):
+        _instance = None
+
+    shared_secrets = Secrets()
+    shared_secrets._secrets = dict(secrets)
+
+    saved_instance, saved_secrets = Runtime._instance, st.secrets
+    Runtime._instance = runtime
+    app_test.Runtime = _PerRunRuntime
+    st.secrets = shared_secrets
+    try:
+        yield runtime
+    finally:
+        st.secrets = saved_secrets
+        app_test.Runtime = Runtime
+        Runtime._instance = saved_instance
+
+
+class LoadStats:
+    """Thread-safe collector for rerun timings and errors"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)   # step -> [seconds]
+        self.errors = defaultdict(int)       # step -> count
+        self.error_samples = []
+        self.sessions_completed = 0
+        self.sessions_failed = 0
+
+    def record(self, step, seconds, error=None):
+        with self.lock:
+            self.latencies[step].append(seconds)
+            if error:
+                self.errors[step] += 1
+                if len(self.error_samples) < 10:
+                    self.error_samples.append(f"{step}: {error}")
+
+    def finish_session(self, ok):
+        with self.lock:
+            if ok:
+                self.sessions_completed += 1
+            else:
+                self.sessions_failed += 1
+
+
+def percentiles(values):
+    """p50/p90/p95/p99/max in milliseconds"""
+    if not values:
+        return {}
+    arr = np.asarray(values) * 1000
+    p50, p90, p95, p99 = np.percentile(arr, [50, 90, 95, 99])
+    return {
+        "count": len(values),
+        "mean_ms": round(float(arr.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p90_ms": round(float(p90), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(arr.max()), 2),
+    }
+
+
+class ScriptedSession:
+    """
+    One simulated shopper driving the app through AppTest
+
+    Run inside shared_test_runtime, which provides the secrets.
+    """
+
+    def __init__(self, index, stats, chat_messages=1, think_time=0.0,
+                 timeout=60, seed=None):
+        self.index = index
+        self.stats = stats
+        self.chat_messages = chat_messages
+        self.think_time = think_time
+        self.random = random.Random(seed)
+        self.at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+
+    def _step(self, name, action):
+        """Run one interaction + rerun, recording latency and errors"""
+        if self.think_time:
+            time.sleep(self.random.uniform(0, self.think_time))
+        start = time.perf_counter()
+        error = None
+        try:
+            action()
+            if self.at.exception:
+                error = self.at.exception[0].message
+            elif self.at.error:
+                error = self.at.error[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self.stats.record(name, time.perf_counter() - start, error)
+        if error and name == "open_app":
+            raise RuntimeError(error)
+        return error is None
+
+    def _goto(self, page):
+        self.at.sidebar.radio[0].set_value(page).run()
+
+    def _click(self, label=None, key=None):
+        for button in self.at.button:
+            if (key and button.key == key) or (label and button.label == label):
+                button.click().run()
+                return
+        raise LookupError(f"button {key or label!r} not found")
+
+    def run(self):
+        self._step("open_app", self.at.run)
+        self._step("browse", lambda: self._goto("Browse Games"))
+
+        term = self.random.choice(SEARCH_TERMS)
+        self._step("search", lambda: self.at.text_input[0].input(term).run())
+        self._step("clear_search", lambda: self.at.text_input[0].input("").run())
+
+        game_id = self.random.randint(1, 8)
+        self._step("add_to_cart", lambda: self._click(key=f"cart_browse_{game_id}"))
+        self._step("cart", lambda: self._goto("My Cart"))
+        self._step("checkout", lambda: self._click(label="Proceed to Checkout"))
+
+        if self.chat_messages:
+            self._step("open_chat", lambda: self._goto("AI Chatbot"))
+            for _ in range(self.chat_messages):
+                prompt = self.random.choice(CHAT_PROMPTS)
+                self._step("chat", lambda: self.at.chat_input[0].set_value(prompt).run())
+
+        self._step("home", lambda: self._goto("Home"))
+
+
+def run_session(index, args, stats):
+    session = ScriptedSession(
+        index,
+        stats,
+        chat_messages=args.chat_messages,
+        think_time=args.think_time,
+        timeout=args.timeout,
+        seed=None if args.seed is None else args.seed + index,
+    )
+    try:
+        session.run()
+        stats.finish_session(True)
+    except Exception as e:
+        stats.record("session", 0.0, f"{type(e).__name__}: {e}")
+        stats.finish_session(False)
+    return session
+
+
+def build_report(args, stats, elapsed, rss_before, rss_after, traced_peak):
+    all_latencies = [v for values in stats.latencies.values() for v in values]
+    total_errors = sum(stats.errors.values())
+    reruns = len(all_latencies)
+    return {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "sessions_completed": stats.sessions_completed,
+        "sessions_failed": stats.sessions_failed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput": {
+            "reruns_per_s": round(reruns / elapsed, 2) if elapsed else 0.0,
+            "sessions_per_s": round(stats.sessions_completed / elapsed, 3) if elapsed else 0.0,
+        },
+        "rerun_latency": percentiles(all_latencies),
+        "steps": {
+            step: {**percentiles(values), "errors": stats.errors.get(step, 0)}
+            for step, values in stats.latencies.items()
+        },
+        "errors": {
+            "total": total_errors,
+            "rate": round(total_errors / reruns, 4) if reruns else 0.0,
+            "samples": stats.error_samples,
+        },
+        "memory": {
+            "rss_before_mb": round(rss_before / 2**20, 1),
+            "rss_after_mb": round(rss_after / 2**20, 1),
+            "rss_per_session_kb": round((rss_after - rss_before) / 1024 / max(args.sessions, 1), 1),
+            "traced_peak_per_session_kb": (
+                round(traced_peak / 1024 / max(args.sessions, 1), 1)
+                if traced_peak is not None else None
+            ),
+        },
+    }
+
+
+def print_report(report):
+    print("=" * 60)
+    print("GAMEVERSE LOAD TEST")
+    print("=" * 60)
+    print(f"Sessions: {report['sessions_completed']}/{report['sessions']} completed "
+          f"(concurrency {report['concurrency']}) in {report['elapsed_s']}s")
+    tp = report["throughput"]
+    print(f"Throughput: {tp['reruns_per_s']} reruns/s, {tp['sessions_per_s']} sessions/s")
+    lat = report["rerun_latency"]
+    if lat:
+        print(f"Rerun latency: p50 {lat['p50_ms']}ms | p90 {lat['p90_ms']}ms | "
+              f"p95 {lat['p95_ms']}ms | p99 {lat['p99_ms']}ms | max {lat['max_ms']}ms")
+    print("\nPer step:")
+    for step, s in report["steps"].items():
+        if s.get("count"):
+            print(f"  {step:<14} n={s['count']:<5} p50 {s['p50_ms']:>8}ms  "
+                  f"p95 {s['p95_ms']:>8}ms  errors {s['errors']}")
+    err = report["errors"]
+    print(f"\nErrors: {err['total']} ({err['rate']:.2%} of reruns)")
+    for sample in err["samples"]:
+        print(f"  - {sample}")
+    mem = report["memory"]
+    print(f"\nMemory: RSS {mem['rss_before_mb']} -> {mem['rss_after_mb']} MB, "
+          f"~{mem['rss_per_session_kb']} KB/session")
+    if mem["traced_peak_per_session_kb"] is not None:
+        print(f"        traced Python peak ~{mem['traced_peak_per_session_kb']} KB/session")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the GameVerse Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=20, help="Total sessions to run.")
+    parser.add_argument("--concurrency", type=int, default=5,
+                        help="Sessions running at the same time.")
+    parser.add_argument("--chat-messages", type=int, default=1,
+                        help="Chat messages sent per session (0 skips the chatbot).")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Max random pause (s) before each interaction.")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-rerun timeout (s).")
+    parser.add_argument("--base-uri", default=None,
+                        help="Use an already running Botpress stand-in instead of starting one.")
+    parser.add_argument("--users-file", default=None,
+                        help="TOML with CHAT_API_ID and [[users]] keys (see provision_users.py).")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Stand-in latency.")
+    parser.add_argument("--token-interval-ms", type=float, default=5,
+                        help="Stand-in streaming cadence.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Stand-in error injection rate.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Track Python allocations with tracemalloc (slower).")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None,
+                        help="Write the report to this JSON file.")
+    args = parser.parse_args()
+
+    # AppTest logs every deprecation warning per rerun; keep output readable
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    # The stand-in starts empty; a history store left over from earlier
+    # runs would point sessions at conversations it doesn't have
+    history_dir = tempfile.TemporaryDirectory(prefix="gameverse-loadtest-")
+    os.environ.setdefault("GAMEVERSE_HISTORY_DB",
+                          str(Path(history_dir.name) / "chat_history.db"))
+
+    server = None
+    base_uri = args.base_uri
+    if base_uri is None:
+        server = MockBotpressServer(MockConfig(
+            latency_ms=args.latency_ms,
+            token_interval_ms=args.token_interval_ms,
+            error_rate=args.error_rate,
+            accept_any_key=True,
+            seed=args.seed,
+        )).start()
+        base_uri = server.url
+
+    secrets = {
+        "CHAT_API_ID": "loadtest",
+        "BOTPRESS_BASE_URI": base_uri,
+        "users": [{"key": f"loadtest-key-{i:05d}"} for i in range(args.sessions)],
+    }
+    if args.users_file:
+        # Real identities, e.g. provisioned with provision_users.py
+        with open(args.users_file, "rb") as f:
+            provisioned = tomllib.load(f)
+        secrets["CHAT_API_ID"] = provisioned.get("CHAT_API_ID", secrets["CHAT_API_ID"])
+        secrets["users"] = [{"key": u["key"]} for u in provisioned.get("users", [])
+                            if u.get("key")]
+
+    stats = LoadStats()
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = current_rss()
+    start = time.perf_counter()
+
+    sessions = []
+    with shared_test_runtime(secrets), ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run_session, i, args, stats)
+                   for i in range(args.sessions)]
+        for future in futures:
+            # Keep sessions alive until the end so their memory is counted
+            sessions.append(future.result())
+
+    elapsed = time.perf_counter() - start
+    rss_after = current_rss()
+    traced_peak = None
+    if args.trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    report = build_report(args, stats, elapsed, rss_before, rss_after, traced_peak)
+    if server is not None:
+        report["botpress_stand_in"] = dict(server.state.stats)
+        server.stop()
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""
+Local Botpress Chat API stand-in
+Implements the endpoints BotpressClient uses so chat code paths can be
+benchmarked and load-tested offline.
+
+Run it, then point the app at it:
+
+    python mock_botpress.py --port 8787 --latency-ms 40 --token-interval-ms 30
+
+    # .streamlit/secrets.toml
+    BOTPRESS_BASE_URI = "http://127.0.0.1:8787"
+
+or export BOTPRESS_BASE_URI before starting streamlit / scripts.
+"""
+
+import argparse
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_REPLIES = [
+    "Our refund policy allows returns within 14 days of purchase if you have "
+    "played for less than 2 hours.",
+    "GameVerse support is available every day from 9 AM to 9 PM.",
+    "Purchased games appear in your library right away and can be downloaded "
+    "from the GameVerse launcher.",
+    "If you like fantasy RPGs, Mystic Legends is one of our top-rated games.",
+]
+
+
+class MockConfig:
+    """Behaviour knobs for the mock server"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, token_interval_ms=20,
+                 tokens_per_event=1, error_rate=0.0, error_status=500,
+                 rate_limit=0.0, rate_burst=10, retry_after=1,
+                 ping_interval=5.0, listen_timeout=30.0, idle_timeout=0,
+                 accept_any_key=False, replies=None, seed=None):
+        self.latency_ms = latency_ms            # added to every response
+        self.jitter_ms = jitter_ms              # uniform +/- jitter on latency
+        self.token_interval_ms = token_interval_ms  # gap between SSE events
+        self.tokens_per_event = tokens_per_event    # words per streamed event
+        self.error_rate = error_rate            # probability of error_status
+        self.error_status = error_status
+        self.rate_limit = rate_limit            # requests/sec per user key, 0 = off
+        self.rate_burst = rate_burst
+        self.retry_after = retry_after          # seconds, sent with 429
+        self.ping_interval = ping_interval      # SSE ping while waiting for a reply
+        self.listen_timeout = listen_timeout    # close idle listen streams
+        self.idle_timeout = idle_timeout        # drop idle keep-alive connections, 0 = never
+        self.accept_any_key = accept_any_key    # auto-register unknown user keys
+        self.replies = replies or DEFAULT_REPLIES
+        self.random = random.Random(seed)
+
+
+class _TokenBucket:
+    """Per-key rate limiter"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class MockState:
+    """In-memory users, conversations and messages"""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.users = {}           # key -> user
+        self.conversations = {}   # id -> conversation
+        self.messages = {}        # conversation id -> [message], oldest first
+        self.pending = {}         # conversation id -> Queue of reply texts
+        self.buckets = {}         # key -> _TokenBucket
+        self.stats = {"requests": 0, "errors_injected": 0, "rate_limited": 0,
+                      "streams": 0, "heads": 0}
+
+    def create_user(self, name=None, user_id=None):
+        key = f"mock-key-{uuid.uuid4().hex}"
+        user = {
+            "id": user_id or f"user_{uuid.uuid4().hex[:12]}",
+            "name": name or "Mock User",
+            "createdAt": _now(),
+            "updatedAt": _now(),
+        }
+        with self.lock:
+            self.users[key] = user
+        return user, key
+
+    def user_for_key(self, key):
+        with self.lock:
+            user = self.users.get(key)
+        if user is None and key and self.config.accept_any_key:
+            user = {"id": f"user_{key[-12:]}", "name": "Mock User",
+                    "createdAt": _now(), "updatedAt": _now()}
+            with self.lock:
+                user = self.users.setdefault(key, user)
+        return user
+
+    def create_conversation(self, user):
+        conv = {"id": f"conv_{uuid.uuid4().hex[:16]}", "ownerId": user["id"],
+                "createdAt": _now(), "updatedAt": _now()}
+        with self.lock:
+            self.conversations[conv["id"]] = conv
+            self.messages[conv["id"]] = []
+            self.pending[conv["id"]] = queue.Queue()
+        return conv
+
+    def add_message(self, conversation_id, user_id, text):
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:16]}",
+            "createdAt": _now(),
+            "conversationId": conversation_id,
+            "payload": {"type": "text", "text": text},
+            "userId": user_id,
+        }
+        with self.lock:
+            self.messages[conversation_id].append(message)
+        return message
+
+    def allow(self, key):
+        """Apply the configured rate limit to one request"""
+        if not self.config.rate_limit:
+            return True
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = _TokenBucket(
+                    self.config.rate_limit, self.config.rate_burst
+                )
+            return bucket.take()
+
+
+class MockBotpressHandler(BaseHTTPRequestHandler):
+    """Request handler; paths look like /<api_id>/<endpoint>"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockBotpress/1.0"
+
+    def setup(self):
+        # Like a load balancer, close keep-alive connections left idle
+        self.timeout = self.server.state.config.idle_timeout or None
+        super().setup()
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # --- plumbing ---
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split("/") if p]
+        # Drop the api id prefix
+        return parts[1:], parse_qs(parsed.query)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, headers=None):
+        self._send_json(status, {"code": status, "type": "Error", "message": message},
+                        headers)
+
+    def _simulate(self):
+        """Apply latency, error injection and rate limits; False if handled"""
+        config = self.state.config
+        with self.state.lock:
+            self.state.stats["requests"] += 1
+        if config.latency_ms or config.jitter_ms:
+            jitter = config.random.uniform(-config.jitter_ms, config.jitter_ms)
+            time.sleep(max(0.0, config.latency_ms + jitter) / 1000)
+        if not self.state.allow(self.headers.get("x-user-key", "")):
+            with self.state.lock:
+                self.state.stats["rate_limited"] += 1
+            self._error(429, "Rate limit exceeded",
+                        {"Retry-After": str(config.retry_after)})
+            return False
+        if config.error_rate and config.random.random() < config.error_rate:
+            with self.state.lock:
+                self.state.stats["errors_injected"] += 1
+            self._error(config.error_status, "Injected failure")
+            return False
+        return True
+
+    def _auth(self):
+        user = self.state.user_for_key(self.headers.get("x-user-key"))
+        if user is None:
+            self._error(401, "Invalid user key")
+        return user
+
+    # --- verbs ---
+
+    def do_HEAD(self):
+        """Cheap keep-alive probe; no latency, errors or rate limits"""
+        with self.state.lock:
+            self.state.stats["heads"] += 1
+        self.send_response(204)
+        self.end_headers()
+
+    def do_GET(self):
+        parts, query = self._route()
+        if not self._simulate():
+            return
+        if parts == ["users", "me"]:
+            user = self._auth()
+            if user:
+                self._send_json(200, {"user": user})
+        elif parts == ["conversations"]:
+            user = self._auth()
+            if user:
+                with self.state.lock:
+                    convs = [c for c in self.state.conversations.values()
+                             if c["ownerId"] == user["id"]]
+                convs.sort(key=lambda c: c["createdAt"], reverse=True)
+                self._send_json(200, {"conversations": convs, "meta": {}})
+        elif len(parts) == 2 and parts[0] == "conversations":
+            if self._auth():
+                conv = self.state.conversations.get(parts[1])
+                if conv is None:
+                    self._error(404, "Conversation not found")
+                else:
+                    self._send_json(200, {"conversation": conv})
+        elif len(parts) == 3 and parts[0] == "conversations" and parts[2] == "messages":
+            if self._auth():
+                if parts[1] not in self.state.messages:
+                    self._error(404, "Conversation not found")
+                    return
+                limit = int(query.get("limit", ["20"])[0])
+                with self.state.lock:
+                    messages = list(reversed(self.state.messages[parts[1]]))[:limit]
+                self._send_json(200, {"messages": messages, "meta": {}})
+        elif len(parts) == 3 and parts[0] == "conversations" and parts[2] == "listen":
+            user = self._auth()
+            if user:
+                self._listen(parts[1])
+        else:
+            self._error(404, "Not found")
+
+    def do_POST(self):
+        parts, _ = self._route()
+        body = self._read_json()
+        if body is None:
+            self._error(400, "Invalid JSON body")
+            return
+        if not self._simulate():
+            return
+        if parts == ["users"]:
+            user, key = self.state.create_user(body.get("name"), body.get("id"))
+            self._send_json(200, {"user": user, "key": key})
+        elif parts == ["conversations"]:
+            user = self._auth()
+            if user:
+                self._send_json(200, {"conversation": self.state.create_conversation(user)})
+        elif parts == ["messages"]:
+            user = self._auth()
+            if not user:
+                return
+            conv_id = body.get("conversationId")
+            text = body.get("payload", {}).get("text", "")
+            if conv_id not in self.state.messages:
+                self._error(404, "Conversation not found")
+                return
+            message = self.state.add_message(conv_id, user["id"], text)
+            reply = self.state.config.random.choice(self.state.config.replies)
+            self.state.pending[conv_id].put(reply)
+            self._send_json(200, {"message": message})
+        else:
+            self._error(404, "Not found")
+
+    # --- SSE ---
+
+    def _write_event(self, data):
+        self.wfile.write(f"data: {data}\n\n".encode())
+        self.wfile.flush()
+
+    def _listen(self, conversation_id):
+        """Stream the next bot reply, one event per token chunk, then close"""
+        pending = self.state.pending.get(conversation_id)
+        if pending is None:
+            self._error(404, "Conversation not found")
+            return
+        config = self.state.config
+        with self.state.lock:
+            self.state.stats["streams"] += 1
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            deadline = time.monotonic() + config.listen_timeout
+            reply = None
+            while reply is None and time.monotonic() < deadline:
+                try:
+                    reply = pending.get(timeout=config.ping_interval)
+                except queue.Empty:
+                    self._write_event("ping")
+            if reply is None:
+                return
+
+            words = reply.split(" ")
+            step = max(1, config.tokens_per_event)
+            for i in range(0, len(words), step):
+                chunk = " ".join(words[i:i + step])
+                if i + step < len(words):
+                    chunk += " "
+                event = {
+                    "type": "message_created",
+                    "data": {
+                        "id": f"msg_{uuid.uuid4().hex[:16]}",
+                        "conversationId": conversation_id,
+                        "payload": {"type": "text", "text": chunk},
+                        "userId": "bot",
+                    },
+                }
+                self._write_event(json.dumps(event))
+                if config.token_interval_ms:
+                    time.sleep(config.token_interval_ms / 1000)
+            self.state.add_message(conversation_id, "bot", reply)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class MockBotpressServer:
+    """
+    Threaded mock server, usable from scripts and load tests
+
+    Example:
+        with MockBotpressServer(MockConfig(latency_ms=50)) as server:
+            client = BotpressClient(api_id="mock", base_uri=server.url)
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0, verbose=False):
+        self.config = config or MockConfig()
+        self.httpd = ThreadingHTTPServer((host, port), MockBotpressHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = MockState(self.config)
+        self.httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Botpress Chat API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0,
+                        help="Latency added to every request.")
+    parser.add_argument("--jitter-ms", type=float, default=0,
+                        help="Uniform jitter applied to the latency.")
+    parser.add_argument("--token-interval-ms", type=float, default=20,
+                        help="Delay between streamed reply events.")
+    parser.add_argument("--tokens-per-event", type=int, default=1,
+                        help="Words sent in each streamed event.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Probability (0-1) of answering with --error-status.")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Requests per second allowed per user key (0 = unlimited).")
+    parser.add_argument("--rate-burst", type=int, default=10)
+    parser.add_argument("--retry-after", type=int, default=1,
+                        help="Retry-After seconds sent with 429 responses.")
+    parser.add_argument("--idle-timeout", type=float, default=0,
+                        help="Close keep-alive connections idle this many seconds (0 = never).")
+    parser.add_argument("--accept-any-key", action="store_true",
+                        help="Treat unknown user keys as new users.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_interval_ms=args.token_interval_ms,
+        tokens_per_event=args.tokens_per_event,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit=args.rate_limit,
+        rate_burst=args.rate_burst,
+        retry_after=args.retry_after,
+        idle_timeout=args.idle_timeout,
+        accept_any_key=args.accept_any_key,
+        seed=args.seed,
+    )
+    server = MockBotpressServer(config, args.host, args.port, verbose=args.verbose)
+    print(f"Mock Botpress Chat API listening on {server.url}")
+    print(f"Set BOTPRESS_BASE_URI={server.url} to use it.")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Provision Botpress Users Script
+Create many users concurrently for load tests and per-user client pools
+
+Users are created through BotpressClient.create_user by a bounded worker
+pool, throttled by a shared rate limit, and written as [[users]] entries
+(id, name, key) to secrets.toml or a separate pool file. Ids already in
+the target file are skipped, so re-running only fills the gaps.
+
+Usage:
+    python provision_users.py --count 50 --chat_api_id <id>
+    python provision_users.py --count 200 --pool-file .streamlit/user_pool.toml
+    python provision_users.py --count 20 --base-uri http://127.0.0.1:8787 --chat_api_id mock
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from utils.botpress_client import BotpressClient
+
+secrets_path = Path(".streamlit") / "secrets.toml"
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 5.0  # user creations per second, across all workers
+
+
+class RateLimiter:
+    """Blocking token bucket shared by all workers"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def read_users(path):
+    """
+    Read the [[users]] entries of a TOML file
+
+    Returns:
+        tuple: (CHAT_API_ID or None, list of user dicts)
+    """
+    if not path.exists():
+        return None, []
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    return data.get("CHAT_API_ID"), data.get("users", [])
+
+
+def _toml_entry(user):
+    # JSON string escaping is valid for TOML basic strings
+    lines = ["", "[[users]]"]
+    for field in ("id", "name", "key"):
+        if user.get(field):
+            lines.append(f"{field} = {json.dumps(user[field])}")
+    return "\n".join(lines) + "\n"
+
+
+def append_users(path, users, chat_api_id=None):
+    """
+    Append users to a TOML file atomically
+
+    Existing content is kept as is; a new file starts with CHAT_API_ID so
+    it can be used as a standalone pool file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = path.read_text() if path.exists() else ""
+    if not content and chat_api_id:
+        content = f"CHAT_API_ID = {json.dumps(chat_api_id)}\n"
+    if content and not content.endswith("\n"):
+        content += "\n"
+    content += "".join(_toml_entry(user) for user in users)
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def provision(chat_api_id, user_ids, name_prefix, workers=DEFAULT_WORKERS,
+              rate=DEFAULT_RATE, base_uri=None):
+    """
+    Create users concurrently
+
+    Args:
+        user_ids: Ids of the users to create
+        name_prefix: Display names are "<name_prefix> (<user id>)"
+        rate: Creations per second across all workers (0 = unlimited)
+
+    Returns:
+        tuple: (created user dicts, {user id: error message})
+    """
+    adapter = BotpressClient.create_adapter(pool_connections=1, pool_maxsize=workers)
+    limiter = RateLimiter(rate, burst=workers)
+    local = threading.local()
+
+    def create(user_id):
+        # requests.Session isn't thread-safe; one client per worker, one pool
+        if not hasattr(local, "client"):
+            local.client = BotpressClient(api_id=chat_api_id, user_key="",
+                                          base_uri=base_uri, adapter=adapter)
+        limiter.acquire()
+        name = f"{name_prefix} ({user_id})"
+        result = local.client.create_user(name, user_id)
+        if result.get("status") == 409:
+            return user_id, None, "already exists in Botpress, but its key isn't in the file"
+        if "key" not in result:
+            return user_id, None, result.get("error", "no key in response")
+        return user_id, {"id": user_id, "name": name, "key": result["key"]}, None
+
+    created, failed = [], {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(create, user_id) for user_id in user_ids]
+            for future in as_completed(futures):
+                user_id, user, error = future.result()
+                if user:
+                    created.append(user)
+                else:
+                    failed[user_id] = error
+                done = len(created) + len(failed)
+                print(f"   {done}/{len(user_ids)} ({len(failed)} failed)", end="\r")
+    finally:
+        print()
+        adapter.close()
+
+    created.sort(key=lambda user: user["id"])
+    return created, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Create Botpress users in bulk and store their keys."
+    )
+    parser.add_argument("--count", type=int, required=True,
+                        help="Number of users the target file should hold.")
+    parser.add_argument("--chat_api_id", default=None,
+                        help="Botpress Chat API ID (default: CHAT_API_ID from the target file).")
+    parser.add_argument("--prefix", default="loadtest",
+                        help="User ids are <prefix>_<n>, e.g. loadtest_00042.")
+    parser.add_argument("--name", default="GameVerse Load User",
+                        help="Display name prefix.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Concurrent create requests.")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Max user creations per second (0 = unlimited).")
+    parser.add_argument("--pool-file", type=Path, default=None,
+                        help="Write to this file instead of .streamlit/secrets.toml.")
+    parser.add_argument("--base-uri", default=None,
+                        help="Chat API base URI, e.g. a mock_botpress.py server.")
+    args = parser.parse_args()
+
+    target = args.pool_file or secrets_path
+    file_api_id, existing = read_users(target)
+    chat_api_id = args.chat_api_id or file_api_id
+    if not chat_api_id:
+        parser.error("--chat_api_id is required when the target file has no CHAT_API_ID")
+
+    known = {user.get("id") for user in existing}
+    wanted = [f"{args.prefix}_{i:05d}" for i in range(args.count)]
+    missing = [user_id for user_id in wanted if user_id not in known]
+
+    print(f"Target: {target} ({len(existing)} users, {args.count - len(missing)} of "
+          f"{args.count} {args.prefix}_* already provisioned)")
+    if not missing:
+        print("✅ Nothing to do")
+        raise SystemExit(0)
+
+    print(f"Creating {len(missing)} users with {args.workers} workers at "
+          f"{args.rate or 'unlimited'} users/s...")
+    start = time.perf_counter()
+    created, failed = provision(chat_api_id, missing, args.name, workers=args.workers,
+                                rate=args.rate, base_uri=args.base_uri)
+    elapsed = time.perf_counter() - start
+
+    if created:
+        append_users(target, created, chat_api_id)
+    print(f"✅ Created {len(created)} users in {elapsed:.1f}s, saved to {target}")
+    if failed:
+        print(f"❌ {len(failed)} failed (re-run to retry):")
+        for user_id, error in sorted(failed.items())[:10]:
+            print(f"   {user_id}: {error}")
+        raise SystemExit(1)
@@ -0,0 +1,196 @@
+"""
+GameVerse Chatbot Answer Cache
+Serves repeated help-center questions without waiting on a Botpress reply
+
+Only answers to questions the knowledge index has a confident match for
+are cached, scoped to that match; small talk and anything else outside
+the help center is never cached. Within a scope a question hits on its
+exact normalized form or on a close rewording of it.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+DEFAULT_TTL = 6 * 60 * 60  # seconds
+DEFAULT_MAX_ENTRIES = 1000
+NEAR_DUPLICATE_THRESHOLD = 0.8  # token-set Jaccard similarity
+MAX_NEAR_CANDIDATES = 64  # cached questions compared per near-duplicate lookup
+FINGERPRINT_CHECK_INTERVAL = 5  # seconds between knowledge/ stat() sweeps
+
+# Greetings and politeness that do not change what is being asked
+_FILLER_WORDS = {
+    "please", "pls", "plz", "hi", "hello", "hey", "thanks", "thank", "thx",
+}
+_WORD_RE = re.compile(r"[a-z0-9$]+")
+
+
+def normalize_question(question):
+    """
+    Normalize a question for cache lookup
+
+    Lowercases and strips punctuation, greetings and politeness words;
+    every other word is kept, in order. The word sequence is the exact
+    key; its token set is used for near-duplicate matching.
+
+    Returns:
+        tuple: (exact key string, frozenset of tokens)
+    """
+    words = [w for w in _WORD_RE.findall(question.lower()) if w not in _FILLER_WORDS]
+    return " ".join(words), frozenset(words)
+
+
+def answer_source(hit):
+    """Cache scope for a KnowledgeIndex hit: the chunk the question matched"""
+    return f"{hit['source']}#{hit['title']}"
+
+
+def knowledge_fingerprint(knowledge_dir=KNOWLEDGE_DIR):
+    """Cheap fingerprint of the knowledge files (name, size, mtime)"""
+    try:
+        return tuple(sorted(
+            (p.name, p.stat().st_size, p.stat().st_mtime_ns)
+            for p in Path(knowledge_dir).iterdir() if p.is_file()
+        ))
+    except OSError:
+        return ()
+
+
+def stream_answer(text):
+    """Yield a cached answer word by word, like a live reply"""
+    for word in re.findall(r"\S+\s*", text):
+        yield word
+
+
+class AnswerCache:
+    """
+    Thread-safe cache of knowledge-backed answers
+
+    Entries are scoped by the knowledge chunk a question matched (see
+    answer_source). Lookups try the exact normalized question first, then
+    the most similar cached question of the same scope by token-set
+    Jaccard similarity, comparing at most MAX_NEAR_CANDIDATES of them.
+    Entries expire after ``ttl`` seconds and the whole cache is dropped
+    when any file in the knowledge directory changes.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 threshold=NEAR_DUPLICATE_THRESHOLD, min_tokens=2,
+                 knowledge_dir=KNOWLEDGE_DIR):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.knowledge_dir = Path(knowledge_dir)
+        self._entries = OrderedDict()  # (source, key) -> (tokens, answer, stored_at)
+        self._token_index = {}         # (source, token) -> set of keys
+        self._lock = threading.Lock()
+        self._fingerprint = knowledge_fingerprint(self.knowledge_dir)
+        self._checked_at = time.monotonic()
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "invalidations": 0}
+
+    # --- internals (call with the lock held) ---
+
+    def _check_knowledge(self, now):
+        if now - self._checked_at < FINGERPRINT_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        fingerprint = knowledge_fingerprint(self.knowledge_dir)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._entries.clear()
+            self._token_index.clear()
+            self.stats["invalidations"] += 1
+
+    def _remove(self, source, key):
+        tokens, _, _ = self._entries.pop((source, key))
+        for token in tokens:
+            keys = self._token_index.get((source, token))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._token_index[(source, token)]
+
+    def _near_duplicate(self, source, tokens):
+        """Most similar cached key in the same scope, or None"""
+        candidates = set()
+        for token in tokens:
+            candidates |= self._token_index.get((source, token), set())
+            if len(candidates) >= MAX_NEAR_CANDIDATES:
+                break
+        best_key, best_score = None, self.threshold
+        for key in list(candidates)[:MAX_NEAR_CANDIDATES]:
+            other = self._entries[(source, key)][0]
+            score = len(tokens & other) / len(tokens | other)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    # --- public API ---
+
+    def get(self, question, source):
+        """
+        Look up a cached answer
+
+        Args:
+            question: The question as typed
+            source: answer_source() of the knowledge hit for the question
+
+        Returns:
+            str or None: The cached answer, None on a miss
+        """
+        key, tokens = normalize_question(question)
+        if len(tokens) < self.min_tokens:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            self._check_knowledge(now)
+
+            near = False
+            if (source, key) not in self._entries:
+                key = self._near_duplicate(source, tokens)
+                near = True
+            if key is None:
+                self.stats["misses"] += 1
+                return None
+
+            _, answer, stored_at = self._entries[(source, key)]
+            if now - stored_at > self.ttl:
+                self._remove(source, key)
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end((source, key))
+            self.stats["near_hits" if near else "hits"] += 1
+            return answer
+
+    def put(self, question, source, answer):
+        """Store an answer; questions too short to be unambiguous are skipped"""
+        key, tokens = normalize_question(question)
+        if len(tokens) < self.min_tokens or not answer:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._check_knowledge(now)
+            if (source, key) in self._entries:
+                self._remove(source, key)
+            self._entries[(source, key)] = (tokens, answer, now)
+            for token in tokens:
+                self._token_index.setdefault((source, token), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(*next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._token_index.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
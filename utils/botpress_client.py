@@ -3,15 +3,25 @@ Botpress Chat API Client - OPTIMIZED VERSION
 High-performance streaming with connection pooling and caching
 """
 
+import copy
 import os
-import json
+import random
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+
 import requests
-import sseclient
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as TransportError, ReadTimeoutError
+
+from utils.http_pool import ConnectionWarmer
+from utils.sse import iter_sse, loads
+from utils.streaming import StreamError
 
 # Constants
-BASE_URI = "https://chat.botpress.cloud"
+# Override with BOTPRESS_BASE_URI to target a local stand-in (mock_botpress.py)
+BASE_URI = os.getenv("BOTPRESS_BASE_URI", "https://chat.botpress.cloud")
 HEADERS = {
     "accept": "application/json",
     "Content-Type": "application/json",
@@ -20,75 +30,404 @@ HEADERS = {
 # Connection pool settings
 DEFAULT_TIMEOUT = 30  # seconds
 STREAM_TIMEOUT = 120  # longer timeout for SSE streams
+CONNECT_TIMEOUT = 3.05  # fail fast when Botpress is unreachable
+
+# Retry policy
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 10  # longest we will wait between attempts, server hints included
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuses where the server tells us the request was not processed,
+# so even a non-idempotent write can be sent again safely
+WRITE_RETRY_STATUSES = {429, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Circuit breaker settings
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before an endpoint opens
+BREAKER_RESET_TIMEOUT = 30  # seconds an open endpoint fails fast before probing
+
+# Path segments that name a resource; anything else is treated as an id
+_RESOURCE_SEGMENTS = {"users", "me", "conversations", "messages", "listen"}
+
+
+def endpoint_key(method, path):
+    """
+    Collapse a request into its endpoint, e.g. "GET /conversations/{id}"
+
+    Ids and query strings are dropped so every conversation shares one
+    circuit breaker per endpoint.
+    """
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    template = "/".join(
+        seg if seg in _RESOURCE_SEGMENTS else "{id}" for seg in segments if seg
+    )
+    return f"{method.upper()} /{template}"
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date) into seconds
+
+    Returns:
+        float or None: Seconds to wait, None if the header is absent or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker
+
+    closed    -> requests flow, consecutive failures are counted
+    open      -> requests fail fast until the reset timeout expires
+    half-open -> a single probe request is let through; success closes
+                 the circuit, failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._open_until == 0.0:
+            return self.CLOSED
+        if time.monotonic() < self._open_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        """Return True if a request may be sent now"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                # Let one probe through and keep everyone else failing fast.
+                # If the probe never reports back, another one is allowed
+                # after the next reset timeout.
+                self._probing = True
+                self._open_until = time.monotonic() + self.reset_timeout
+                return True
+            return False
+
+    def retry_in(self):
+        """Seconds until the circuit lets a probe through"""
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._probing = False
+
+    def record_failure(self, open_for=None):
+        """
+        Count a failure, opening the circuit once the threshold is reached
+
+        Args:
+            open_for: Force the circuit open for this many seconds
+                (used for server Retry-After hints longer than we will wait)
+        """
+        with self._lock:
+            self._failures += 1
+            probe_failed = self._probing
+            self._probing = False
+            if open_for is not None:
+                self._open_until = time.monotonic() + max(open_for, 0.0)
+            elif probe_failed or self._failures >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.reset_timeout
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one
+
+    The first caller for a key (the leader) runs the call; callers that
+    arrive while it is in flight wait for it instead of issuing their own
+    request. Every caller, the leader included, gets its own copy of the
+    result: it may be an object the client keeps caching and mutating.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "deduplicated": 0}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.stats["calls"] += 1
+            else:
+                self.stats["deduplicated"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            # Snapshot before anyone can mutate it; callers get copies of
+            # the snapshot, so they can mutate what they get back
+            call.result = copy.deepcopy(func())
+            return copy.deepcopy(call.result)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
 
 
 class BotpressClient:
-    def __init__(self, api_id=None, user_key=None):
+    def __init__(self, api_id=None, user_key=None, breakers=None, base_uri=None,
+                 adapter=None, single_flight=None):
         self.api_id = api_id or os.getenv("CHAT_API_ID")
         self.user_key = user_key or os.getenv("USER_KEY")
-        self.base_url = f"{BASE_URI}/{self.api_id}"
+        self.base_uri = (base_uri or BASE_URI).rstrip("/")
+        self.base_url = f"{self.base_uri}/{self.api_id}"
         self.headers = {
             **HEADERS,
             "x-user-key": self.user_key,
         }
         
-        # Initialize session with connection pooling and retry strategy
-        self.session = self._create_session()
+        # Initialize session with connection pooling. A shared adapter (see
+        # utils.client_pool) lets many per-user clients reuse one pool.
+        self._owns_adapter = adapter is None
+        self.session = self._create_session(adapter)
+        self._warmer = None
         
         # Cache for reducing redundant API calls
         self._conversation_cache = {}
         self._user_cache = None
+        
+        # Circuit breakers keyed by endpoint (see endpoint_key); may be
+        # shared between clients talking to the same Botpress deployment
+        self._breakers = breakers if breakers is not None else {}
+        self._breakers_lock = threading.Lock()
+        
+        # Deduplicates identical in-flight GETs; shared by pooled clients
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
 
-    def _create_session(self):
-        """Create requests session with connection pooling and retry logic"""
-        session = requests.Session()
+    @staticmethod
+    def create_adapter(pool_connections=10, pool_maxsize=20):
+        """
+        Create the HTTP adapter used for connection pooling
         
-        # Retry strategy for failed requests
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
+        Retries are handled in _request, not by urllib3, so that writes are
+        only repeated when it is safe and Retry-After hints are honored.
+        The adapter's urllib3 pool is thread-safe and can be shared.
+        """
+        return HTTPAdapter(
+            max_retries=0,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize
         )
+
+    def _create_session(self, adapter=None):
+        """Create requests session with connection pooling"""
+        session = requests.Session()
         
-        # Mount adapter with connection pooling
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=10,
-            pool_maxsize=20
-        )
+        if adapter is None:
+            adapter = self.create_adapter()
         
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         
         return session
 
+    @property
+    def warmer(self):
+        """Connection warm-up / keep-alive helper for this client's pool"""
+        if self._warmer is None:
+            self._warmer = ConnectionWarmer(self.session, self.base_uri)
+        return self._warmer
+
+    def warm_up(self, connections=2):
+        """Open connections to Botpress before the first request needs them"""
+        return self.warmer.warm_up(connections)
+
+    def connection_stats(self):
+        """Connection reuse stats, see ConnectionWarmer.stats"""
+        return self.warmer.stats()
+
+    def _breaker(self, endpoint):
+        """Get (or create) the circuit breaker for an endpoint"""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self._breakers.setdefault(endpoint, CircuitBreaker())
+        return breaker
+
+    def breaker_states(self):
+        """Return {endpoint: state} for every endpoint seen so far"""
+        return {endpoint: b.state for endpoint, b in list(self._breakers.items())}
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        """Delay before the next attempt, preferring the server's hint"""
+        if retry_after is not None:
+            return retry_after
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        return min(MAX_BACKOFF, delay * random.uniform(0.5, 1.0))
+
     def _request(self, method, path, json_data=None, timeout=DEFAULT_TIMEOUT):
-        """Make HTTP request with proper error handling and timeouts"""
+        """
+        Make HTTP request, sharing one in-flight call between identical GETs
+        
+        Concurrent GETs for the same URL and user (e.g. many sessions
+        opening the chatbot at once) go out as a single request; see
+        single_flight.stats for how many calls were deduplicated.
+        """
+        if method.upper() == "GET" and json_data is None:
+            key = (self.user_key, f"{self.base_url}{path}")
+            return self.single_flight.do(
+                key, lambda: self._send(method, path, json_data, timeout)
+            )
+        return self._send(method, path, json_data, timeout)
+
+    def _send(self, method, path, json_data=None, timeout=DEFAULT_TIMEOUT):
+        """
+        Send one HTTP request with retries, idempotency keys and a circuit breaker
+        
+        Failures are returned as a dict so callers can keep checking
+        ``"error" in result``:
+            {"error": str, "status": int or None, "retry_after": float or None,
+             "circuit_open": bool}
+        """
         url = f"{self.base_url}{path}"
-        try:
-            response = self.session.request(
-                method, 
-                url, 
-                headers=self.headers, 
-                json=json_data,
-                timeout=timeout
+        endpoint = endpoint_key(method, path)
+        breaker = self._breaker(endpoint)
+        
+        if not breaker.allow():
+            return self._error(
+                f"Botpress unavailable ({endpoint}), retrying in "
+                f"{breaker.retry_in():.0f}s",
+                retry_after=breaker.retry_in(),
+                circuit_open=True
             )
-            response.raise_for_status()
-            return response.json()
-        except requests.Timeout:
-            return {"error": "Request timed out"}
-        except requests.HTTPError as e:
-            return {"error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"error": str(e)}
+        
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        headers = self.headers
+        if not idempotent:
+            # Same key on every attempt so the server can drop duplicates
+            headers = {**self.headers, IDEMPOTENCY_HEADER: uuid.uuid4().hex}
+        
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    json=json_data,
+                    timeout=(CONNECT_TIMEOUT, timeout)
+                )
+            except requests.ConnectTimeout:
+                # Never reached the server: safe to retry any method
+                error = self._error("Connection timed out")
+                retry_after = None
+            except requests.Timeout:
+                # The server may have acted on the request; do not resend,
+                # and do not make the user wait through another timeout
+                breaker.record_failure()
+                return self._error("Request timed out")
+            except requests.ConnectionError as e:
+                if not idempotent:
+                    breaker.record_failure()
+                    return self._error(f"Connection error: {e}")
+                error = self._error(f"Connection error: {e}")
+                retry_after = None
+            else:
+                if response.ok:
+                    breaker.record_success()
+                    try:
+                        return response.json()
+                    except ValueError:
+                        return self._error("Invalid JSON in response",
+                                           status=response.status_code)
+                
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                error = self._error(
+                    f"HTTP {response.status_code}: {response.text}",
+                    status=response.status_code,
+                    retry_after=retry_after
+                )
+                retry_statuses = RETRY_STATUSES if idempotent else WRITE_RETRY_STATUSES
+                if response.status_code not in retry_statuses:
+                    if response.status_code in RETRY_STATUSES:
+                        breaker.record_failure()
+                    else:
+                        # 4xx means Botpress is up and answering
+                        breaker.record_success()
+                    return error
+            
+            if retry_after is not None and retry_after > MAX_BACKOFF:
+                # Told to back off longer than a user should wait: fail fast
+                # and keep the endpoint closed for the requested period
+                breaker.record_failure(open_for=retry_after)
+                return error
+            
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                breaker.record_failure()
+                return error
+            time.sleep(self._backoff(attempt - 1, retry_after))
+
+    @staticmethod
+    def _error(message, status=None, retry_after=None, circuit_open=False):
+        """Build the error dict returned by _send"""
+        return {
+            "error": message,
+            "status": status,
+            "retry_after": retry_after,
+            "circuit_open": circuit_open,
+        }
 
     # --- Core API Methods ---
 
     def get_user(self):
         """Get current user information with caching"""
         if self._user_cache is None:
-            self._user_cache = self._request("GET", "/users/me")
+            result = self._request("GET", "/users/me")
+            if "error" in result:
+                return result  # do not cache failures
+            self._user_cache = result
         return self._user_cache
 
     def create_user(self, name, id):
@@ -127,9 +466,10 @@ class BotpressClient:
     def get_conversation(self, conversation_id):
         """Get specific conversation details with caching"""
         if conversation_id not in self._conversation_cache:
-            self._conversation_cache[conversation_id] = self._request(
-                "GET", f"/conversations/{conversation_id}"
-            )
+            result = self._request("GET", f"/conversations/{conversation_id}")
+            if "error" in result:
+                return result
+            self._conversation_cache[conversation_id] = result
         return self._conversation_cache[conversation_id]
 
     def create_message(self, message, conversation_id):
@@ -143,6 +483,7 @@ class BotpressClient:
         # Invalidate message cache for this conversation
         if conversation_id in self._conversation_cache:
             self._conversation_cache[conversation_id].pop("messages", None)
+        self._conversation_cache.pop(f"{conversation_id}_messages", None)
         
         return result
 
@@ -166,7 +507,8 @@ class BotpressClient:
         )
         
         # Cache the result
-        self._conversation_cache[cache_key] = result
+        if "error" not in result:
+            self._conversation_cache[cache_key] = result
         return result
 
     def listen_conversation(self, conversation_id):
@@ -178,30 +520,45 @@ class BotpressClient:
         2. Proper timeout handling
         3. Yields only text content (not full message objects)
         4. Better error handling for malformed events
+        5. Built-in SSE parser (utils.sse) with orjson when available
+        
+        Failures are yielded as a StreamError, after any text already
+        streamed, so callers can tell an interrupted reply from a whole one.
         """
-        url = f"{self.base_url}/conversations/{conversation_id}/listen"
+        path = f"/conversations/{conversation_id}/listen"
+        url = f"{self.base_url}{path}"
+        breaker = self._breaker(endpoint_key("GET", path))
+        
+        if not breaker.allow():
+            yield StreamError(f"[Error: Assistant temporarily unavailable, "
+                              f"retrying in {breaker.retry_in():.0f}s]")
+            return
         
+        response = None
         try:
             # Use session for connection pooling
             response = self.session.get(
                 url, 
                 headers=self.headers, 
                 stream=True,
-                timeout=STREAM_TIMEOUT
+                timeout=(CONNECT_TIMEOUT, STREAM_TIMEOUT)
             )
+            if response.status_code in RETRY_STATUSES:
+                breaker.record_failure(
+                    open_for=parse_retry_after(response.headers.get("Retry-After"))
+                )
+            else:
+                breaker.record_success()
             response.raise_for_status()
             
-            # Create SSE client
-            client = sseclient.SSEClient(response)
-            
-            for event in client.events():
-                # Skip ping events
-                if event.data == "ping":
+            # Parse SSE straight off the socket; pings are dropped and
+            # events without a text payload are skipped before decoding
+            for data in iter_sse(response):
+                if b'"text"' not in data:
                     continue
                 
                 try:
-                    # Parse event data
-                    event_data = json.loads(event.data)
+                    event_data = loads(data)
                     
                     # Extract text payload
                     if "data" in event_data:
@@ -210,20 +567,31 @@ class BotpressClient:
                             # Yield only the text content for efficiency
                             yield data["payload"]["text"]
                 
-                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                except (ValueError, KeyError, TypeError):
                     # Skip malformed events silently
                     continue
                     
-        except requests.Timeout:
-            yield "[Error: Connection timed out]"
-        except requests.RequestException as e:
-            yield f"[Error: {str(e)}]"
+        except (requests.Timeout, ReadTimeoutError):
+            breaker.record_failure()
+            yield StreamError("[Error: Connection timed out]")
+        except requests.HTTPError as e:
+            yield StreamError(f"[Error: {str(e)}]")
+        except (requests.RequestException, TransportError) as e:
+            breaker.record_failure()
+            yield StreamError(f"[Error: {str(e)}]")
         except Exception as e:
-            yield f"[Error: Unexpected error - {str(e)}]"
+            yield StreamError(f"[Error: Unexpected error - {str(e)}]")
+        finally:
+            if response is not None:
+                response.close()
 
     def close(self):
         """Close the session and cleanup resources"""
-        if hasattr(self, 'session'):
+        # A shared adapter belongs to the pool, closing it here would drop
+        # every other client's connections
+        if hasattr(self, 'session') and self._owns_adapter:
+            if self._warmer is not None:
+                self._warmer.stop()
             self.session.close()
         self._conversation_cache.clear()
         self._user_cache = None
@@ -0,0 +1,248 @@
+"""
+Botpress Client Pool
+One BotpressClient per user identity, all sharing a single HTTP connection pool
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import requests
+
+from utils.botpress_client import BASE_URI, BotpressClient, SingleFlight
+from utils.http_pool import ConnectionWarmer
+
+DEFAULT_MAX_CLIENTS = 256
+DEFAULT_IDLE_TIMEOUT = 15 * 60  # seconds
+DEFAULT_MAX_PROVISIONED = 50
+SESSION_USER_PREFIX = "gameverse-session"
+
+logger = logging.getLogger(__name__)
+
+
+class BotpressClientPool:
+    """
+    Bounded, thread-safe pool of per-user Botpress clients
+
+    Every client gets its own requests.Session, auth header and caches, so
+    users never see each other's conversations. The urllib3 connection pool
+    (via one shared HTTPAdapter), the circuit breakers and the single-flight
+    table are shared, so connections to Botpress are reused across users,
+    an outage trips once for everybody, and identical concurrent GETs from
+    sessions of the same user go out once.
+
+    Clients are evicted least-recently-used first when the pool is full,
+    and dropped once idle for longer than ``idle_timeout`` seconds.
+
+    With ``warm_connections`` set, connections are opened in the
+    background at start-up, and ``keepalive_interval`` keeps idle ones
+    from being dropped (see utils.http_pool).
+
+    User keys are leased to visitors (see assign_user_key); a lease not
+    renewed for ``idle_timeout`` seconds frees its key. With
+    ``provision_users`` set, up to ``max_provisioned`` Botpress users are
+    created when every key is leased; they join the leasable keys.
+    """
+
+    def __init__(self, api_id, base_uri=None, max_clients=DEFAULT_MAX_CLIENTS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, pool_connections=10,
+                 pool_maxsize=20, warm_connections=0, keepalive_interval=0,
+                 provision_users=False, max_provisioned=DEFAULT_MAX_PROVISIONED):
+        self.api_id = api_id
+        self.base_uri = base_uri
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.provision_users = provision_users
+        self.max_provisioned = max_provisioned
+        self.adapter = BotpressClient.create_adapter(pool_connections, pool_maxsize)
+        self.breakers = {}
+        self.single_flight = SingleFlight()
+        self._clients = OrderedDict()  # user_key -> [client, last_used]
+        self._lock = threading.Lock()
+        self._round_robin = 0
+        self._leases = OrderedDict()  # visitor -> [user_key, last_seen]
+        self.provisioned_keys = []    # keys of the users this pool created
+        self._provisioning = 0
+        self.stats = {"created": 0, "hits": 0, "evicted_idle": 0, "evicted_lru": 0,
+                      "provisioned": 0, "shared": 0}
+        session = requests.Session()
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        self.warmer = ConnectionWarmer(session, base_uri or BASE_URI)
+        if warm_connections or keepalive_interval:
+            self.warmer.start(warm_connections, keepalive_interval)
+
+    def get(self, user_key):
+        """
+        Get the client for a user, creating it on first use
+
+        Args:
+            user_key: Botpress user key (x-user-key)
+
+        Returns:
+            BotpressClient: Client bound to this user
+        """
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            entry = self._clients.get(user_key)
+            if entry is not None:
+                entry[1] = now
+                self._clients.move_to_end(user_key)
+                self.stats["hits"] += 1
+                client = entry[0]
+            else:
+                client = BotpressClient(
+                    api_id=self.api_id,
+                    user_key=user_key,
+                    breakers=self.breakers,
+                    base_uri=self.base_uri,
+                    adapter=self.adapter,
+                    single_flight=self.single_flight,
+                )
+                self._clients[user_key] = [client, now]
+                self.stats["created"] += 1
+            evicted = self._evict(now)
+
+        # Cleanup outside the lock; shared-adapter clients only drop caches
+        for old in evicted:
+            old.close()
+        return client
+
+    def _evict(self, now):
+        """Drop idle clients, then the least recently used over capacity"""
+        evicted = []
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._clients[key]
+            evicted.append(client)
+            self.stats["evicted_idle"] += 1
+        while len(self._clients) > self.max_clients:
+            _, (client, _) = self._clients.popitem(last=False)
+            evicted.append(client)
+            self.stats["evicted_lru"] += 1
+        return evicted
+
+    def assign_user_key(self, user_keys, visitor=None, preferred=None, avoid=()):
+        """
+        Lease a user key to a visitor (a browser), renewing its lease
+
+        A visitor keeps its key while it comes back within ``idle_timeout``
+        seconds. New visitors get a free key: ``preferred`` if it is free
+        (e.g. the key the visitor had before a restart), else one not in
+        ``avoid`` (e.g. keys other visitors had) if possible. With no free key,
+        a Botpress user is created if provisioning is on and under its cap;
+        otherwise keys are shared round-robin and a warning is logged.
+        Configure at least as many keys as concurrent visitors with
+        provision_users.py to avoid both.
+
+        Args:
+            user_keys: Configured user keys (e.g. from st.secrets["users"])
+            visitor: Stable id of the browser; None leases to a one-off
+                visitor that is never renewed
+            preferred: Key to lease if it is free
+            avoid: Keys to lease only when no other key is free
+
+        Returns:
+            str or None: The leased key, None if there is none to give
+        """
+        visitor = visitor or uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._expire_leases(now)
+            lease = self._leases.get(visitor)
+            if lease is not None:
+                lease[1] = now
+                self._leases.move_to_end(visitor)
+                return lease[0]
+            key = self._free_key(user_keys, preferred, avoid)
+            provision = (key is None and self.provision_users
+                         and len(self.provisioned_keys) + self._provisioning < self.max_provisioned)
+            if provision:
+                self._provisioning += 1
+
+        if provision:
+            key = self._provision_user()
+
+        with self._lock:
+            if provision:
+                self._provisioning -= 1
+                if key is not None:
+                    self.provisioned_keys.append(key)
+            shared = key is None
+            if shared:
+                keys = [*user_keys, *self.provisioned_keys]
+                if not keys:
+                    return None
+                key = keys[self._round_robin % len(keys)]
+                self._round_robin += 1
+                self.stats["shared"] += 1
+            self._leases[visitor] = [key, now]
+        if shared:
+            logger.warning(
+                "All %d Botpress user keys are leased; this visitor shares an identity "
+                "(conversations and history) with another. Provision more keys with "
+                "provision_users.py.", len(keys),
+            )
+        return key
+
+    def release_user_key(self, visitor):
+        """End a visitor's lease early, freeing its key"""
+        with self._lock:
+            self._leases.pop(visitor, None)
+
+    def _expire_leases(self, now):
+        while self._leases:
+            visitor, (_, last_seen) = next(iter(self._leases.items()))
+            if now - last_seen < self.idle_timeout:
+                break
+            del self._leases[visitor]
+
+    def _free_key(self, user_keys, preferred, avoid):
+        leased = {key for key, _ in self._leases.values()}
+        free = [key for key in [*user_keys, *self.provisioned_keys] if key not in leased]
+        if preferred in free:
+            return preferred
+        unclaimed = [key for key in free if key not in avoid]
+        return (unclaimed or free or [None])[0]
+
+    def _provision_user(self):
+        """Create a Botpress user for the key pool; its key, or None on failure"""
+        user_id = f"{SESSION_USER_PREFIX}-{uuid.uuid4().hex[:12]}"
+        client = BotpressClient(api_id=self.api_id, user_key="", breakers=self.breakers,
+                                base_uri=self.base_uri, adapter=self.adapter)
+        try:
+            result = client.create_user("GameVerse session", user_id)
+        except Exception as e:
+            result = {"error": str(e)}
+        finally:
+            client.close()
+        if "key" not in result:
+            logger.warning("Could not create a Botpress user for a new visitor: %s",
+                           result.get("error", "no key in response"))
+            return None
+        with self._lock:
+            self.stats["provisioned"] += 1
+        return result["key"]
+
+    def connection_stats(self):
+        """Reuse stats of the shared connection pool, see ConnectionWarmer.stats"""
+        return self.warmer.stats()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+    def close(self):
+        """Close every client and the shared connection pool"""
+        with self._lock:
+            clients = [entry[0] for entry in self._clients.values()]
+            self._clients.clear()
+        self.warmer.stop()
+        for client in clients:
+            client.close()
+        self.adapter.close()
@@ -5,6 +5,8 @@ Session state management and UI components
 
 import streamlit as st
 
+from data.cooccurrence import CHECKOUT_WEIGHT, WISHLIST_WEIGHT, get_cooccurrence_model
+
 
 def init_session_state():
     """Initialize session state variables"""
@@ -67,6 +69,7 @@ def add_to_cart(game):
     game_ids = [g['id'] for g in st.session_state.cart]
     if game['id'] not in game_ids:
         st.session_state.cart.append(game)
+        get_cooccurrence_model().record([game['id']], game_ids, kind="cart")
         return True
     return False
 
@@ -77,6 +80,8 @@ def add_to_wishlist(game):
     game_ids = [g['id'] for g in st.session_state.wishlist]
     if game['id'] not in game_ids:
         st.session_state.wishlist.append(game)
+        get_cooccurrence_model().record([game['id']], game_ids, weight=WISHLIST_WEIGHT,
+                                        kind="wishlist")
         return True
     return False
 
@@ -97,9 +102,22 @@ def remove_from_wishlist(index):
     return False
 
 
+def record_checkout(games):
+    """Remember which games were bought together"""
+    game_ids = [game['id'] for game in games]
+    get_cooccurrence_model().record(game_ids, game_ids, weight=CHECKOUT_WEIGHT, kind="checkout")
+
+
 def calculate_cart_total():
-    """Calculate total price of items in cart"""
-    return sum(game['price'] for game in st.session_state.cart)
+    """
+    Calculate total price of items in cart
+    
+    Prices are added up in whole cents, so float32 prices from the compact
+    catalog (see data.compact) don't carry their rounding error into the
+    total.
+    """
+    cents = sum(round(float(game['price']) * 100) for game in st.session_state.cart)
+    return cents / 100
 
 
 def format_price(price):
@@ -0,0 +1,384 @@
+"""
+GameVerse Chat History Store
+Local SQLite copy of chatbot conversations for warm starts
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path(
+    os.getenv("GAMEVERSE_HISTORY_DB", Path(__file__).parent.parent / ".cache" / "chat_history.db")
+)
+SYNC_LIMIT = 50  # messages fetched from Botpress per reconciliation
+SYNC_WORKERS = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    key_hash TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS visitors (
+    visitor_hash TEXT PRIMARY KEY,
+    key_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    user_id TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (user_id, conversation_id)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    user_id TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message_id TEXT,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    local_only INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, conversation_id, seq)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    last_message_id TEXT,
+    generation INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL,
+    PRIMARY KEY (user_id, conversation_id)
+);
+"""
+
+
+def hash_key(user_key):
+    """Never store raw user keys on disk"""
+    return hashlib.sha256(user_key.encode()).hexdigest()
+
+
+def to_chat_messages(messages, user_id):
+    """
+    Convert Botpress messages (newest first) to chat rows, oldest first
+
+    Returns:
+        list: dicts with message_id, role and content
+    """
+    rows = []
+    for message in reversed(messages):
+        text = message.get("payload", {}).get("text", "")
+        if text:
+            rows.append({
+                "message_id": message.get("id"),
+                "role": "user" if message.get("userId") == user_id else "assistant",
+                "content": text,
+            })
+    return rows
+
+
+class HistoryStore:
+    """
+    SQLite-backed history keyed by user and conversation
+
+    Messages are appended locally as they are sent and received. Rows for
+    streamed replies have no Botpress id until a background sync
+    reconciles the conversation against Botpress by last message id.
+    Rows appended as ``local_only`` (answers served without Botpress, see
+    utils/answer_cache.py) are never in Botpress' copy, so syncs keep them.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=SYNC_WORKERS,
+                                            thread_name_prefix="history-sync")
+        self._in_flight = set()
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(messages)")}
+        if "local_only" not in columns:
+            with self._conn:
+                self._conn.execute(
+                    "ALTER TABLE messages ADD COLUMN local_only INTEGER NOT NULL DEFAULT 0"
+                )
+
+    # --- users & conversations ---
+
+    def user_id_for_key(self, user_key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_id FROM users WHERE key_hash = ?", (hash_key(user_key),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_user(self, user_key, user_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (key_hash, user_id) VALUES (?, ?)",
+                (hash_key(user_key), user_id),
+            )
+
+    def visitor_key_hash(self, visitor):
+        """Hash of the user key a browser (visitor id) last had, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key_hash FROM visitors WHERE visitor_hash = ?", (hash_key(visitor),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def claimed_key_hashes(self):
+        """Hashes of every user key some visitor has had"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT key_hash FROM visitors").fetchall()
+        return {row[0] for row in rows}
+
+    def save_visitor(self, visitor, user_key):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO visitors (visitor_hash, key_hash) VALUES (?, ?)",
+                (hash_key(visitor), hash_key(user_key)),
+            )
+
+    def conversations(self, user_id):
+        """Stored conversations, newest first, shaped like the API's"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT conversation_id, created_at FROM conversations "
+                "WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,),
+            ).fetchall()
+        return [{"id": cid, "createdAt": created} for cid, created in rows]
+
+    def save_conversations(self, user_id, conversations):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO conversations (user_id, conversation_id, created_at) "
+                "VALUES (?, ?, ?)",
+                [(user_id, c["id"], c.get("createdAt")) for c in conversations],
+            )
+
+    def forget_conversation(self, user_id, conversation_id):
+        """Drop a conversation Botpress no longer knows about"""
+        with self._lock, self._conn:
+            for table in ("conversations", "messages", "sync_state"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE user_id = ? AND conversation_id = ?",
+                    (user_id, conversation_id),
+                )
+
+    # --- messages ---
+
+    def load(self, user_id, conversation_id, limit=None):
+        """
+        Load a conversation, oldest first
+
+        Returns:
+            list or None: [{"role", "content"}], None if never stored
+        """
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM sync_state WHERE user_id = ? AND conversation_id = ?",
+                (user_id, conversation_id),
+            ).fetchone()
+            if known is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT role, content FROM ("
+                "  SELECT seq, role, content FROM messages"
+                "  WHERE user_id = ? AND conversation_id = ?"
+                "  ORDER BY seq DESC LIMIT ?"
+                ") ORDER BY seq",
+                (user_id, conversation_id, -1 if limit is None else limit),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def count(self, user_id, conversation_id):
+        """Number of stored messages in a conversation"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE user_id = ? AND conversation_id = ?",
+                (user_id, conversation_id),
+            ).fetchone()
+        return row[0]
+
+    def generation(self, user_id, conversation_id):
+        """Counter bumped whenever a sync changed the stored conversation"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM sync_state WHERE user_id = ? AND conversation_id = ?",
+                (user_id, conversation_id),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def append(self, user_id, conversation_id, role, content, message_id=None,
+               local_only=False):
+        """
+        Append one message as it is sent or received
+
+        Args:
+            local_only: The message will never reach Botpress; syncs keep it
+                instead of replacing it with Botpress' version
+        """
+        with self._lock, self._conn:
+            self._ensure_sync_row(user_id, conversation_id)
+            self._conn.execute(
+                "INSERT INTO messages "
+                "(user_id, conversation_id, seq, message_id, role, content, stored_at, "
+                "local_only) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM messages "
+                "WHERE user_id = ? AND conversation_id = ?), ?, ?, ?, ?, ?)",
+                (user_id, conversation_id, user_id, conversation_id,
+                 message_id, role, content, time.time(), int(local_only)),
+            )
+
+    def _ensure_sync_row(self, user_id, conversation_id):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO sync_state (user_id, conversation_id) VALUES (?, ?)",
+            (user_id, conversation_id),
+        )
+
+    def reconcile(self, user_id, conversation_id, remote):
+        """
+        Merge Botpress messages into the local copy
+
+        Local rows from the first one the remote window covers onwards are
+        replaced with Botpress' version; older rows and local-only rows
+        are kept. The window starts after the last synced message when it
+        is still in the window, else at the oldest stored message the
+        window contains. With neither, a partial window (fewer than
+        SYNC_LIMIT rows, i.e. the whole conversation) replaces everything,
+        and a full one is appended after the stored history.
+
+        Args:
+            remote: Rows from to_chat_messages (oldest first), at most the
+                last SYNC_LIMIT messages of the conversation
+
+        Returns:
+            bool: True if the stored conversation changed
+        """
+        remote_last = remote[-1]["message_id"] if remote else None
+        with self._lock, self._conn:
+            self._ensure_sync_row(user_id, conversation_id)
+            last_synced, = self._conn.execute(
+                "SELECT last_message_id FROM sync_state "
+                "WHERE user_id = ? AND conversation_id = ?",
+                (user_id, conversation_id),
+            ).fetchone()
+            if remote_last == last_synced:
+                self._conn.execute(
+                    "UPDATE sync_state SET synced_at = ? "
+                    "WHERE user_id = ? AND conversation_id = ?",
+                    (time.time(), user_id, conversation_id),
+                )
+                return False
+
+            local = self._conn.execute(
+                "SELECT seq, message_id, role, content, local_only FROM messages "
+                "WHERE user_id = ? AND conversation_id = ? ORDER BY seq",
+                (user_id, conversation_id),
+            ).fetchall()
+            remote_ids = [row["message_id"] for row in remote]
+            start, new_rows = self._replace_from(local, remote, remote_ids, last_synced)
+
+            # Local-only rows in the replaced range go back in after the
+            # message they followed
+            merged = [dict(row, local_only=0) for row in new_rows]
+            previous_id, previous_seq = None, 0
+            for seq, message_id, role, content, local_only in local:
+                if not local_only:
+                    if message_id is not None:
+                        previous_id, previous_seq = message_id, seq
+                    continue
+                if seq < start:
+                    continue
+                ids = [row["message_id"] for row in merged]
+                if previous_id in ids:
+                    at = ids.index(previous_id) + 1
+                elif previous_seq < start:
+                    at = 0
+                else:
+                    at = len(merged)
+                while at < len(merged) and merged[at]["local_only"]:
+                    at += 1
+                merged.insert(at, {"message_id": message_id, "role": role,
+                                   "content": content, "local_only": 1})
+
+            self._conn.execute(
+                "DELETE FROM messages WHERE user_id = ? AND conversation_id = ? AND seq >= ?",
+                (user_id, conversation_id, start),
+            )
+            now = time.time()
+            self._conn.executemany(
+                "INSERT INTO messages "
+                "(user_id, conversation_id, seq, message_id, role, content, stored_at, "
+                "local_only) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(user_id, conversation_id, start + i, row["message_id"], row["role"],
+                  row["content"], now, row["local_only"]) for i, row in enumerate(merged)],
+            )
+            self._conn.execute(
+                "UPDATE sync_state SET last_message_id = ?, generation = generation + 1, "
+                "synced_at = ? WHERE user_id = ? AND conversation_id = ?",
+                (remote_last, now, user_id, conversation_id),
+            )
+        return True
+
+    @staticmethod
+    def _replace_from(local, remote, remote_ids, last_synced):
+        """First local seq the remote window replaces, and the rows replacing it"""
+        if last_synced in remote_ids:
+            for seq, message_id, *_ in reversed(local):
+                if message_id == last_synced:
+                    return seq + 1, remote[remote_ids.index(last_synced) + 1:]
+
+        in_window = set(remote_ids) - {None}
+        for seq, message_id, *_ in local:
+            if message_id in in_window:
+                # Window rows older than this one were never stored; they
+                # still come before it
+                return seq, remote
+        if len(remote) < SYNC_LIMIT:
+            return 1, remote
+        # The window is entirely newer than what is stored: keep the stored
+        # history, replacing only the trailing echoes that await an id
+        synced = [seq for seq, message_id, *_ in local if message_id is not None]
+        return (synced[-1] + 1 if synced else 1), remote
+
+    # --- background sync ---
+
+    def sync(self, client, user_id, conversation_id):
+        """Fetch the latest messages from Botpress and reconcile"""
+        result = client.list_messages(conversation_id, limit=SYNC_LIMIT)
+        if "error" in result:
+            return False
+        remote = to_chat_messages(result.get("messages", []), user_id)
+        return self.reconcile(user_id, conversation_id, remote)
+
+    def sync_in_background(self, client, user_id, conversation_id):
+        """Schedule a sync unless one is already running for this conversation"""
+        key = (user_id, conversation_id)
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            self._in_flight.add(key)
+
+        def run():
+            try:
+                return self.sync(client, user_id, conversation_id)
+            finally:
+                with self._lock:
+                    self._in_flight.discard(key)
+
+        return self._executor.submit(run)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,193 @@
+"""
+GameVerse HTTP Pool
+Warm-up, keep-alive and reuse stats for the Botpress connection pool
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+import urllib3
+from urllib3.exceptions import HTTPError as TransportError
+from urllib3.util import Timeout
+
+DEFAULT_WARM_CONNECTIONS = 2
+DEFAULT_KEEPALIVE_INTERVAL = 55  # seconds; below common 60s idle timeouts
+PING_TIMEOUT = Timeout(connect=3.05, read=5)
+
+# Warm-up and keep-alive check connections in and out of urllib3's
+# HTTPConnectionPool by hand (_get_conn, _put_conn and its LIFO queue of
+# connections and None slots), which is not public API. pyproject.toml
+# pins urllib3 2.x; anything else turns the warmer into a no-op.
+URLLIB3_SUPPORTED = urllib3.__version__.split(".")[0] == "2"
+
+
+def _has_pool_internals(pool):
+    return (URLLIB3_SUPPORTED and hasattr(pool, "_get_conn") and hasattr(pool, "_put_conn")
+            and isinstance(getattr(pool, "pool", None), queue.LifoQueue))
+
+
+class ConnectionWarmer:
+    """
+    Keep connections to one Botpress host open and ready
+
+    ``warm_up`` pays DNS, TCP and TLS setup for a few pool connections
+    before the first chat message needs them; ``ping_idle`` sends a HEAD
+    over every idle connection so servers and load balancers don't drop
+    them. Both are best effort: failures are counted, never raised, and
+    both do nothing on a urllib3 whose pool internals they don't know.
+
+    Usage:
+        warmer = ConnectionWarmer(session, "https://chat.botpress.cloud")
+        warmer.start(connections=2, keepalive_interval=55)
+        warmer.stats()
+    """
+
+    def __init__(self, session, base_uri):
+        self.session = session
+        self.base_uri = base_uri.rstrip("/")
+        self.ping_path = urlsplit(self.base_uri).path or "/"
+        self.counters = {"warmed": 0, "pings": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _pool(self):
+        # Resolve the pool exactly like a request would: requests keys its
+        # pools by TLS settings (e.g. REQUESTS_CA_BUNDLE) and proxies too
+        settings = self.session.merge_environment_settings(
+            self.base_uri, {}, None, None, None
+        )
+        request = requests.Request("HEAD", self.base_uri).prepare()
+        adapter = self.session.get_adapter(self.base_uri)
+        return adapter.get_connection_with_tls_context(
+            request, settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+        )
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def warm_up(self, connections=DEFAULT_WARM_CONNECTIONS):
+        """
+        Open up to ``connections`` pool connections ahead of time
+
+        Returns:
+            int: Number of connections opened
+        """
+        pool = self._pool()
+        if not _has_pool_internals(pool):
+            return 0
+        connections = min(connections, pool.pool.maxsize)
+        conns = [pool._get_conn() for _ in range(connections)]
+        cold = [conn for conn in conns if conn.sock is None]
+
+        def connect(conn):
+            conn.timeout = PING_TIMEOUT.connect_timeout
+            try:
+                conn.connect()
+                return True
+            except (OSError, TransportError):
+                conn.close()
+                return False
+
+        try:
+            if cold:
+                with ThreadPoolExecutor(max_workers=len(cold)) as executor:
+                    opened = sum(executor.map(connect, cold))
+            else:
+                opened = 0
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+        self._count("warmed", opened)
+        self._count("failures", len(cold) - opened)
+        return opened
+
+    def ping_idle(self):
+        """
+        Send a HEAD over each idle connection to keep it alive
+
+        Returns:
+            int: Number of connections pinged successfully
+        """
+        pool = self._pool()
+        if not _has_pool_internals(pool):
+            return 0
+        # Take every slot out: idle connections and unopened (None) slots
+        # can sit anywhere in the queue
+        idle, unopened = [], 0
+        while True:
+            try:
+                conn = pool.pool.get_nowait()
+            except (queue.Empty, AttributeError):  # empty, or pool closed
+                break
+            if conn is None:
+                unopened += 1
+            else:
+                idle.append(conn)
+        for _ in range(unopened):
+            pool._put_conn(None)
+
+        pinged = 0
+        for conn in idle:
+            # The pool is LIFO, so the HEAD below goes out on this connection
+            pool._put_conn(conn)
+            try:
+                pool.urlopen("HEAD", self.ping_path, retries=False,
+                             timeout=PING_TIMEOUT, headers={"accept": "*/*"})
+                pinged += 1
+            except (OSError, TransportError):
+                self._count("failures")
+        self._count("pings", pinged)
+        return pinged
+
+    def start(self, connections=DEFAULT_WARM_CONNECTIONS,
+              keepalive_interval=DEFAULT_KEEPALIVE_INTERVAL):
+        """
+        Warm up in the background, then ping idle connections periodically
+
+        A ``keepalive_interval`` of 0 only warms up.
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            if connections:
+                self.warm_up(connections)
+            while keepalive_interval and not self._stop.wait(keepalive_interval):
+                self.ping_idle()
+
+        self._thread = threading.Thread(target=run, name="botpress-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        """
+        Connection reuse for the Botpress host
+
+        ``reuse_ratio`` is the share of real requests (keep-alive pings
+        excluded) served over an already open connection. A low ratio, or
+        ``connections_opened`` far above ``maxsize``, means connections are
+        being discarded: raise pool_maxsize. Mostly idle connections mean
+        it can shrink. urllib3 re-opens dropped connections in place, which
+        these counters can't see; that is what the keep-alive prevents.
+        """
+        pool = self._pool()
+        with self._lock:
+            counters = dict(self.counters)
+        served = max(0, pool.num_requests - counters["pings"])
+        opened_on_demand = max(0, pool.num_connections - counters["warmed"])
+        slots = list(pool.pool.queue) if _has_pool_internals(pool) else []
+        return {
+            **counters,
+            "requests": served,
+            "connections_opened": pool.num_connections,
+            "idle": sum(1 for conn in slots if conn is not None),
+            "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+            "reuse_ratio": max(0.0, 1 - opened_on_demand / served) if served else 0.0,
+        }
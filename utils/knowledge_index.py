@@ -0,0 +1,284 @@
+"""
+GameVerse Knowledge Index
+In-process BM25 retrieval over the knowledge/ directory, used to show
+quick answers without waiting for the remote assistant
+"""
+
+import csv
+import hashlib
+import io
+import re
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+INDEXED_SUFFIXES = {".md", ".txt", ".csv"}
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+MAX_CHUNK_WORDS = 120
+REFRESH_INTERVAL = 5  # seconds between stat() sweeps of the knowledge dir
+QUICK_ANSWER_MIN_SCORE = 4.0
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "i", "if", "in", "is", "it", "its", "me", "my",
+    "of", "on", "or", "our", "that", "the", "this", "to", "we", "what",
+    "when", "where", "which", "will", "with", "you", "your",
+}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+_MARKDOWN_RE = re.compile(r"[*_`>]|^-{3,}$", re.MULTILINE)
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed and plurals folded"""
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _clean(text):
+    return re.sub(r"\n{3,}", "\n\n", _MARKDOWN_RE.sub("", text)).strip()
+
+
+def _split_long(title, body):
+    """Split a section into chunks of at most MAX_CHUNK_WORDS words"""
+    chunks, current, words = [], [], 0
+    for paragraph in re.split(r"\n\s*\n", body):
+        n = len(paragraph.split())
+        if current and words + n > MAX_CHUNK_WORDS:
+            chunks.append((title, "\n\n".join(current)))
+            current, words = [], 0
+        current.append(paragraph.strip())
+        words += n
+    if current:
+        chunks.append((title, "\n\n".join(current)))
+    return chunks
+
+
+def chunk_text(text):
+    """
+    Chunk markdown/plain text by heading
+
+    Returns:
+        list: (title, text) tuples; the title is the heading path
+    """
+    chunks, headings, body = [], [], []
+
+    def flush():
+        content = _clean("\n".join(body))
+        if content:
+            chunks.extend(_split_long(" > ".join(headings) or "General", content))
+        body.clear()
+
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line.strip())
+        if match:
+            flush()
+            level = len(match.group(1))
+            headings[level - 1:] = [_clean(match.group(2))]
+        else:
+            body.append(line)
+    flush()
+    return chunks
+
+
+def chunk_csv(text):
+    """One chunk per row, rendered as "Column: value" lines"""
+    chunks = []
+    for row in csv.DictReader(io.StringIO(text)):
+        title = next(iter(row.values()), "") or "Row"
+        body = "\n".join(f"{k}: {v}" for k, v in row.items() if v)
+        chunks.append((title, body))
+    return chunks
+
+
+class _Postings:
+    """
+    One immutable build of the index arrays
+
+    A rebuild creates a new instance and publishes it with a single
+    assignment, so a search always sees arrays from the same build.
+    """
+
+    def __init__(self, chunks, vocab, term_ptr, doc_ids, term_freqs, doc_len, idf):
+        self.chunks = chunks
+        self.vocab = vocab
+        self.term_ptr = term_ptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_len = doc_len
+        self.idf = idf
+        for array in (term_ptr, doc_ids, term_freqs, doc_len, idf):
+            array.flags.writeable = False
+        # Chunks of nothing but stopwords have length 0; so can the average
+        mean = float(doc_len.mean()) if doc_len.size else 0.0
+        self.avg_len = mean if mean > 0 else 1.0
+
+    @classmethod
+    def empty(cls):
+        return cls([], {}, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                   np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32),
+                   np.zeros(0, dtype=np.float32))
+
+
+class KnowledgeIndex:
+    """
+    BM25 index over the knowledge directory
+
+    Chunks and tokens are cached per file by content hash, so a refresh
+    only re-chunks files whose content changed; the postings arrays are
+    then rebuilt from the cached tokens. Scoring is a single vectorized
+    pass over the postings of the query terms.
+    """
+
+    def __init__(self, knowledge_dir=KNOWLEDGE_DIR):
+        self.knowledge_dir = Path(knowledge_dir)
+        self._files = {}      # name -> {"stat", "digest", "chunks", "tokens"}
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.version = 0
+        self.stats = {"builds": 0, "files_rechunked": 0}
+        self.postings = _Postings.empty()  # replaced whole by _build
+        self.refresh(force=True)
+
+    # --- building ---
+
+    def refresh(self, force=False):
+        """
+        Re-index changed files
+
+        Returns:
+            bool: True if the index was rebuilt
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < REFRESH_INTERVAL:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            changed = False
+            seen = set()
+            paths = sorted(p for p in self.knowledge_dir.iterdir()
+                           if p.is_file() and p.suffix.lower() in INDEXED_SUFFIXES)
+            for path in paths:
+                seen.add(path.name)
+                stat = path.stat()
+                stat_key = (stat.st_size, stat.st_mtime_ns)
+                cached = self._files.get(path.name)
+                if cached and cached["stat"] == stat_key:
+                    continue
+                data = path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if cached and cached["digest"] == digest:
+                    cached["stat"] = stat_key  # touched, not changed
+                    continue
+                text = data.decode("utf-8", errors="replace")
+                chunks = chunk_csv(text) if path.suffix.lower() == ".csv" else chunk_text(text)
+                self._files[path.name] = {
+                    "stat": stat_key,
+                    "digest": digest,
+                    "chunks": [
+                        {"source": path.name, "title": title, "text": body}
+                        for title, body in chunks
+                    ],
+                    "tokens": [tokenize(f"{title} {body}") for title, body in chunks],
+                }
+                self.stats["files_rechunked"] += 1
+                changed = True
+
+            for name in set(self._files) - seen:
+                del self._files[name]
+                changed = True
+
+            if changed or force:
+                self._build()
+            return changed
+
+    def _build(self):
+        """Rebuild the CSR postings arrays from cached chunk tokens"""
+        chunks, token_lists = [], []
+        for name in sorted(self._files):
+            chunks.extend(self._files[name]["chunks"])
+            token_lists.extend(self._files[name]["tokens"])
+
+        vocab = {}
+        postings = {}  # term id -> {doc id: tf}
+        for doc_id, tokens in enumerate(token_lists):
+            for token in tokens:
+                term = vocab.setdefault(token, len(vocab))
+                counts = postings.setdefault(term, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        for term, counts in postings.items():
+            term_ptr[term + 1] = len(counts)
+        np.cumsum(term_ptr, out=term_ptr)
+        doc_ids = np.empty(term_ptr[-1], dtype=np.int32)
+        term_freqs = np.empty(term_ptr[-1], dtype=np.float32)
+        for term, counts in postings.items():
+            start = term_ptr[term]
+            doc_ids[start:start + len(counts)] = list(counts.keys())
+            term_freqs[start:start + len(counts)] = list(counts.values())
+
+        n_docs = max(len(token_lists), 1)
+        doc_freq = np.diff(term_ptr).astype(np.float32)
+
+        self.postings = _Postings(
+            chunks, vocab, term_ptr, doc_ids, term_freqs,
+            doc_len=np.array([len(t) for t in token_lists], dtype=np.float32),
+            idf=np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32),
+        )
+        self.version += 1
+        self.stats["builds"] += 1
+
+    # --- querying ---
+
+    def search(self, query, k=3):
+        """
+        Rank chunks against a query with BM25
+
+        Returns:
+            list: Up to k dicts with source, title, text and score
+        """
+        self.refresh()
+        # One read: a concurrent rebuild publishes a whole new _Postings
+        index = self.postings
+        terms = [index.vocab[t] for t in set(tokenize(query)) if t in index.vocab]
+        if not terms or not index.chunks:
+            return []
+
+        term_ptr, chunks = index.term_ptr, index.chunks
+        docs = np.concatenate([index.doc_ids[term_ptr[t]:term_ptr[t + 1]] for t in terms])
+        tf = np.concatenate([index.term_freqs[term_ptr[t]:term_ptr[t + 1]] for t in terms])
+        weights = np.repeat(index.idf[terms], np.diff(term_ptr)[terms])
+
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * index.doc_len[docs] / index.avg_len)
+        contrib = weights * tf * (BM25_K1 + 1) / (tf + norm)
+        scores = np.bincount(docs, weights=contrib, minlength=len(chunks))
+
+        k = min(k, len(chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {**chunks[i], "score": float(scores[i])}
+            for i in top if scores[i] > 0
+        ]
+
+    def quick_answer(self, query, min_score=QUICK_ANSWER_MIN_SCORE):
+        """Best matching chunk if it is confident enough, else None"""
+        hits = self.search(query, k=1)
+        if hits and hits[0]["score"] >= min_score:
+            return hits[0]
+        return None
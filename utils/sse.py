@@ -0,0 +1,101 @@
+"""
+GameVerse SSE Parser
+Minimal Server-Sent Events reader for the Botpress listen stream
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see pyproject "fast" extra
+    orjson = None
+
+CHUNK_SIZE = 16 * 1024
+PING = b"ping"
+
+
+def loads(data):
+    """Decode JSON from bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_chunks(response, chunk_size=CHUNK_SIZE):
+    """
+    Yield raw body chunks as soon as they arrive
+
+    ``read1`` returns whatever bytes are available instead of blocking
+    until ``chunk_size`` bytes were read, so events are never held back
+    in a buffer. Falls back to requests' iter_content otherwise.
+    """
+    raw = getattr(response, "raw", None)
+    read1 = getattr(raw, "read1", None)
+    if read1 is None:
+        yield from response.iter_content(chunk_size=None)
+        return
+    while True:
+        chunk = read1(chunk_size, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_lines(chunks):
+    """
+    Split byte chunks into lines without the line terminator
+
+    ``\r\n``, ``\r`` and ``\n`` all end a line, as the SSE spec requires,
+    including a ``\r\n`` split across two chunks.
+    """
+    pending = b""
+    after_cr = False  # last chunk ended in \r; a leading \n completes it
+    for chunk in chunks:
+        if after_cr and chunk:
+            after_cr = False
+            if chunk[:1] == b"\n":
+                chunk = chunk[1:]
+        if not chunk:
+            continue
+        if pending:
+            chunk = pending + chunk
+        # bytes.splitlines breaks on exactly \r\n, \r and \n
+        lines = chunk.splitlines()
+        if chunk[-1:] in (b"\n", b"\r"):
+            pending = b""
+            after_cr = chunk[-1:] == b"\r"
+        else:
+            pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_event_data(lines):
+    """
+    Yield the data payload (bytes) of each SSE event
+
+    Only ``data:`` fields are collected; comments, ``event:``, ``id:`` and
+    ``retry:`` lines are skipped, and ping events are dropped before any
+    decoding happens. Only events terminated by a blank line are yielded.
+    """
+    data = []
+    for line in lines:
+        if not line:
+            # Blank line dispatches the event
+            if data:
+                payload = data[0] if len(data) == 1 else b"\n".join(data)
+                data = []
+                if payload != PING:
+                    yield payload
+            continue
+        if line.startswith(b"data:"):
+            value = line[5:]
+            data.append(value[1:] if value[:1] == b" " else value)
+    # Data still pending at EOF belongs to an event that was cut off before
+    # its blank line; the SSE spec discards it rather than dispatching it
+
+
+def iter_sse(response):
+    """Yield event data payloads straight from a streaming requests response"""
+    return iter_event_data(iter_lines(iter_chunks(response)))
@@ -0,0 +1,119 @@
+"""
+GameVerse Stream Coalescing
+Batches small streamed text pieces into fewer, larger UI updates
+"""
+
+import queue
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.05  # seconds a frame may wait for more text
+DEFAULT_MAX_CHARS = 400  # flush early once a frame gets this large
+
+_DONE = object()
+
+
+class StreamError(str):
+    """
+    Error text a stream yields in place of the rest of its reply
+
+    It reads like any other piece, so it is shown as is, but lets
+    consumers tell a failed reply from a complete one (see
+    CoalescedStream.error).
+    """
+
+
+class _Failure:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+class CoalescedStream:
+    """
+    Wrap a text generator so it yields time- or size-bounded frames
+
+    The source is read on a background thread, so a frame is flushed
+    ``interval`` seconds after its first piece arrived even if the source
+    is blocked waiting on the network. The very first piece is passed
+    through immediately to keep time-to-first-token low.
+
+    ``error`` is set when the source yielded a StreamError or raised, so
+    a failed reply can be told apart after it was displayed.
+
+    Usage:
+        stream = CoalescedStream(client.listen_conversation(cid))
+        st.write_stream(stream)
+        stream.frames_in, stream.frames_out, stream.merged, stream.error
+    """
+
+    def __init__(self, stream, interval=DEFAULT_INTERVAL, max_chars=DEFAULT_MAX_CHARS):
+        self.stream = stream
+        self.interval = interval
+        self.max_chars = max_chars
+        self.frames_in = 0
+        self.frames_out = 0
+        self.error = None
+        self._stop = threading.Event()
+
+    @property
+    def merged(self):
+        """Number of source frames folded into another frame"""
+        return self.frames_in - self.frames_out
+
+    def stats(self):
+        return {"frames_in": self.frames_in, "frames_out": self.frames_out,
+                "merged": self.merged}
+
+    def _pump(self, out):
+        try:
+            for piece in self.stream:
+                if self._stop.is_set():
+                    break
+                if isinstance(piece, StreamError):
+                    self.error = piece
+                out.put(piece)
+        except Exception as e:
+            self.error = StreamError(f"[Error: {e}]")
+            out.put(_Failure(e))
+        finally:
+            out.put(_DONE)
+
+    def __iter__(self):
+        pieces = queue.Queue()
+        threading.Thread(target=self._pump, args=(pieces,), daemon=True).start()
+
+        buffer, size, deadline = [], 0, 0.0
+        try:
+            while True:
+                timeout = max(0.0, deadline - time.monotonic()) if buffer else None
+                try:
+                    item = pieces.get(timeout=timeout)
+                except queue.Empty:
+                    item = None  # frame deadline reached
+
+                if item is _DONE or isinstance(item, _Failure):
+                    if buffer:
+                        self.frames_out += 1
+                        yield "".join(buffer)
+                    if isinstance(item, _Failure):
+                        raise item.exc
+                    return
+
+                if item:
+                    self.frames_in += 1
+                    if self.frames_out == 0 and not buffer:
+                        self.frames_out += 1
+                        yield item
+                        continue
+                    if not buffer:
+                        deadline = time.monotonic() + self.interval
+                    buffer.append(item)
+                    size += len(item)
+
+                if buffer and (item is None or size >= self.max_chars
+                               or time.monotonic() >= deadline):
+                    self.frames_out += 1
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+        finally:
+            self._stop.set()
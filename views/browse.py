@@ -5,7 +5,104 @@ Browse and filter games catalog
 
 import streamlit as st
 from utils.helpers import add_to_cart, add_to_wishlist, format_price
-from data.games_data import filter_games, get_categories
+from data.autocomplete import complete
+from data.games_data import filter_games, get_categories, get_facet_counts, get_tags, sort_games
+from data.recommender import similar_games
+from data.sorting import SORT_LABELS
+
+SUGGESTION_ICONS = {"title": "🎮", "developer": "🛠️", "tag": "🏷️"}
+PAGE_SIZE = 12
+
+
+def apply_suggestion():
+    """Turn a picked suggestion into the matching filter"""
+    picked = st.session_state.get("browse_suggestion")
+    if not picked:
+        return
+    kind, text = picked.split(":", 1)
+    if kind == "title":
+        st.session_state.browse_search = text
+    elif kind == "tag":
+        st.session_state.browse_search = ""
+        if text not in st.session_state.browse_tags:
+            st.session_state.browse_tags = st.session_state.browse_tags + [text]
+    else:
+        st.session_state.browse_search = ""
+        st.session_state.browse_developer = text
+    st.session_state.browse_suggestion = None
+
+
+def clear_developer():
+    st.session_state.browse_developer = "All"
+
+
+def change_page(step):
+    st.session_state.browse_page += step
+
+
+def render_pagination(page, pages):
+    """Previous/next controls for the results"""
+    if pages <= 1:
+        return
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("← Previous", key="browse_prev", disabled=page <= 1,
+                  on_click=change_page, args=(-1,))
+    with col_info:
+        st.markdown(f"<div style='text-align: center;'>Page {page} of {pages}</div>",
+                    unsafe_allow_html=True)
+    with col_next:
+        st.button("Next →", key="browse_next", disabled=page >= pages,
+                  on_click=change_page, args=(1,))
+
+
+def render_refine_sidebar(games_df, filtered_df):
+    """Tag filter and live facet counts for the current results"""
+    counts = get_facet_counts(games_df, filtered_df)
+    tag_counts = counts["tags"]
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### Refine Results")
+    st.sidebar.multiselect(
+        "Tags",
+        get_tags(games_df),
+        format_func=lambda tag: f"{tag} ({tag_counts.get(tag, 0)})",
+        key="browse_tags",
+    )
+    st.sidebar.radio(
+        "Match",
+        ["any", "all"],
+        format_func={"any": "Any selected tag", "all": "All selected tags"}.get,
+        key="browse_tag_mode",
+        horizontal=True,
+    )
+    
+    st.sidebar.markdown("**Categories**")
+    st.sidebar.markdown("\n".join(
+        f"- {name}: {n}" for name, n in sorted(counts["category"].items())
+    ) or "- None")
+    st.sidebar.markdown("**Price Ranges**")
+    st.sidebar.markdown("\n".join(f"- {name}: {n}" for name, n in counts["price"].items()))
+
+
+def render_suggestions(games_df, search):
+    """Completions for the search box, as clickable pills"""
+    suggestions = [
+        s for s in complete(games_df, search)
+        if not (s["kind"] == "title" and s["text"].lower() == search.strip().lower())
+    ]
+    if not suggestions:
+        return
+    options = [f"{s['kind']}:{s['text']}" for s in suggestions]
+    st.pills(
+        "Suggestions",
+        options,
+        format_func=lambda option: f"{SUGGESTION_ICONS[option.split(':', 1)[0]]} "
+                                   f"{option.split(':', 1)[1]}",
+        key="browse_suggestion",
+        on_change=apply_suggestion,
+        label_visibility="collapsed",
+    )
 
 
 def render(games_df):
@@ -15,8 +112,14 @@ def render(games_df):
     # Filter controls
     col1, col2, col3 = st.columns(3)
     
+    st.session_state.setdefault("browse_developer", "All")
+    st.session_state.setdefault("browse_tags", [])
+    st.session_state.setdefault("browse_tag_mode", "any")
+    st.session_state.setdefault("browse_page", 1)
+    
     with col1:
-        search = st.text_input("Search games", "", placeholder="Enter game title...")
+        search = st.text_input("Search games", placeholder="Enter game title...",
+                               key="browse_search")
     
     with col2:
         categories = ["All"] + get_categories(games_df)
@@ -28,28 +131,62 @@ def render(games_df):
             ["All", "Free", "Under $20", "$20-$40", "$40+"]
         )
     
+    if search:
+        render_suggestions(games_df, search)
+    
+    # Developer filter picked from suggestions
+    if st.session_state.browse_developer != "All":
+        st.button(f"✕ Developer: {st.session_state.browse_developer}", key="clear_developer",
+                  on_click=clear_developer)
+    
     # Apply filters
     filtered_df = filter_games(
         games_df,
         search=search,
         category=selected_category,
-        price_range=price_range
+        price_range=price_range,
+        developer=st.session_state.browse_developer,
+        tags=st.session_state.browse_tags,
+        tag_mode=st.session_state.browse_tag_mode,
+        fuzzy=True
     )
+    render_refine_sidebar(games_df, filtered_df)
     
-    # Display result count
-    st.markdown(f"**Found {len(filtered_df)} games**")
+    # Display result count and sort order
+    col_count, col_sort = st.columns([3, 1])
+    with col_count:
+        if filtered_df.attrs.get("fuzzy") and not filtered_df.empty:
+            st.markdown(f"**No exact matches for \"{search}\". "
+                        f"Showing {len(filtered_df)} close matches**")
+        else:
+            st.markdown(f"**Found {len(filtered_df)} games**")
+    with col_sort:
+        sort_by = st.selectbox("Sort by", list(SORT_LABELS), format_func=SORT_LABELS.get,
+                               key="browse_sort")
     st.markdown("---")
     
+    # Back to the first page whenever the results change
+    query = (search, selected_category, price_range, st.session_state.browse_developer,
+             tuple(st.session_state.browse_tags), st.session_state.browse_tag_mode, sort_by)
+    if st.session_state.get("browse_query") != query:
+        st.session_state.browse_query = query
+        st.session_state.browse_page = 1
+    
     # Display filtered games
     if filtered_df.empty:
         st.info("No games found matching your criteria. Try adjusting the filters.")
     else:
-        for _, game in filtered_df.iterrows():
-            render_game_detail(game.to_dict())
+        page_df, page, pages = sort_games(games_df, filtered_df, sort_by,
+                                          page=st.session_state.browse_page,
+                                          page_size=PAGE_SIZE)
+        st.session_state.browse_page = page
+        for _, game in page_df.iterrows():
+            render_game_detail(game.to_dict(), games_df)
             st.markdown("---")
+        render_pagination(page, pages)
 
 
-def render_game_detail(game):
+def render_game_detail(game, games_df):
     """Render detailed game information"""
     col1, col2 = st.columns([1, 3])
     
@@ -75,7 +212,7 @@ def render_game_detail(game):
         
         # Rating and category
         stars = "⭐" * int(game['rating'])
-        st.markdown(f"**Category:** {game['category']} | **Rating:** {stars} ({game['rating']})")
+        st.markdown(f"**Category:** {game['category']} | **Rating:** {stars} ({game['rating']:.1f})")
         
         # Developer and release date
         st.markdown(f"**Developer:** {game['developer']} | **Release:** {game['release_date']}")
@@ -118,7 +255,14 @@ def render_game_detail(game):
                     - Category: {game['category']}
                     - Developer: {game['developer']}
                     - Release Date: {game['release_date']}
-                    - Rating: {game['rating']}/5.0
+                    - Rating: {game['rating']:.1f}/5.0
                     
                     **Tags:** {', '.join(game['tags'])}
-                    """)
\ No newline at end of file
+                    """)
+                    
+                    similar = similar_games(games_df, [game['id']])[game['id']]
+                    if similar:
+                        st.markdown("**More like this:**")
+                        for other in similar:
+                            st.markdown(f"- {other['title']} ({other['category']}) - "
+                                        f"{format_price(other['price'])}")
\ No newline at end of file
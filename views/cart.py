@@ -4,7 +4,9 @@ Manage cart items and checkout
 """
 
 import streamlit as st
-from utils.helpers import calculate_cart_total, format_price
+from utils.helpers import calculate_cart_total, format_price, record_checkout, render_game_card
+from data.cooccurrence import customers_also_bought
+from data.recommender import recommend_for
 
 
 def render(games_df):
@@ -26,6 +28,9 @@ def render(games_df):
     # Cart summary
     st.markdown("---")
     render_cart_summary()
+    
+    render_also_bought(games_df)
+    render_similar_games(games_df)
 
 
 def render_cart_item(game, idx):
@@ -48,6 +53,36 @@ def render_cart_item(game, idx):
     st.markdown("---")
 
 
+def render_also_bought(games_df):
+    """Games other customers picked together with the ones in the cart"""
+    cart_ids = [game['id'] for game in st.session_state.cart]
+    also_bought = customers_also_bought(games_df, cart_ids, k=3)
+    if not also_bought:
+        return
+    
+    st.markdown("---")
+    st.markdown("### Customers Also Bought")
+    cols = st.columns(3)
+    for idx, game in enumerate(also_bought):
+        with cols[idx]:
+            render_game_card(game, context="cart_also")
+
+
+def render_similar_games(games_df):
+    """Games like the ones in the cart, from the local recommender"""
+    cart_ids = [game['id'] for game in st.session_state.cart]
+    similar = recommend_for(games_df, cart_ids, k=3)
+    if not similar:
+        return
+    
+    st.markdown("---")
+    st.markdown("### You Might Also Like")
+    cols = st.columns(3)
+    for idx, game in enumerate(similar):
+        with cols[idx]:
+            render_game_card(game, context="cart_similar")
+
+
 def render_cart_summary():
     """Render cart summary and checkout"""
     total = calculate_cart_total()
@@ -66,6 +101,7 @@ def render_cart_summary():
 def handle_checkout():
     """Handle checkout process"""
     total = calculate_cart_total()
+    record_checkout(st.session_state.cart)
     
     st.balloons()
     st.success(f"Order placed successfully! Total: {format_price(total)}")
@@ -3,8 +3,19 @@ GameVerse AI Chatbot - ROBUST STATE VERSION
 Uses a dictionary-based history cache to prevent message loss during reruns.
 """
 
+import re
+import uuid
+
 import streamlit as st
-from utils.botpress_client import BotpressClient 
+from utils.answer_cache import AnswerCache, answer_source, stream_answer
+from utils.client_pool import BotpressClientPool
+from utils.history_store import HistoryStore, hash_key, to_chat_messages
+from utils.knowledge_index import KnowledgeIndex
+from utils.streaming import CoalescedStream
+
+VISITOR_PARAM = "visitor"  # query parameter holding the browser's visitor id
+HISTORY_PAGE_SIZE = 20  # messages rendered per "show older" step
+MAX_HISTORY_IN_MEMORY = 200  # per conversation; older messages stay on disk
 
 
 def render(games_df):
@@ -18,22 +29,28 @@ def render(games_df):
         st.error("⚠️ Chatbot not configured. Please set up your Botpress credentials.")
         return
     
-    # 2. Authenticate User
-    try:
-        user = client.get_user()
-        if "error" in user:
-            st.error(f"Failed to authenticate: {user['error']}")
+    store = get_history_store()
+    
+    # 2. Authenticate User (known users start warm from the local store)
+    user_key = st.session_state.botpress_user_key
+    user_id = store.user_id_for_key(user_key)
+    if user_id is None:
+        try:
+            user = client.get_user()
+            if "error" in user:
+                st.error(f"Failed to authenticate: {user['error']}")
+                return
+            user_id = user["user"]["id"]
+            store.save_user(user_key, user_id)
+        except Exception as e:
+            st.error(f"Authentication error: {str(e)}")
             return
-        user_id = user["user"]["id"]
-    except Exception as e:
-        st.error(f"Authentication error: {str(e)}")
-        return
     
     # 3. Initialize Global State (Conversations & History Cache)
-    initialize_global_state(client)
+    initialize_global_state(client, store, user_id)
     
     # 4. Render Selector (Updates active_conversation)
-    render_conversation_selector(client)
+    render_conversation_selector(client, store, user_id)
     
     st.markdown("---")
     
@@ -41,60 +58,168 @@ def render(games_df):
     conversation_id = st.session_state.active_conversation
     
     # 6. Ensure History is Loaded for THIS Conversation
-    # We checks if this specific ID exists in our cache. If not, we fetch from API.
-    # If it DOES exist (even if empty list), we rely on the cache.
-    if conversation_id not in st.session_state.conversation_history:
-        with st.spinner("Loading history..."):
-            messages = fetch_messages_from_api(client, conversation_id, user_id)
-            st.session_state.conversation_history[conversation_id] = messages
+    load_history(client, store, user_id, conversation_id)
             
-    # 7. Display Messages from Cache
-    current_messages = st.session_state.conversation_history[conversation_id]
-    
-    for message in current_messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    # 7. Display the most recent messages from Cache
+    render_history(store, user_id, conversation_id)
     
     # 8. Handle Input
-    handle_chat_input(client, conversation_id)
+    handle_chat_input(client, store, user_id, conversation_id)
 
 
 @st.cache_resource
+def get_client_pool():
+    """Create the process-wide pool of per-user Botpress clients."""
+    api_id = st.secrets.get("CHAT_API_ID")
+    if not api_id:
+        return None
+    return BotpressClientPool(
+        api_id=api_id,
+        base_uri=st.secrets.get("BOTPRESS_BASE_URI"),
+        max_clients=st.secrets.get("BOTPRESS_MAX_CLIENTS", 256),
+        idle_timeout=st.secrets.get("BOTPRESS_CLIENT_IDLE_TIMEOUT", 15 * 60),
+        warm_connections=st.secrets.get("BOTPRESS_WARM_CONNECTIONS", 2),
+        keepalive_interval=st.secrets.get("BOTPRESS_KEEPALIVE_INTERVAL", 55),
+        provision_users=st.secrets.get("BOTPRESS_PROVISION_USERS", False),
+        max_provisioned=st.secrets.get("BOTPRESS_MAX_PROVISIONED_USERS", 50),
+    )
+
+
+def get_visitor_id():
+    """
+    Stable id for this browser, kept in the page URL.
+    
+    Reloads and bookmarks come back as the same visitor, and so get the
+    same Botpress identity. The id is random and works like a session
+    cookie: whoever has the URL has the chat.
+    """
+    visitor = st.query_params.get(VISITOR_PARAM, "")
+    if not re.fullmatch(r"[0-9a-f]{32}", visitor):
+        visitor = uuid.uuid4().hex
+        st.query_params[VISITOR_PARAM] = visitor
+    return visitor
+
+
+def reset_chat_state():
+    """Drop the conversations of the identity this session had before."""
+    for name in ("conversation_history", "history_generation", "conversations",
+                 "conversations_loaded", "active_conversation", "history_window"):
+        st.session_state.pop(name, None)
+
+
 def get_or_create_client():
-    """Create and cache Botpress client."""
+    """Get the Botpress client for this browser session's user."""
     try:
-        api_id = st.secrets.get("CHAT_API_ID")
-        user_key = st.secrets.get("users", [{}])[0].get("key") 
+        pool = get_client_pool()
+        if pool is None:
+            return None
         
-        if not api_id or not user_key:
+        # Each browser keeps its identity while it comes back; every run
+        # renews the lease on its key (see BotpressClientPool.assign_user_key).
+        # After a restart or a lapsed lease, the key it had is preferred, so
+        # its stored history is still its own.
+        store = get_history_store()
+        visitor = get_visitor_id()
+        user_keys = [u.get("key") for u in st.secrets.get("users", []) if u.get("key")]
+        hashes = {key: hash_key(key) for key in [*user_keys, *pool.provisioned_keys]}
+        known = store.visitor_key_hash(visitor)
+        claimed = store.claimed_key_hashes()
+        user_key = pool.assign_user_key(
+            user_keys, visitor=visitor,
+            preferred=next((key for key, h in hashes.items() if h == known), None),
+            avoid={key for key, h in hashes.items() if h in claimed},
+        )
+        if user_key != st.session_state.get("botpress_user_key"):
+            # The lease lapsed and the key went to someone else
+            if st.session_state.get("botpress_user_key"):
+                reset_chat_state()
+            st.session_state.botpress_user_key = user_key
+            if user_key:
+                store.save_visitor(visitor, user_key)
+        
+        if not user_key:
             return None
         
-        return BotpressClient(api_id=api_id, user_key=user_key)
+        return pool.get(user_key)
     except Exception as e:
         st.error(f"Failed to initialize client: {str(e)}")
         return None
 
 
-def initialize_global_state(client):
+@st.cache_resource
+def get_answer_cache():
+    """Process-wide cache of answers to repeated help-center questions."""
+    return AnswerCache(ttl=st.secrets.get("ANSWER_CACHE_TTL", 6 * 60 * 60))
+
+
+@st.cache_resource
+def get_knowledge_index():
+    """Process-wide BM25 index over the knowledge/ directory."""
+    return KnowledgeIndex()
+
+
+def find_quick_answer(prompt):
+    """The best help-center snippet for a question, if confident."""
+    try:
+        return get_knowledge_index().quick_answer(prompt)
+    except OSError:
+        return None
+
+
+def render_quick_answer(hit):
+    """Show a help-center snippet above the reply."""
+    snippet = hit["text"]
+    if len(snippet) > 600:
+        snippet = snippet[:600].rsplit(" ", 1)[0] + " …"
+    with st.container(border=True):
+        st.caption(f"⚡ Quick answer from {hit['source']} — {hit['title']}")
+        st.markdown(snippet)
+
+
+def record_stream_stats(stream):
+    """Accumulate how many stream frames were merged before reaching the UI."""
+    totals = st.session_state.setdefault(
+        "stream_stats", {"frames_in": 0, "frames_out": 0, "merged": 0}
+    )
+    for name, value in stream.stats().items():
+        totals[name] += value
+
+
+@st.cache_resource
+def get_history_store():
+    """Process-wide on-disk chat history (SQLite)."""
+    return HistoryStore()
+
+
+def initialize_global_state(client, store, user_id):
     """Initialize the global dictionary for history and load conversation list."""
     
     # THE CORE FIX: A dictionary mapping conversation_id -> list of messages
     if "conversation_history" not in st.session_state:
         st.session_state.conversation_history = {}
+    
+    # Store generation each history was loaded at (see load_history)
+    if "history_generation" not in st.session_state:
+        st.session_state.history_generation = {}
         
     if "conversations_loaded" not in st.session_state:
         st.session_state.conversations_loaded = False
     
-    # Load conversation list once
+    # Load conversation list once, from disk when we have it
     if not st.session_state.conversations_loaded:
-        conversations_data = client.list_conversations()
-        conversations = conversations_data.get("conversations", [])
+        conversations = store.conversations(user_id)
         
-        # Create first conversation if none exist
         if not conversations:
-            res = client.create_conversation()
-            if "conversation" in res:
-                conversations = [res["conversation"]]
+            conversations_data = client.list_conversations()
+            conversations = conversations_data.get("conversations", [])
+            
+            # Create first conversation if none exist
+            if not conversations:
+                res = client.create_conversation()
+                if "conversation" in res:
+                    conversations = [res["conversation"]]
+            
+            store.save_conversations(user_id, conversations)
         
         st.session_state.conversations = conversations
         st.session_state.conversations_loaded = True
@@ -104,7 +229,7 @@ def initialize_global_state(client):
             st.session_state.active_conversation = conversations[0]["id"]
 
 
-def render_conversation_selector(client):
+def render_conversation_selector(client, store, user_id):
     """Render selector. Does NOT clear history, just changes ID."""
     conversations = st.session_state.get("conversations", [])
     
@@ -124,26 +249,29 @@ def render_conversation_selector(client):
         except (ValueError, IndexError):
             current_index = 0
         
+        # The key carries a version so a replaced conversation (see
+        # replace_missing_conversation) can't linger as the widget's value
+        labels = {cid: f"Conversation {i + 1}" for i, cid in enumerate(conversation_ids)}
         selected_id = st.selectbox(
             "Select Conversation",
             options=conversation_ids,
             index=current_index,
-            format_func=lambda x: f"Conversation {conversation_ids.index(x) + 1}",
-            key="conversation_selector"
+            format_func=lambda x: labels.get(x, "Conversation"),
+            key=f"conversation_selector_{st.session_state.get('conversation_list_version', 0)}"
         )
         
         # If selection changes, just update the ID and rerun to trigger logic in step 6
-        if selected_id != current_id:
+        if selected_id in labels and selected_id != current_id:
             st.session_state.active_conversation = selected_id
             st.rerun()
     
     with col2:
         st.markdown("<div style='height: 1.9em'></div>", unsafe_allow_html=True)
         if st.button("➕ New"):
-            create_new_conversation(client)
+            create_new_conversation(client, store, user_id)
 
 
-def create_new_conversation(client):
+def create_new_conversation(client, store, user_id):
     """Create new conversation and update state."""
     res = client.create_conversation()
     if "conversation" in res:
@@ -152,6 +280,7 @@ def create_new_conversation(client):
         
         # Update conversation list
         st.session_state.conversations.append(new_conv)
+        store.save_conversations(user_id, [new_conv])
         
         # Initialize empty history for this new ID immediately
         st.session_state.conversation_history[cid] = []
@@ -161,27 +290,127 @@ def create_new_conversation(client):
         st.rerun()
 
 
+def replace_missing_conversation(client, store, user_id, conversation_id):
+    """
+    Swap a stored conversation Botpress doesn't know (404) for a new one.
+    
+    Warm starts trust the local store, which can outlive the conversation
+    on the Botpress side (deleted, or a different deployment).
+    
+    Returns:
+        str or None: The new conversation id; None if Botpress couldn't
+            create one, in which case the old conversation is left as is
+    """
+    res = client.create_conversation()
+    if "conversation" not in res:
+        return None
+    new_conv = res["conversation"]
+    cid = new_conv["id"]
+    
+    store.forget_conversation(user_id, conversation_id)
+    pending = st.session_state.conversation_history.pop(conversation_id, [])
+    st.session_state.conversations = [new_conv] + [
+        c for c in st.session_state.get("conversations", []) if c["id"] != conversation_id
+    ]
+    store.save_conversations(user_id, [new_conv])
+    st.session_state.conversation_history[cid] = pending
+    st.session_state.active_conversation = cid
+    st.session_state.conversation_list_version = (
+        st.session_state.get("conversation_list_version", 0) + 1
+    )
+    return cid
+
+
+def load_history(client, store, user_id, conversation_id):
+    """
+    Make sure this conversation's history is in session state.
+    
+    Stored conversations render straight from disk while a background sync
+    reconciles them with Botpress; the next rerun picks up whatever the
+    sync changed. Only conversations never seen before block on the API.
+    """
+    history = st.session_state.conversation_history
+    generations = st.session_state.history_generation
+    
+    if conversation_id not in history:
+        stored = store.load(user_id, conversation_id)
+        if stored is None:
+            with st.spinner("Loading history..."):
+                rows = fetch_messages_from_api(client, conversation_id, user_id)
+                store.reconcile(user_id, conversation_id, rows)
+            history[conversation_id] = store.load(user_id, conversation_id) or []
+        else:
+            history[conversation_id] = stored
+            store.sync_in_background(client, user_id, conversation_id)
+        generations[conversation_id] = store.generation(user_id, conversation_id)
+    
+    elif store.generation(user_id, conversation_id) != generations.get(conversation_id):
+        # A background sync changed the stored copy
+        history[conversation_id] = store.load(user_id, conversation_id) or []
+        generations[conversation_id] = store.generation(user_id, conversation_id)
+
+
+def compact_history(conversation_id):
+    """Keep at most MAX_HISTORY_IN_MEMORY messages in session state."""
+    messages = st.session_state.conversation_history[conversation_id]
+    if len(messages) > MAX_HISTORY_IN_MEMORY:
+        del messages[:-MAX_HISTORY_IN_MEMORY]
+
+
+def show_older_messages(conversation_id):
+    """Button callback: widen the rendered window by one page."""
+    windows = st.session_state.history_window
+    windows[conversation_id] = windows.get(conversation_id, HISTORY_PAGE_SIZE) + HISTORY_PAGE_SIZE
+
+
+def render_history(store, user_id, conversation_id):
+    """
+    Render only the last N messages, with on-demand expansion.
+    
+    Messages beyond what session state keeps are read back from the
+    local history store.
+    """
+    compact_history(conversation_id)
+    messages = st.session_state.conversation_history[conversation_id]
+    windows = st.session_state.setdefault("history_window", {})
+    window = windows.get(conversation_id, HISTORY_PAGE_SIZE)
+    
+    if window > len(messages) or len(messages) == MAX_HISTORY_IN_MEMORY:
+        # There may be more on disk than in memory
+        total = max(len(messages), store.count(user_id, conversation_id))
+        if window > len(messages):
+            messages = store.load(user_id, conversation_id, limit=window) or messages
+    else:
+        total = len(messages)
+    
+    visible = messages[-window:]
+    hidden = total - len(visible)
+    if hidden > 0:
+        st.button(
+            f"⬆ Show {min(HISTORY_PAGE_SIZE, hidden)} older messages ({hidden} hidden)",
+            key=f"show_older_{conversation_id}",
+            on_click=show_older_messages,
+            args=(conversation_id,)
+        )
+    
+    for message in visible:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+
 def fetch_messages_from_api(client, conversation_id, user_id):
     """Helper to fetch and format messages from API."""
     try:
         messages_data = client.list_messages(conversation_id, limit=50)
         messages = messages_data.get("messages", [])
-        
-        chat_messages = []
-        for message in reversed(messages):
-            role = "user" if message.get("userId") == user_id else "assistant"
-            text = message.get("payload", {}).get("text", "")
-            if text:
-                chat_messages.append({"role": role, "content": text})
-        
-        return chat_messages
+        return to_chat_messages(messages, user_id)
     except Exception as e:
         st.error(f"Error loading history: {e}")
         return []
 
 
-def handle_chat_input(client, conversation_id):
-    """Handle input, update DICTIONARY state, and rerun."""
+def handle_chat_input(client, store, user_id, conversation_id):
+    """Handle input and update DICTIONARY state; no extra rerun needed."""
     if prompt := st.chat_input("Ask me about games..."):
         
         # 1. Update LOCAL cache immediately (User message)
@@ -192,31 +421,91 @@ def handle_chat_input(client, conversation_id):
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # 2. Send to Botpress
-        try:
-            client.create_message(prompt, conversation_id=conversation_id)
-        except Exception as e:
-            st.error(f"Failed to send: {e}")
+        # 2. Repeated help-center questions are answered locally (no
+        # Botpress round-trip, no Botpress reply)
+        answer_cache = get_answer_cache()
+        hit = find_quick_answer(prompt)
+        source = answer_source(hit) if hit is not None else None
+        cached = answer_cache.get(prompt, source) if source is not None else None
+        if cached is not None:
+            with st.chat_message("assistant"):
+                stream = CoalescedStream(stream_answer(cached))
+                response = st.write_stream(stream)
+            record_stream_stats(stream)
+            bot_msg = {"role": "assistant", "content": response}
+            st.session_state.conversation_history[conversation_id].append(bot_msg)
+            # Botpress never sees this turn; syncs keep both rows
+            store.append(user_id, conversation_id, "user", prompt, local_only=True)
+            store.append(user_id, conversation_id, "assistant", response, local_only=True)
+            st.session_state.chatbot_messages += 1
+            compact_history(conversation_id)
             return
         
-        # 3. Stream Response
         with st.chat_message("assistant"):
+            # 3. Instant local snippet while Botpress works on the reply
+            if hit is not None:
+                render_quick_answer(hit)
+            
+            # 4. Send to Botpress
+            replaced = False
             try:
-                stream = client.listen_conversation(conversation_id=conversation_id)
+                result = client.create_message(prompt, conversation_id=conversation_id)
+                if result.get("status") == 404:
+                    new_id = replace_missing_conversation(
+                        client, store, user_id, conversation_id
+                    )
+                    if new_id is None:
+                        st.error("This conversation no longer exists and a new one "
+                                 "couldn't be started. Please try again.")
+                        return
+                    replaced, conversation_id = True, new_id
+                    result = client.create_message(prompt, conversation_id=conversation_id)
+            except Exception as e:
+                st.error(f"Failed to send: {e}")
+                return
+            
+            # Don't wait on the listen stream for a message Botpress never got
+            if "error" in result:
+                st.error(f"Failed to send: {result['error']}")
+                return
+            store.append(user_id, conversation_id, "user", prompt,
+                         message_id=result.get("message", {}).get("id"))
+            
+            # 5. Stream Response
+            try:
+                # Batch SSE events into ~50 ms frames: far fewer websocket
+                # deltas and re-renders than one per event
+                stream = CoalescedStream(
+                    client.listen_conversation(conversation_id=conversation_id)
+                )
                 response = st.write_stream(stream)
+                record_stream_stats(stream)
                 
                 if response:
-                    # 4. Update LOCAL cache immediately (Assistant message)
+                    # 6. Update LOCAL cache immediately (Assistant message)
                     bot_msg = {"role": "assistant", "content": response}
                     st.session_state.conversation_history[conversation_id].append(bot_msg)
+                    # A failed stream can still have yielded part of
+                    # a reply; neither is worth caching or storing
+                    if stream.error is None:
+                        if source is not None:
+                            answer_cache.put(prompt, source, response)
+                        store.append(user_id, conversation_id, "assistant", response)
+                        # Pick up Botpress' message ids for the reply
+                        store.sync_in_background(client, user_id, conversation_id)
                     
                     # Track usage stats
                     if "chatbot_messages" not in st.session_state:
                         st.session_state.chatbot_messages = 0
                     st.session_state.chatbot_messages += 1
                     
-                    # 5. Rerun to ensure consistency
-                    st.rerun()
+                    # The reply is already on screen and in state, so no
+                    # st.rerun(): the next interaction renders from history
+                    compact_history(conversation_id)
                     
             except Exception as e:
-                st.error(f"Streaming error: {e}")
\ No newline at end of file
+                st.error(f"Streaming error: {e}")
+        
+        # The selector above still lists the conversation that was replaced
+        if replaced:
+            st.rerun()
\ No newline at end of file
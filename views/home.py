@@ -5,6 +5,7 @@ Featured games and special offers
 
 import streamlit as st
 from utils.helpers import render_game_card, format_price
+from data.cooccurrence import customers_also_bought
 from data.games_data import get_featured_games, get_free_games
 
 
@@ -21,6 +22,8 @@ def render(games_df):
         with cols[idx]:
             render_game_card(game.to_dict(), context="home")
     
+    render_picked_for_you(games_df)
+    
     # Special offers section
     st.markdown("---")
     st.markdown("## Special Offers")
@@ -62,4 +65,20 @@ def render(games_df):
                 or check out today's deals and discounts.
             </p>
         </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        """, unsafe_allow_html=True)
+
+
+def render_picked_for_you(games_df):
+    """Games other customers picked with this session's cart and wishlist"""
+    owned_ids = [game['id'] for game in st.session_state.cart + st.session_state.wishlist]
+    picks = customers_also_bought(games_df, owned_ids, k=3)
+    if not picks:
+        return
+    
+    st.markdown("---")
+    st.markdown("## Picked For You")
+    st.caption("Often picked together with games in your cart and wishlist")
+    cols = st.columns(3)
+    for idx, game in enumerate(picks):
+        with cols[idx]:
+            render_game_card(game, context="home_picks")
@@ -0,0 +1,65 @@
+"""
+Watch Catalog Script
+Republish the catalog snapshot whenever its source file changes
+
+Each change is applied as a row-level delta to the current snapshot's
+indexes (see data/catalog_watcher.py) and published as a new version,
+which running apps pick up on their next rerun. Point the app at the
+snapshot with GAMEVERSE_CATALOG_SNAPSHOT.
+
+Usage:
+    python watch_catalog.py knowledge/games.csv
+    python watch_catalog.py big_catalog.parquet --out .cache/catalog --interval 1
+    python watch_catalog.py big_catalog.parquet --once
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from data.catalog_watcher import POLL_INTERVAL, CatalogWatcher
+
+DEFAULT_OUT = Path(".cache") / "catalog"
+
+
+def report(version, delta, seconds):
+    stamp = time.strftime("%H:%M:%S")
+    if version is None:
+        print(f"[{stamp}] ⚠️ Reload failed: {delta}")
+    elif delta is None:
+        print(f"[{stamp}] 📦 Compiled snapshot {version} from scratch in {seconds:.2f}s")
+    elif delta:
+        print(f"[{stamp}] ✅ Published {version} in {seconds:.2f}s: {delta.summary()}")
+    else:
+        print(f"[{stamp}] Source touched, no rows changed ({version} stays current)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Republish the catalog snapshot whenever its source changes."
+    )
+    parser.add_argument("source", type=Path,
+                        help="knowledge/games.csv, or a CSV/Parquet file with catalog columns.")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT,
+                        help=f"Snapshot directory (default: {DEFAULT_OUT}).")
+    parser.add_argument("--keep", type=int, default=3,
+                        help="Old versions to keep for rollback.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Use the compact schema when compiling from scratch.")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between checks (default: {POLL_INTERVAL}).")
+    parser.add_argument("--once", action="store_true",
+                        help="Apply the source once and exit.")
+    args = parser.parse_args()
+
+    watcher = CatalogWatcher(args.source, args.out, keep=args.keep, compact=args.compact,
+                             interval=args.interval)
+    if args.once:
+        start = time.perf_counter()
+        report(*watcher.reload(), time.perf_counter() - start)
+    else:
+        print(f"👀 Watching {args.source} -> {args.out} (Ctrl+C to stop)")
+        try:
+            watcher.run(on_reload=report)
+        except KeyboardInterrupt:
+            pass